@@ -0,0 +1,83 @@
+import json
+import os
+import resource
+import sys
+
+import pytest
+
+from config.main import AppConfig
+from llm_agent_smith.models.llmInvoker import set_llm_cache
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+from llm_agent_smith.tools.executeTestsTool import set_test_executor
+from llm_agent_smith.tracing.tracer import Tracer, get_tracer, set_tracer
+
+# Tempo por rodada de pytest nos benchmarks: o lote roda ~12 grafos ao mesmo
+# tempo e o padrão de 10s gerava timeouts espúrios em máquinas carregadas
+BENCHMARK_TEST_TIMEOUT = 120.0
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "scripts", "samples.json")
+
+with open(SCRIPT, encoding="utf-8") as f:
+    SAMPLE_REQUESTS = json.load(f)["requests"]
+
+
+def peak_rss_mb() -> dict:
+    """Pico de memória residente deste processo e dos filhos já encerrados"""
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, 1),
+        "children": round(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit, 1
+        ),
+    }
+
+
+def node_latencies_ms(tracer: Tracer) -> dict:
+    """Latência média (ms) por nó do grafo a partir dos spans registrados"""
+    totals = {}
+    for span in tracer.spans:
+        if span.kind == "node":
+            total, count = totals.get(span.name, (0.0, 0))
+            totals[span.name] = (total + span.duration, count + 1)
+    return {
+        name: round(total / count * 1000, 2)
+        for name, (total, count) in sorted(totals.items())
+    }
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_executor():
+    """Executor com processo aquecido e timeout folgado para todo o benchmark
+
+    TEST_EXECUTOR=pool é respeitado; qualquer outro valor usa o forkserver
+    (ou o pool, sem os.fork): subir um pytest por rodada mede o executor,
+    não o grafo, e estoura o timeout com o lote concorrente.
+    """
+    previous = (AppConfig.TEST_EXECUTOR, AppConfig.TEST_TIMEOUT)
+    if AppConfig.TEST_EXECUTOR != "pool":
+        AppConfig.TEST_EXECUTOR = "forkserver" if hasattr(os, "fork") else "pool"
+    AppConfig.TEST_TIMEOUT = max(AppConfig.TEST_TIMEOUT, BENCHMARK_TEST_TIMEOUT)
+    set_test_executor(None)
+    yield AppConfig.TEST_EXECUTOR
+    set_test_executor(None)
+    AppConfig.TEST_EXECUTOR, AppConfig.TEST_TIMEOUT = previous
+
+
+@pytest.fixture(autouse=True)
+def offline_model(monkeypatch):
+    """Modelo com roteiro fixo: sem rede, sem chave e sem cache de respostas"""
+    monkeypatch.setattr(AppConfig, "DEFAULT_LLM_MODEL", f"fake:{SCRIPT}")
+    set_llm_cache(None)
+    ModelRegistry.reset()
+    yield
+    ModelRegistry.reset()
+
+
+@pytest.fixture
+def tracer():
+    previous = get_tracer()
+    tracer = Tracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(previous)
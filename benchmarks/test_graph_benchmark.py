@@ -0,0 +1,59 @@
+"""Benchmarks do grafo TDD completo com o modelo fake (sem rede)
+
+Execute com `pytest benchmarks` (requer pytest-benchmark). Os testes gerados
+rodam no forkserver (TEST_EXECUTOR=pool para o pool de workers), com um
+timeout folgado por rodada (ver conftest.test_executor), por exemplo:
+
+    pytest benchmarks --benchmark-autosave
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import SAMPLE_REQUESTS, node_latencies_ms, peak_rss_mb
+from llm_agent_smith.main import initial_state, run_config, tdd_app
+from llm_agent_smith.runner import TDDRunner
+
+pytest.importorskip("pytest_benchmark")
+
+# Cópias de cada amostra no lote de vazão
+BATCH_COPIES = 4
+
+
+@pytest.mark.parametrize("user_request", SAMPLE_REQUESTS)
+def test_single_request(benchmark, tracer, tmp_path, user_request):
+    def run():
+        return tdd_app.invoke(initial_state(user_request, str(tmp_path)), run_config())
+
+    state = benchmark.pedantic(run, rounds=3, iterations=1)
+
+    assert state["test_results"].all_passed
+    benchmark.extra_info["node_latency_ms"] = node_latencies_ms(tracer)
+    benchmark.extra_info["peak_rss_mb"] = peak_rss_mb()
+
+
+def test_batch_throughput(benchmark, tracer, tmp_path):
+    requests = [
+        (f"{index}-{copy}", user_request)
+        for copy in range(BATCH_COPIES)
+        for index, user_request in enumerate(SAMPLE_REQUESTS)
+    ]
+
+    async def run_batch():
+        runner = TDDRunner(output_dir=str(tmp_path))
+        return [outcome async for outcome in runner.run_many(requests)]
+
+    outcomes = benchmark.pedantic(
+        lambda: asyncio.run(run_batch()), rounds=2, iterations=1
+    )
+
+    assert all(outcome.passed for outcome in outcomes)
+    benchmark.extra_info["requests"] = len(requests)
+    # Com --benchmark-disable não há estatísticas: só a corretude é verificada
+    if benchmark.stats is not None:
+        benchmark.extra_info["requests_per_minute"] = round(
+            len(requests) / benchmark.stats.stats.mean * 60, 1
+        )
+    benchmark.extra_info["node_latency_ms"] = node_latencies_ms(tracer)
+    benchmark.extra_info["peak_rss_mb"] = peak_rss_mb()
@@ -0,0 +1,70 @@
+"""Verificação de segurança: política sobre o AST x laço de regexes anterior
+
+"ast" analisa cada versão do zero; "ast-cached" reaproveita a árvore já
+analisada por outro validador (utils/codeAnalysis.py). Código "limpo" não
+contém nenhuma palavra das listas e para na pré-filtragem textual; no
+"suspeito" (re.compile) a árvore precisa ser percorrida.
+
+pytest benchmarks/test_safety_benchmark.py --benchmark-group-by=param:size
+"""
+
+import re
+
+import pytest
+
+from llm_agent_smith.utils.codeAnalysis import clear_analysis_cache
+from llm_agent_smith.utils.safetyPolicy import find_violations
+
+pytest.importorskip("pytest_benchmark")
+
+# Implementação substituída, mantida como referência de desempenho
+LEGACY_PATTERNS = [
+    r"__import__\s*\(",
+    r"subprocess\.",
+    r"os\.system\(",
+    r"eval\(",
+    r"exec\(",
+    r"open\(",
+    r"shutil\.",
+    r"sys\.exit",
+]
+
+
+def legacy_is_code_safe(code: str) -> bool:
+    return not any(re.search(pattern, code) for pattern in LEGACY_PATTERNS)
+
+
+FUNCTION = '''
+def calcular_{index}(valores, fator={index}):
+    """Soma ponderada dos valores válidos"""
+    total = 0
+    for posicao, valor in enumerate(valores):
+        if valor is None or not isinstance(valor, (int, float)):
+            continue
+        total += valor * fator / (posicao + 1)
+    return round(total, 2)
+'''
+
+
+def blob(functions: int, content: str = "limpo") -> str:
+    header = "import math\nimport os\n"
+    if content == "suspeito":
+        header += "import re\n\nPADRAO = re.compile(r'\\d+')\n"
+    return header + "".join(FUNCTION.format(index=index) for index in range(functions))
+
+
+@pytest.mark.parametrize("content", ["limpo", "suspeito"])
+@pytest.mark.parametrize("size", [10, 100, 1000])
+@pytest.mark.parametrize("checker", ["regex", "ast", "ast-cached"])
+def test_safety_check(benchmark, checker, size, content):
+    code = blob(size, content)
+
+    def ast_check(code: str) -> bool:
+        if checker == "ast":
+            clear_analysis_cache()
+        return not find_violations(code)
+
+    check = legacy_is_code_safe if checker == "regex" else ast_check
+
+    assert benchmark(check, code)
+    benchmark.extra_info["code_kb"] = round(len(code) / 1024, 1)
@@ -10,8 +10,103 @@ class AppConfig:
     DEFAULT_LLM_MODEL = os.getenv(
         "DEFAULT_LLM_MODEL", "gemini-2.5-flash"
     )  # Permite override via .env
+    # Backends offline: "fake[:roteiro.json]", "replay:gravacao.jsonl" ou
+    # "record:gravacao.jsonl" (grava as respostas de LLM_RECORD_MODEL)
+    LLM_RECORD_MODEL = os.getenv("LLM_RECORD_MODEL", "gemini-2.5-flash")
+    # Endpoint alternativo da API do Gemini via REST (proxy ou servidor local)
+    GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+    # Latência simulada (segundos) por chamada dos modelos fake/replay
+    FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0"))
 
-    # Você pode adicionar métodos para validação ou outras configurações complexas
+    # Backend de execução dos testes: "subprocess" (um pytest por rodada), "pool"
+    # (workers com pytest pré-importado) ou "forkserver" (fork por rodada, Linux)
+    TEST_EXECUTOR = os.getenv("TEST_EXECUTOR", "subprocess")
+    TEST_POOL_SIZE = int(os.getenv("TEST_POOL_SIZE", "2"))
+    TEST_WORKER_MAX_RUNS = int(os.getenv("TEST_WORKER_MAX_RUNS", "50"))
+    TEST_TIMEOUT = float(os.getenv("TEST_TIMEOUT", "10"))
+    # Limites por rodada no executor "forkserver" (CPU padrão: TEST_TIMEOUT)
+    TEST_CPU_LIMIT = float(os.getenv("TEST_CPU_LIMIT", "0")) or None
+    TEST_MEMORY_LIMIT_MB = int(os.getenv("TEST_MEMORY_LIMIT_MB", "1024"))
+    # Resultados de teste por hash de (produção, testes): TEST_CACHE_SIZE rodadas
+    # em memória (0 desativa) e, se TEST_CACHE_PATH definido, também em SQLite
+    TEST_CACHE_SIZE = int(os.getenv("TEST_CACHE_SIZE", "256"))
+    TEST_CACHE_PATH = os.getenv("TEST_CACHE_PATH", "")
+    TEST_CACHE_MAX_ENTRIES = int(os.getenv("TEST_CACHE_MAX_ENTRIES", "10000"))
+
+    # Tentativas de correção (fase GREEN) antes de desistir de uma feature
+    MAX_FEATURE_ATTEMPTS = int(os.getenv("MAX_FEATURE_ATTEMPTS", "3"))
+    # Correções candidatas pedidas e testadas em paralelo por tentativa (1: serial)
+    FIX_CANDIDATES = int(os.getenv("FIX_CANDIDATES", "1"))
+
+    # Limite de passos por execução de grafo e de features processadas em paralelo
+    GRAPH_RECURSION_LIMIT = int(os.getenv("GRAPH_RECURSION_LIMIT", "100"))
+    MAX_PARALLEL_FEATURES = int(os.getenv("MAX_PARALLEL_FEATURES", "4"))
+    # Solicitações processadas ao mesmo tempo pelo TDDRunner (modo assíncrono)
+    MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
+
+    # Cache de respostas do LLM em SQLite (desativado se LLM_CACHE_PATH vazio)
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+    # Limites do agendador de chamadas ao LLM, compartilhados pelo processo
+    # (0: sem limite). Cada chamada reserva os tokens estimados do prompt mais
+    # LLM_RESERVED_OUTPUT_TOKENS; erros de cota são repetidos até
+    # LLM_QUOTA_RETRIES vezes com backoff exponencial (com jitter)
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    LLM_RESERVED_OUTPUT_TOKENS = int(os.getenv("LLM_RESERVED_OUTPUT_TOKENS", "1024"))
+    LLM_QUOTA_RETRIES = int(os.getenv("LLM_QUOTA_RETRIES", "5"))
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+    LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+
+    # Hedging: uma chamada que passa do percentil LLM_HEDGE_PERCENTILE das
+    # latências recentes do nó é duplicada e vale a primeira resposta (0
+    # desativa); no máximo LLM_HEDGE_MAX_RATE das chamadas são duplicadas
+    LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+    LLM_HEDGE_MAX_RATE = float(os.getenv("LLM_HEDGE_MAX_RATE", "0.1"))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+    # Roteamento por nó: "nó=modelo>modelo;..." (ex.: "decompose_features=
+    # gemini-2.5-flash-lite;implement_fix=gemini-2.5-flash>gemini-2.5-pro";
+    # "*" vale para os demais nós, que sem rota usam DEFAULT_LLM_MODEL). A
+    # cada LLM_ESCALATE_AFTER tentativas falhas a chamada sobe um degrau;
+    # prompts de até LLM_LIGHT_PROMPT_TOKENS tokens na primeira tentativa vão
+    # para LLM_LIGHT_MODEL; degraus com taxa de sucesso abaixo de
+    # LLM_ROUTE_MIN_SUCCESS (0 desativa) são pulados
+    LLM_ROUTES = os.getenv("LLM_ROUTES", "")
+    LLM_ESCALATE_AFTER = int(os.getenv("LLM_ESCALATE_AFTER", "1"))
+    LLM_LIGHT_MODEL = os.getenv("LLM_LIGHT_MODEL", "")
+    LLM_LIGHT_PROMPT_TOKENS = int(os.getenv("LLM_LIGHT_PROMPT_TOKENS", "0"))
+    LLM_ROUTE_MIN_SUCCESS = float(os.getenv("LLM_ROUTE_MIN_SUCCESS", "0"))
+
+    # Preço por milhão de tokens (USD) usado na estimativa de custo das métricas
+    LLM_INPUT_COST_PER_MTOK = float(os.getenv("LLM_INPUT_COST_PER_MTOK", "0.30"))
+    LLM_OUTPUT_COST_PER_MTOK = float(os.getenv("LLM_OUTPUT_COST_PER_MTOK", "2.50"))
+    # Métricas (texto Prometheus) e trace JSON gravados ao fim da execução
+    METRICS_PATH = os.getenv("METRICS_PATH", "")
+    TRACE_PATH = os.getenv("TRACE_PATH", "")
+
+    # Memória vetorial de features já resolvidas (vazio desativa). Acima de
+    # MEMORY_REUSE_SIMILARITY o teste/código lembrado é reutilizado sem LLM;
+    # acima de MEMORY_EXAMPLE_SIMILARITY entra no prompt como exemplo
+    MEMORY_PATH = os.getenv("MEMORY_PATH", "")
+    MEMORY_REUSE_SIMILARITY = float(os.getenv("MEMORY_REUSE_SIMILARITY", "0.9"))
+    MEMORY_EXAMPLE_SIMILARITY = float(os.getenv("MEMORY_EXAMPLE_SIMILARITY", "0.4"))
+    MEMORY_EXAMPLES = int(os.getenv("MEMORY_EXAMPLES", "2"))
+
+    # Checkpoints do grafo em SQLite para retomar execuções (vazio desativa)
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "")
+
+    # Tokens de contexto (código e falhas) por prompt; acima disso só os trechos
+    # relevantes à feature ou aos testes falhando vão por inteiro
+    PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "6000"))
+
+    # Lê as respostas de código em streaming e corta após o bloco ```python
+    LLM_STREAM_CODE = os.getenv("LLM_STREAM_CODE", "1") == "1"
+
+    # Validação chamada apenas ao construir o cliente Gemini (ver GeminiModel),
+    # para que importar o pacote ou rodar testes offline não exija a chave
     @classmethod
     def validate(cls):
         if not cls.GOOGLE_API_KEY:
@@ -19,8 +114,3 @@ class AppConfig:
                 "GOOGLE_API_KEY não encontrada no arquivo .env ou variáveis de ambiente."
             )
         print("Configurações do ambiente carregadas e validadas com sucesso.")
-
-
-# Chama a validação assim que o módulo é carregado
-# Isso garante que as variáveis críticas existam ANTES de qualquer outro código usar AppConfig
-AppConfig.validate()
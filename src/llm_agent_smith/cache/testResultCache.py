@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from llm_agent_smith.cache.llmResponseCache import LLMResponseCache
+from llm_agent_smith.executors.testFiles import TEST_HEADER
+from llm_agent_smith.executors.testResult import TestRunResult
+
+
+class TestResultCache:
+    """Resultados de rodadas de teste endereçados pelo conteúdo dos arquivos
+
+    A chave é o hash de (código de produção, testes, seleção, -x, executor
+    e seus limites): a mesma entrada nunca é executada duas vezes, mas um
+    timeout maior ou outro executor não reaproveitam resultados antigos.
+    Fica em memória (LRU de até `max_entries`) e, com `path`, também em um
+    SQLite que sobrevive entre execuções (mesmo formato do cache de
+    respostas do LLM). Rodadas que não chegaram a executar os testes
+    (timeout, worker morto) não entram.
+    """
+
+    __test__ = False
+
+    def __init__(
+        self, max_entries: int = 256, path: str = "", disk_entries: int = 10_000
+    ):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = (
+            LLMResponseCache(path, max_entries=disk_entries, ttl=0) if path else None
+        )
+
+    @staticmethod
+    def make_key(
+        production_code: str,
+        test_code: str,
+        selection: Optional[List[str]] = None,
+        fail_fast: bool = False,
+        environment: str = "",
+    ) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            TEST_HEADER,
+            production_code,
+            test_code,
+            "\x1e".join(selection) if selection is not None else "*",
+            "x" if fail_fast else "",
+            environment,
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Tuple[Optional[TestRunResult], str]:
+        """(resultado ou None, onde foi achado: "memory", "disk" ou "miss")
+
+        Cada acerto devolve uma cópia nova, que o chamador pode alterar.
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return TestRunResult.from_dict(data), "memory"
+
+        content = self._disk.get(key) if self._disk is not None else None
+        with self._lock:
+            if content is None:
+                self.misses += 1
+                return None, "miss"
+            self.disk_hits += 1
+            data = json.loads(content)
+            self._remember(key, data)
+        return TestRunResult.from_dict(data), "disk"
+
+    def put(self, key: str, results: TestRunResult):
+        if results.exit_code < 0:
+            return
+        data = results.to_dict()
+        with self._lock:
+            self._remember(key, data)
+        if self._disk is not None:
+            self._disk.put(key, json.dumps(data, ensure_ascii=False), "pytest")
+
+    def _remember(self, key: str, data: dict):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._memory),
+            }
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
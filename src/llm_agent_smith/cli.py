@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Callable, Iterator, Optional, Set, TextIO, Tuple
+
+from config.main import AppConfig
+
+
+def request_text(record: dict) -> Optional[str]:
+    """Texto da solicitação em um registro JSONL
+
+    Aceita `user_request` ou `request`; no formato do backlog
+    ({"title", "body"}) junta título e corpo.
+    """
+    for key in ("user_request", "request"):
+        if record.get(key):
+            return str(record[key])
+    parts = [str(record[key]) for key in ("title", "body") if record.get(key)]
+    return "\n\n".join(parts) or None
+
+
+def read_requests(
+    stream: TextIO,
+    on_invalid: Callable[[dict], None],
+    skip: Set[str] = frozenset(),
+) -> Iterator[Tuple[str, str]]:
+    """Lê (request_id, texto) linha a linha, sem carregar o arquivo inteiro"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("registro não é um objeto JSON")
+        except ValueError as e:
+            on_invalid(_invalid_record(f"linha-{line_number}", f"JSON inválido: {e}"))
+            continue
+
+        request_id = str(
+            record.get("request_id") or record.get("id") or f"linha-{line_number}"
+        )
+        if request_id in skip:
+            continue
+        text = request_text(record)
+        if text is None:
+            on_invalid(_invalid_record(request_id, "registro sem solicitação"))
+            continue
+        yield request_id, text
+
+
+def _invalid_record(request_id: str, message: str) -> dict:
+    return {"request_id": request_id, "status": "invalid", "error": message}
+
+
+def outcome_record(outcome) -> dict:
+    """Registro JSONL de resultado de uma solicitação"""
+    state = outcome.state or {}
+    results = state.get("test_results")
+    if isinstance(outcome.error, asyncio.CancelledError):
+        status = "cancelled"
+    elif outcome.error is not None:
+        status = "error"
+    else:
+        status = "passed" if outcome.passed else "failed"
+
+    return {
+        "request_id": outcome.request_id,
+        "status": status,
+        "error": repr(outcome.error) if outcome.error is not None else None,
+        "duration": round(outcome.duration, 3),
+        "tokens": outcome.tokens,
+        "tests": (
+            {
+                "passed": results.passed,
+                "failed": results.failed,
+                "errors": results.errors,
+                "skipped": results.skipped,
+            }
+            if results is not None
+            else None
+        ),
+        "features": state.get("features", []),
+        "production_code": state.get("production_code", ""),
+        "test_code": state.get("test_code", ""),
+    }
+
+
+def _done_ids(path: str) -> Set[str]:
+    """Ids já presentes no arquivo de resultados (para --resume)"""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") in ("passed", "failed"):
+                done.add(record["request_id"])
+    return done
+
+
+async def run_batch(args) -> dict:
+    """Processa o JSONL de entrada e grava cada resultado assim que termina"""
+    from llm_agent_smith.runner import TDDRunner
+
+    skip = _done_ids(args.output) if args.resume else set()
+    counts = {"passed": 0, "failed": 0, "error": 0, "cancelled": 0, "invalid": 0}
+    runner = TDDRunner(concurrency=args.concurrency, output_dir=args.artifacts)
+
+    with (
+        open(args.input, encoding="utf-8") as source,
+        open(args.output, "a" if args.resume else "w", encoding="utf-8") as sink,
+    ):
+
+        def write(record: dict):
+            counts[record["status"]] += 1
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+            sink.flush()
+
+        async for outcome in runner.run_many(read_requests(source, write, skip)):
+            record = outcome_record(outcome)
+            write(record)
+            print(
+                f"📦 {record['request_id']}: {record['status']} "
+                f"em {record['duration']:.1f}s",
+                file=sys.stderr,
+            )
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="llm-agent-smith")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch", help="processa um arquivo JSONL de solicitações"
+    )
+    batch.add_argument("input", help="JSONL com uma solicitação por linha")
+    batch.add_argument(
+        "-o", "--output", default="results.jsonl", help="JSONL de resultados"
+    )
+    batch.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=AppConfig.MAX_CONCURRENT_REQUESTS,
+        help="solicitações processadas ao mesmo tempo",
+    )
+    batch.add_argument(
+        "--artifacts",
+        default=None,
+        help="diretório onde gravar o código final de cada solicitação",
+    )
+    batch.add_argument(
+        "--metrics", default=None, help="arquivo de métricas no formato Prometheus"
+    )
+    batch.add_argument(
+        "--trace", default=None, help="trace JSON (chrome://tracing / Perfetto)"
+    )
+    batch.add_argument(
+        "--resume",
+        action="store_true",
+        help="acrescenta ao arquivo de saída e pula solicitações já concluídas",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "batch":
+        counts = asyncio.run(run_batch(args))
+        from llm_agent_smith.tracing.tracer import get_tracer
+
+        get_tracer().export(args.metrics, args.trace)
+        print(
+            "🏁 Lote concluído: "
+            + ", ".join(f"{n} {status}" for status, n in counts.items()),
+            file=sys.stderr,
+        )
+        return 0 if not (counts["error"] or counts["invalid"]) else 1
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+import asyncio
+import gc
+import math
+import multiprocessing
+import os
+import pickle
+import shutil
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from llm_agent_smith.executors.pytestWorkerPool import (
+    disable_plugin_autoload,
+    run_isolated,
+)
+from llm_agent_smith.executors.testResult import TestRunResult
+
+_HEADER = struct.Struct("!I")
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+# Eventos de auditoria bloqueados no filho: criar processos
+_BLOCKED_EVENTS = (
+    "os.system",
+    "os.fork",
+    "os.forkpty",
+    "os.exec",
+    "os.posix_spawn",
+    "os.spawn",
+    "subprocess.Popen",
+)
+# Eventos que alteram o sistema de arquivos: caminho(s) nos primeiros argumentos
+_PATH_EVENTS = {
+    "os.remove": 1,
+    "os.rmdir": 1,
+    "os.mkdir": 1,
+    "os.rename": 2,
+    "os.replace": 2,
+    "os.link": 2,
+    "os.symlink": 2,
+    "os.truncate": 1,
+    "os.chmod": 1,
+    "os.chown": 1,
+    "os.utime": 1,
+    "shutil.rmtree": 1,
+    "shutil.move": 2,
+    "shutil.copyfile": 2,
+}
+
+
+def _send(sock: socket.socket, obj):
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError("conexão encerrada")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock: socket.socket):
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    return pickle.loads(_recv_exactly(sock, size))
+
+
+def _confine_writes(scratch: str):
+    """Audit hook: escrita só dentro de `scratch` e nenhum processo novo
+
+    Barreira contra efeitos colaterais acidentais do código gerado, não um
+    sandbox contra código malicioso (ctypes, por exemplo, passa por fora);
+    a análise estática de segurança continua valendo.
+    """
+    scratch = os.path.realpath(scratch)
+    allowed = (scratch, os.devnull)
+
+    def inside(path) -> bool:
+        if isinstance(path, int):
+            # Descritores já abertos: herdados ou criados dentro das regras
+            return True
+        real = os.path.realpath(os.fsdecode(path))
+        return any(real == a or real.startswith(a + os.sep) for a in allowed)
+
+    def hook(event, args):
+        if event == "open":
+            path, mode, flags = args
+            writing = (isinstance(mode, str) and any(c in mode for c in "wax+")) or (
+                isinstance(flags, int) and flags & _WRITE_FLAGS
+            )
+            if writing and not inside(path):
+                raise PermissionError(f"escrita fora do diretório de testes: {path}")
+        elif event.startswith(_BLOCKED_EVENTS):
+            raise PermissionError(f"operação bloqueada nos testes: {event}")
+        elif event in _PATH_EVENTS:
+            for path in args[: _PATH_EVENTS[event]]:
+                if path is not None and not inside(path):
+                    raise PermissionError(f"{event} fora do diretório de testes")
+
+    sys.addaudithook(hook)
+
+
+def _limit_resources(cpu_seconds: float, memory_mb: int, wall_seconds: float):
+    import resource
+
+    cpu = max(1, math.ceil(cpu_seconds))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    if memory_mb:
+        memory = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    # SIGALRM sem handler encerra o processo: limite de tempo de parede
+    signal.alarm(max(1, math.ceil(wall_seconds)))
+
+
+def _serve_child(pytest, conn: socket.socket, limits: tuple, workdir: str):
+    """Processo filho: aplica limites, roda uma rodada e devolve o resultado"""
+    # Dentro do diretório do servidor: se o filho for morto por um limite,
+    # o que sobrar sai junto com o servidor
+    scratch = tempfile.mkdtemp(prefix="tdd-run-", dir=workdir)
+    os.environ.update(TMPDIR=scratch, HOME=scratch)
+    tempfile.tempdir = scratch
+    sys.dont_write_bytecode = True
+    # Processo de vida curta: coletar lixo só custaria tempo
+    gc.disable()
+
+    job = _recv(conn)
+    _limit_resources(*limits)
+    _confine_writes(scratch)
+    result = run_isolated(pytest, *job)
+    _send(conn, result)
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _server_main(socket_path: str, limits: tuple, ready):
+    """Servidor: importa o pytest uma vez e faz fork de um filho por rodada"""
+    import pytest
+
+    disable_plugin_autoload()
+    # Aquecimento no próprio servidor: os filhos herdam plugins já carregados
+    run_isolated(pytest, "", "def test_warmup():\n    assert True\n")
+    # Objetos do aquecimento ficam fora do GC: o fork não os toca (copy-on-write)
+    gc.freeze()
+
+    # Filhos encerrados são coletados automaticamente (sem zumbis)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    ready.send("ready")
+    ready.close()
+
+    while True:
+        conn, _ = server.accept()
+        if os.fork() == 0:
+            server.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            try:
+                _serve_child(pytest, conn, limits, os.path.dirname(socket_path))
+            finally:
+                os._exit(0)
+        conn.close()
+
+
+class ForkServerExecutor:
+    """Executa cada rodada em um fork de um servidor com pytest pré-carregado
+
+    O fork custa milissegundos e parte de um processo já aquecido, sem
+    reimportar pytest nem a stdlib. Cada filho roda com limite de CPU
+    (RLIMIT_CPU), memória (RLIMIT_AS) e tempo de parede, e só pode escrever
+    no próprio diretório temporário. Disponível apenas em sistemas com fork.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        cpu_limit: float = None,
+        memory_limit_mb: int = 1024,
+        startup_timeout: float = 60,
+    ):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("ForkServerExecutor requer os.fork (Linux/macOS)")
+        self.timeout = timeout
+        self.limits = (cpu_limit or timeout, memory_limit_mb, timeout)
+        self.startup_timeout = startup_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._dir = None
+        self._server = None
+        self._closed = False
+
+    @property
+    def socket_path(self) -> str:
+        return os.path.join(self._dir, "server.sock")
+
+    def _ensure_server(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ForkServerExecutor já foi encerrado")
+            if self._server is not None and self._server.is_alive():
+                return
+            self._stop_server()
+            self._dir = tempfile.mkdtemp(prefix="tdd-forkserver-")
+            parent_conn, child_conn = self._ctx.Pipe(duplex=False)
+            self._server = self._ctx.Process(
+                target=_server_main,
+                args=(self.socket_path, self.limits, child_conn),
+                daemon=True,
+            )
+            self._server.start()
+            child_conn.close()
+            if not parent_conn.poll(self.startup_timeout):
+                self._stop_server()
+                raise TimeoutError("Servidor de fork do pytest não inicializou a tempo")
+            parent_conn.recv()
+            parent_conn.close()
+
+    def _stop_server(self):
+        if self._server is not None:
+            self._server.kill()
+            self._server.join()
+            self._server = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def _interrupted(self, started: float) -> TestRunResult:
+        elapsed = time.perf_counter() - started
+        if elapsed >= self.timeout:
+            reason = "Timeout ao executar testes"
+        else:
+            reason = "execução interrompida (limite de CPU ou memória excedido)"
+        return TestRunResult.from_error(f"ERRO: {reason}", elapsed)
+
+    def _failed(self, error: Exception, started: float) -> TestRunResult:
+        # Servidor morto ou conexão recusada: a próxima rodada o reinicia
+        return TestRunResult.from_error(
+            f"ERRO: Servidor de fork falhou: {str(error)}",
+            time.perf_counter() - started,
+        )
+
+    def run(
+        self,
+        production_code: str,
+        test_code: str,
+        selection=None,
+        fail_fast: bool = False,
+    ) -> TestRunResult:
+        started = time.perf_counter()
+        try:
+            # Fora do try da rodada: socket.timeout é TimeoutError, e uma falha
+            # ao iniciar o servidor não é timeout dos testes
+            self._ensure_server()
+        except (OSError, TimeoutError) as e:
+            return self._failed(e, started)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(self.timeout + 1)
+            try:
+                conn.connect(self.socket_path)
+            except OSError as e:
+                return self._failed(e, started)
+            try:
+                _send(conn, (production_code, test_code, selection, fail_fast))
+                return _recv(conn)
+            except (EOFError, socket.timeout):
+                return self._interrupted(started)
+            except OSError as e:
+                return self._failed(e, started)
+
+    async def arun(
+        self,
+        production_code: str,
+        test_code: str,
+        selection=None,
+        fail_fast: bool = False,
+    ) -> TestRunResult:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._ensure_server)
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        except (OSError, TimeoutError) as e:
+            return self._failed(e, started)
+
+        try:
+            data = pickle.dumps(
+                (production_code, test_code, selection, fail_fast),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            writer.write(_HEADER.pack(len(data)) + data)
+            await writer.drain()
+            header = await asyncio.wait_for(
+                reader.readexactly(_HEADER.size), timeout=self.timeout + 1
+            )
+            (size,) = _HEADER.unpack(header)
+            return pickle.loads(await reader.readexactly(size))
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return self._interrupted(started)
+        except OSError as e:
+            # Mesmo tratamento de run: conexão resetada ou servidor que caiu
+            return self._failed(e, started)
+        finally:
+            writer.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._stop_server()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+import ast
+import builtins
+import traceback
+from typing import Optional, Set, Tuple
+
+from llm_agent_smith.executors.testFiles import TEST_HEADER
+from llm_agent_smith.utils.codeAnalysis import parse
+
+BUILTIN_NAMES = frozenset(dir(builtins)) | {"__file__", "__name__"}
+
+PRODUCTION_FILE = "production.py"
+TEST_FILE = "test_production.py"
+
+
+def _compile(code: str, filename: str):
+    """(árvore, None) ou (None, mensagem no formato do traceback do Python)"""
+    try:
+        tree = parse(code, filename)
+        compile(tree, filename, "exec")
+        return tree, None
+    except (SyntaxError, ValueError) as e:
+        return None, "".join(traceback.format_exception_only(type(e), e)).rstrip()
+
+
+def _exported_names(tree: ast.Module) -> Optional[Set[str]]:
+    """Nomes de topo de production.py (None se não der para saber estaticamente)"""
+    names = set()
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    return None
+                names.add(alias.asname or alias.name.split(".")[0])
+            continue
+        # Atribuições e blocos de topo (if/try/with/for) também definem nomes
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                names.add(child.id)
+            elif isinstance(
+                child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+            ):
+                names.add(child.name)
+            elif isinstance(child, (ast.Import, ast.ImportFrom)):
+                pending.append(child)
+    if "__getattr__" in names:
+        return None
+    return names
+
+
+def _bound_names(tree: ast.Module) -> Set[str]:
+    """Todos os nomes definidos em algum ponto do arquivo de testes"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.alias):
+            names.add(node.asname or node.name.split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+    return names
+
+
+def _missing_names(production: ast.Module, tests: ast.Module) -> Optional[str]:
+    exported = _exported_names(production)
+    if exported is None:
+        return None
+
+    missing = {}
+    for node in ast.walk(tests):
+        if isinstance(node, ast.ImportFrom) and node.module == "production":
+            for alias in node.names:
+                if alias.name != "*" and alias.name not in exported:
+                    missing.setdefault(alias.name, node.lineno)
+        elif isinstance(node, ast.ImportFrom) and any(
+            alias.name == "*" for alias in node.names
+        ):
+            # Outro `import *`: não dá para saber de onde vêm os nomes
+            return None
+
+    # Nomes livres dos testes chegam via `from production import *` do cabeçalho
+    public = (
+        exported
+        if "__all__" in exported
+        else {name for name in exported if not name.startswith("_")}
+    )
+    known = _bound_names(tests) | BUILTIN_NAMES | public
+    for node in ast.walk(tests):
+        if (
+            isinstance(node, ast.Name)
+            and isinstance(node.ctx, ast.Load)
+            and node.id not in known
+        ):
+            missing.setdefault(node.id, node.lineno)
+
+    if not missing:
+        return None
+    listed = ", ".join(
+        f"{name} (linha {line})" for name, line in sorted(missing.items())
+    )
+    return (
+        f"NameError: nomes usados pelos testes não existem em production.py: {listed}"
+    )
+
+
+def preflight_failure(
+    production_code: str, test_code: str
+) -> Optional[Tuple[str, str]]:
+    """(arquivo a corrigir, erro) que impediria a execução dos testes, ou None
+
+    Compila production.py e test_production.py em processo e confere se os
+    nomes que os testes usam de production existem, sem iniciar o pytest.
+    Linhas do arquivo de testes são contadas sem o cabeçalho (TEST_HEADER).
+    Nomes que faltam são atribuídos a production.py: na fase RED os testes
+    usam o que ainda não foi implementado.
+    """
+    production, error = _compile(production_code, PRODUCTION_FILE)
+    if error:
+        return PRODUCTION_FILE, error
+    tests, error = _compile(test_code, TEST_FILE)
+    if error:
+        return TEST_FILE, error
+    # Árvores do cache são compartilhadas: um módulo novo, sem alterar `tests`
+    header = parse(TEST_HEADER, TEST_FILE)
+    tests = ast.Module(body=header.body + tests.body, type_ignores=[])
+    error = _missing_names(production, tests)
+    return (PRODUCTION_FILE, error) if error else None
+
+
+def preflight_check(production_code: str, test_code: str) -> Optional[str]:
+    """Erro que impediria a execução dos testes, ou None (ver preflight_failure)"""
+    failure = preflight_failure(production_code, test_code)
+    return failure[1] if failure else None
@@ -0,0 +1,219 @@
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+
+from llm_agent_smith.executors.resultCollector import ResultCollector
+from llm_agent_smith.executors.testFiles import selection_args, write_test_files
+from llm_agent_smith.executors.testResult import TestRunResult
+
+_ISOLATED_MODULES = ("production", "test_production")
+
+
+def disable_plugin_autoload():
+    """Evita varrer os pacotes instalados atrás de plugins a cada pytest.main"""
+    os.environ["PYTEST_DISABLE_PLUGIN_AUTOLOAD"] = "1"
+
+
+def run_isolated(
+    pytest, production_code: str, test_code: str, selection=None, fail_fast=False
+) -> TestRunResult:
+    """Roda o pytest no próprio processo e desfaz os efeitos colaterais da rodada"""
+    started = time.perf_counter()
+    saved_path = list(sys.path)
+    saved_cwd = os.getcwd()
+    buffer = io.StringIO()
+    collector = ResultCollector()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        test_path = write_test_files(tmpdir, production_code, test_code)
+        try:
+            os.chdir(tmpdir)
+            with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+                exit_code = int(
+                    pytest.main(
+                        [
+                            "-v",
+                            "-p",
+                            "no:cacheprovider",
+                            # Ambos chamam gc.collect() a cada sessão (~100 ms)
+                            "-p",
+                            "no:unraisableexception",
+                            "-p",
+                            "no:threadexception",
+                            "--rootdir",
+                            tmpdir,
+                            *selection_args(test_path, selection, fail_fast),
+                        ],
+                        plugins=[collector],
+                    )
+                )
+        except BaseException as e:
+            buffer.write(f"ERRO: {str(e)}")
+            exit_code = -1
+        finally:
+            os.chdir(saved_cwd)
+            sys.path[:] = saved_path
+            for name, module in list(sys.modules.items()):
+                module_file = getattr(module, "__file__", None) or ""
+                if name in _ISOLATED_MODULES or module_file.startswith(tmpdir):
+                    del sys.modules[name]
+
+    return TestRunResult(
+        cases=collector.cases,
+        exit_code=exit_code,
+        duration=time.perf_counter() - started,
+        output=buffer.getvalue(),
+    )
+
+
+def _worker_main(conn):
+    """Loop do worker: importa o pytest uma vez e atende rodadas até receber None"""
+    import pytest
+
+    disable_plugin_autoload()
+    # Rodada de aquecimento para carregar plugins e o rewrite de asserts
+    run_isolated(pytest, "", "def test_warmup():\n    assert True\n")
+    conn.send("ready")
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        conn.send(run_isolated(pytest, *job))
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "runs", "ready")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.runs = 0
+        self.ready = False
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class PytestWorkerPool:
+    """Pool de processos com pytest pré-importado, reciclados após N rodadas ou falha"""
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_runs: int = 50,
+        timeout: float = 10,
+        startup_timeout: float = 60,
+    ):
+        self.size = size
+        self.max_runs = max_runs
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue = queue.Queue()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _wait_ready(self, worker: _Worker):
+        if worker.ready:
+            return
+        if not worker.conn.poll(self.startup_timeout):
+            raise TimeoutError("Worker do pytest não inicializou a tempo")
+        worker.conn.recv()
+        worker.ready = True
+
+    def run(
+        self,
+        production_code: str,
+        test_code: str,
+        selection=None,
+        fail_fast: bool = False,
+    ) -> TestRunResult:
+        if self._closed:
+            raise RuntimeError("PytestWorkerPool já foi encerrado")
+
+        started = time.perf_counter()
+        worker = self._idle.get()
+        healthy = True
+        try:
+            self._wait_ready(worker)
+            worker.conn.send((production_code, test_code, selection, fail_fast))
+            if not worker.conn.poll(self.timeout):
+                healthy = False
+                return TestRunResult.from_error(
+                    "ERRO: Timeout ao executar testes", time.perf_counter() - started
+                )
+            result = worker.conn.recv()
+            worker.runs += 1
+            return result
+        except (EOFError, OSError, TimeoutError) as e:
+            healthy = False
+            return TestRunResult.from_error(
+                f"ERRO: Worker do pytest falhou: {str(e)}",
+                time.perf_counter() - started,
+            )
+        finally:
+            if not healthy:
+                worker.kill()
+                worker = self._spawn()
+            elif worker.runs >= self.max_runs:
+                worker.stop()
+                worker = self._spawn()
+            self._idle.put(worker)
+
+    async def arun(
+        self,
+        production_code: str,
+        test_code: str,
+        selection=None,
+        fail_fast: bool = False,
+    ) -> TestRunResult:
+        # O worker já isola a execução; basta não bloquear o event loop
+        return await asyncio.to_thread(
+            self.run, production_code, test_code, selection, fail_fast
+        )
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,92 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import List
+
+from llm_agent_smith.executors.testResult import TestCaseResult, trim_traceback
+
+_CRASH_LINE = re.compile(r"^(?:.*/)?([^/\s]+\.py):(\d+)", re.MULTILINE)
+
+
+def _crash_location(report) -> str:
+    crash = getattr(getattr(report, "longrepr", None), "reprcrash", None)
+    if crash is not None:
+        return f"{crash.path.rsplit('/', 1)[-1]}:{crash.lineno}"
+    path, lineno, _ = report.location
+    return f"{path}:{(lineno or 0) + 1}"
+
+
+class ResultCollector:
+    """Plugin do pytest que coleta o resultado de cada teste via hooks"""
+
+    def __init__(self):
+        self.cases: List[TestCaseResult] = []
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.cases.append(
+                TestCaseResult(
+                    nodeid=report.nodeid or "<coleta>",
+                    outcome="error",
+                    message=trim_traceback(report.longreprtext),
+                )
+            )
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == "call" or report.skipped:
+            outcome = report.outcome
+        elif report.failed:
+            # Falha em setup/teardown conta como erro, como no pytest
+            outcome = "error"
+        else:
+            return
+
+        self.cases.append(
+            TestCaseResult(
+                nodeid=report.nodeid,
+                outcome=outcome,
+                duration=report.duration,
+                location=_crash_location(report) if report.failed else None,
+                message=trim_traceback(report.longreprtext) if report.failed else "",
+            )
+        )
+
+
+def parse_junit_xml(path: str) -> List[TestCaseResult]:
+    """Converte o relatório JUnit XML (junit_family=xunit1) em resultados por teste"""
+    cases = []
+    for testcase in ET.parse(path).getroot().iter("testcase"):
+        file = testcase.get("file")
+        classname = testcase.get("classname", "")
+        module, _, klass = classname.partition(".")
+        nodeid = "::".join(
+            part
+            for part in (file or f"{module}.py", klass, testcase.get("name"))
+            if part
+        )
+
+        outcome, message, location = "passed", "", None
+        for child in testcase:
+            if child.tag in ("failure", "error"):
+                outcome = "failed" if child.tag == "failure" else "error"
+                text = child.text or child.get("message", "")
+                message = trim_traceback(text)
+                crashes = _CRASH_LINE.findall(text)
+                if crashes:
+                    location = "{}:{}".format(*crashes[-1])
+                elif file and testcase.get("line"):
+                    location = f"{file}:{int(testcase.get('line')) + 1}"
+                break
+            if child.tag == "skipped":
+                outcome = "skipped"
+                break
+
+        cases.append(
+            TestCaseResult(
+                nodeid=nodeid,
+                outcome=outcome,
+                duration=float(testcase.get("time") or 0.0),
+                location=location,
+                message=message,
+            )
+        )
+    return cases
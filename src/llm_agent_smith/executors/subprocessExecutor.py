@@ -0,0 +1,116 @@
+import asyncio
+import os
+import subprocess
+import tempfile
+import time
+
+from llm_agent_smith.executors.resultCollector import parse_junit_xml
+from llm_agent_smith.executors.testFiles import selection_args, write_test_files
+from llm_agent_smith.executors.testResult import TestRunResult
+
+
+def _pytest_command(
+    test_path, junit_path: str, selection=None, fail_fast: bool = False
+) -> list:
+    return [
+        "pytest",
+        "-v",
+        f"--junitxml={junit_path}",
+        "-o",
+        "junit_family=xunit1",
+        *selection_args(test_path, selection, fail_fast),
+    ]
+
+
+def _collect(junit_path: str, exit_code: int, output: str, started: float):
+    cases = parse_junit_xml(junit_path) if os.path.exists(junit_path) else []
+    return TestRunResult(
+        cases=cases,
+        exit_code=exit_code,
+        duration=time.perf_counter() - started,
+        output=output,
+    )
+
+
+class SubprocessExecutor:
+    """Executa cada rodada de testes em um novo processo pytest"""
+
+    def __init__(self, timeout: float = 10):
+        self.timeout = timeout
+
+    def run(
+        self,
+        production_code: str,
+        test_code: str,
+        selection=None,
+        fail_fast: bool = False,
+    ) -> TestRunResult:
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            test_path = write_test_files(tmpdir, production_code, test_code)
+            junit_path = os.path.join(tmpdir, "report.xml")
+            try:
+                result = subprocess.run(
+                    _pytest_command(test_path, junit_path, selection, fail_fast),
+                    capture_output=True,
+                    text=True,
+                    timeout=self.timeout,
+                )
+            except subprocess.TimeoutExpired:
+                return TestRunResult.from_error(
+                    "ERRO: Timeout ao executar testes", time.perf_counter() - started
+                )
+            except Exception as e:
+                return TestRunResult.from_error(
+                    f"ERRO: {str(e)}", time.perf_counter() - started
+                )
+
+            return _collect(
+                junit_path, result.returncode, result.stdout + result.stderr, started
+            )
+
+    async def arun(
+        self,
+        production_code: str,
+        test_code: str,
+        selection=None,
+        fail_fast: bool = False,
+    ) -> TestRunResult:
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            test_path = write_test_files(tmpdir, production_code, test_code)
+            junit_path = os.path.join(tmpdir, "report.xml")
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *_pytest_command(test_path, junit_path, selection, fail_fast),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+            except Exception as e:
+                return TestRunResult.from_error(
+                    f"ERRO: {str(e)}", time.perf_counter() - started
+                )
+
+            try:
+                stdout, _ = await asyncio.wait_for(
+                    process.communicate(), timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                return TestRunResult.from_error(
+                    "ERRO: Timeout ao executar testes", time.perf_counter() - started
+                )
+            finally:
+                # Timeout ou cancelamento da requisição: não deixar pytest órfão
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+            return _collect(
+                junit_path,
+                process.returncode,
+                stdout.decode(errors="replace"),
+                started,
+            )
+
+    def close(self):
+        pass
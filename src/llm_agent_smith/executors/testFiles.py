@@ -0,0 +1,27 @@
+from pathlib import Path
+
+TEST_HEADER = (
+    "import re\nimport sys\nsys.path.insert(0, '.')\nfrom production import *\n\n"
+)
+
+
+def write_test_files(workdir: str, production_code: str, test_code: str) -> Path:
+    """Grava production.py e test_production.py no diretório e retorna o caminho do teste"""
+    prod_path = Path(workdir) / "production.py"
+    prod_path.write_text(production_code)
+
+    test_path = Path(workdir) / "test_production.py"
+    test_path.write_text(TEST_HEADER + test_code)
+    return test_path
+
+
+def selection_args(test_path, selection=None, fail_fast: bool = False) -> list:
+    """Argumentos do pytest para rodar só os testes selecionados, na ordem dada
+
+    `selection` contém ids relativos ao arquivo ("test_x" ou "TestX::test_y");
+    None roda o arquivo inteiro.
+    """
+    args = ["-x"] if fail_fast else []
+    if selection:
+        return args + [f"{test_path}::{test_id}" for test_id in selection]
+    return args + [str(test_path)]
@@ -0,0 +1,138 @@
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+# Quantidade máxima de linhas de traceback guardadas por teste
+TRACEBACK_LINES = 15
+
+NO_TESTS_COLLECTED = 5
+
+
+def trim_traceback(text: str, max_lines: int = TRACEBACK_LINES) -> str:
+    """Mantém apenas as últimas linhas do traceback, onde está o erro"""
+    lines = (text or "").strip().splitlines()
+    if len(lines) <= max_lines:
+        return "\n".join(lines)
+    return "\n".join(["..."] + lines[-max_lines:])
+
+
+def clip_lines(text: str, max_chars: int) -> str:
+    """Mantém as últimas linhas inteiras que cabem em `max_chars`"""
+    if len(text) <= max_chars:
+        return text
+    kept, size = [], 0
+    for line in reversed(text.splitlines()):
+        size += len(line) + 1
+        if size > max_chars and kept:
+            break
+        kept.append(line)
+    return "\n".join(["..."] + kept[::-1])
+
+
+@dataclass
+class TestCaseResult:
+    """Resultado de um único teste coletado pelo pytest"""
+
+    __test__ = False
+
+    nodeid: str
+    outcome: str  # "passed", "failed", "error" ou "skipped"
+    duration: float = 0.0
+    location: Optional[str] = None
+    message: str = ""
+
+    @property
+    def name(self) -> str:
+        return self.nodeid.split("::")[-1]
+
+
+@dataclass
+class TestRunResult:
+    """Resultado estruturado de uma rodada de testes"""
+
+    __test__ = False
+
+    cases: List[TestCaseResult] = field(default_factory=list)
+    exit_code: int = 0
+    duration: float = 0.0
+    output: str = ""
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    skipped: int = 0
+
+    def __post_init__(self):
+        if self.cases and not (
+            self.passed or self.failed or self.errors or self.skipped
+        ):
+            for case in self.cases:
+                if case.outcome == "passed":
+                    self.passed += 1
+                elif case.outcome == "failed":
+                    self.failed += 1
+                elif case.outcome == "skipped":
+                    self.skipped += 1
+                else:
+                    self.errors += 1
+
+    @classmethod
+    def from_error(cls, message: str, duration: float = 0.0) -> "TestRunResult":
+        """Rodada que não chegou a executar testes (timeout, worker morto, etc.)"""
+        return cls(exit_code=-1, duration=duration, output=message, errors=1)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TestRunResult":
+        cases = [TestCaseResult(**case) for case in data.get("cases", [])]
+        return cls(**{**data, "cases": cases})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @property
+    def total(self) -> int:
+        return self.passed + self.failed + self.errors + self.skipped
+
+    @property
+    def all_passed(self) -> bool:
+        return (
+            self.exit_code == 0
+            and self.failed == 0
+            and self.errors == 0
+            and self.passed > 0
+        )
+
+    def failures(self) -> List[TestCaseResult]:
+        return [c for c in self.cases if c.outcome in ("failed", "error")]
+
+    def summary(self) -> str:
+        if not self.total:
+            return self.output.strip() or "Nenhum teste executado"
+        return (
+            f"{self.passed} passaram, {self.failed} falharam, "
+            f"{self.errors} erros, {self.skipped} ignorados em {self.duration:.2f}s"
+        )
+
+    def failure_report(self, limit: int = 5, max_chars: Optional[int] = None) -> str:
+        """Texto compacto com apenas as falhas relevantes, para uso em prompts
+
+        Com `max_chars`, o espaço é dividido entre as falhas e cada mensagem
+        perde as primeiras linhas, nunca o final (onde está o erro).
+        """
+        failures = self.failures()
+        if not failures:
+            summary = self.summary()
+            return clip_lines(summary, max_chars) if max_chars else summary
+
+        shown = failures[:limit]
+        per_failure = max_chars // len(shown) if max_chars else None
+        blocks = []
+        for case in shown:
+            header = f"{case.outcome.upper()} {case.nodeid}"
+            if case.location:
+                header += f" ({case.location})"
+            message = case.message
+            if per_failure:
+                message = clip_lines(message, max(per_failure - len(header), 80))
+            blocks.append(f"{header}\n{message}".strip())
+        if len(failures) > limit:
+            blocks.append(f"... mais {len(failures) - limit} falhas")
+        return "\n\n".join(blocks)
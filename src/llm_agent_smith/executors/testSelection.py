@@ -0,0 +1,64 @@
+import ast
+import hashlib
+from typing import Dict, List, Optional
+
+from llm_agent_smith.executors.testResult import TestRunResult
+from llm_agent_smith.utils.codeAnalysis import parse
+
+
+def _digest(node: ast.AST) -> str:
+    return hashlib.sha256(ast.dump(node).encode()).hexdigest()[:16]
+
+
+def _is_test(node: ast.AST) -> bool:
+    return isinstance(
+        node, (ast.FunctionDef, ast.AsyncFunctionDef)
+    ) and node.name.startswith("test")
+
+
+def identify_tests(test_code: str) -> Dict[str, str]:
+    """Mapeia cada teste ("test_x" ou "TestX::test_y") ao hash do seu AST"""
+    try:
+        tree = parse(test_code)
+    except (SyntaxError, ValueError):
+        return {}
+
+    identities = {}
+    for node in tree.body:
+        if _is_test(node):
+            identities[node.name] = _digest(node)
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            for item in node.body:
+                if _is_test(item):
+                    identities[f"{node.name}::{item.name}"] = _digest(item)
+    return identities
+
+
+def added_tests(old_code: str, new_code: str) -> List[str]:
+    """Testes novos ou alterados entre duas versões do arquivo de testes"""
+    old = identify_tests(old_code)
+    return [
+        test_id
+        for test_id, digest in identify_tests(new_code).items()
+        if old.get(test_id) != digest
+    ]
+
+
+def failing_first(test_results: TestRunResult, test_code: str) -> Optional[List[str]]:
+    """Ordem da fase GREEN: testes que falharam na última rodada, depois o resto
+
+    Retorna None quando a falha não é de um teste identificável (ex.: erro
+    de coleta), caso em que só a suíte completa dá um diagnóstico útil.
+    """
+    identities = identify_tests(test_code)
+    failing = []
+    for case in test_results.failures():
+        # "test_production.py::TestX::test_y[1]" -> "TestX::test_y"
+        test_id = case.nodeid.partition("::")[2].split("[")[0]
+        if test_id not in identities:
+            return None
+        if test_id not in failing:
+            failing.append(test_id)
+    if not failing:
+        return None
+    return failing + [test_id for test_id in identities if test_id not in failing]
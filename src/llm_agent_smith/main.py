@@ -1,97 +1,105 @@
-import re
-from langgraph.graph import StateGraph
-from llm_agent_smith.models.geminiModel import GeminiModel
+import uuid
+
+from langgraph.graph import END, StateGraph
+from config.main import AppConfig
 from llm_agent_smith.states.TDDState import TDDState
-from llm_agent_smith.tools.decomposeFeaturesTool import decompose_features
-from llm_agent_smith.tools.selectNextFeatureTool import select_next_feature
-from datetime import datetime
+from llm_agent_smith.states.sqliteCheckpointer import SQLiteCheckpointer
+from llm_agent_smith.tools.decomposeFeaturesTool import (
+    adecompose_features,
+    decompose_features,
+)
+from llm_agent_smith.tools.featureCycleTool import afeature_cycle, feature_cycle
+from llm_agent_smith.tools.finalizeTool import finalize
+from llm_agent_smith.tools.mergeFeaturesTool import amerge_features, merge_features
+from llm_agent_smith.tools.selectNextFeatureTool import select_ready_features
+from llm_agent_smith.tracing.tracer import traced, traced_node
 
-from llm_agent_smith.tools.writeTestTool import write_test
+graph = StateGraph(TDDState)
+graph.add_node(
+    "decompose_features",
+    traced_node("decompose_features", decompose_features, adecompose_features),
+)
+graph.add_node(
+    "feature_cycle", traced_node("feature_cycle", feature_cycle, afeature_cycle)
+)
+graph.add_node(
+    "merge_features", traced_node("merge_features", merge_features, amerge_features)
+)
+graph.add_node("finalize", traced_node("finalize", finalize))
+
+# Roteamento também é medido: decide o fan-out de cada rodada
+select_features = traced("select_ready_features", select_ready_features)
 
+graph.set_entry_point("decompose_features")
+# Fan-out: um subgrafo por feature cujas dependências já foram integradas
+graph.add_conditional_edges(
+    "decompose_features", select_features, ["feature_cycle", "finalize"]
+)
+# Fan-in: o merge só roda depois que todos os subgrafos da rodada terminam
+graph.add_edge("feature_cycle", "merge_features")
+graph.add_conditional_edges(
+    "merge_features", select_features, ["feature_cycle", "finalize"]
+)
+graph.add_edge("finalize", END)
 
-def run_tests(production_code: str, test_code: str) -> str:
-    """Executa os testes e retorna os resultados"""
-    if not test_code.strip():
-        return "Nenhum teste definido"
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Salvar código de produção
-        prod_path = Path(tmpdir) / "production.py"
-        prod_path.write_text(production_code)
+def build_checkpointer():
+    """Checkpointer configurado em CHECKPOINT_PATH (None: sem checkpoints)"""
+    if not AppConfig.CHECKPOINT_PATH:
+        return None
+    return SQLiteCheckpointer(AppConfig.CHECKPOINT_PATH)
 
-        # Adicionar imports necessários
-        test_content = (
-            "import re\nimport sys\nsys.path.insert(0, '.')\nfrom production import *\n\n"
-            + test_code
-        )
 
-        # Salvar testes
-        test_path = Path(tmpdir) / "test_production.py"
-        test_path.write_text(test_content)
-
-        try:
-            result = subprocess.run(
-                ["pytest", "-v", str(test_path)],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            output = result.stdout + result.stderr
-        except subprocess.TimeoutExpired:
-            output = "ERRO: Timeout ao executar testes"
-        except Exception as e:
-            output = f"ERRO: {str(e)}"
-
-        return output
-
-
-def execute_tests(state: TDDState) -> TDDState:
-    """Executa os testes e armazena os resultados"""
-    test_results = run_tests(state["production_code"], state["test_code"])
-
-    history_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action": "Executar testes",
-        "details": (
-            test_results[:500] + "..." if len(test_results) > 500 else test_results
-        ),
-    }
+tdd_app = graph.compile(checkpointer=build_checkpointer())
 
-    print(
-        f"🧪 Resultado dos testes:\n{test_results[:300]}{'...' if len(test_results) > 300 else ''}"
-    )
 
+def initial_state(user_request: str, output_dir: str = ".") -> TDDState:
     return {
-        **state,
-        "test_results": test_results,
-        "history": state["history"] + [history_entry],
-    }
-
-
-graph = StateGraph(TDDState)
-graph.add_node("decompose_features", decompose_features)
-graph.add_node("select_next_feature", select_next_feature)
-graph.add_node("write_test", write_test)
-
-graph.set_entry_point("decompose_features")
-graph.add_edge("decompose_features", "select_next_feature")
-graph.add_edge("select_next_feature", "write_test")
-
-graph.set_finish_point("write_test")
-
-tdd_app = graph.compile()
-
-if __name__ == "__main__":
-    initial_state: TDDState = {
-        "user_request": "Implemente um validador de CPF que verifique formato e dígitos",
+        "user_request": user_request,
         "features": [],
+        "feature_deps": {},
+        "completed_features": [],
+        "feature_results": [],
         "current_feature": None,
         "production_code": "",
         "test_code": "",
         "test_results": None,
+        "test_scope": None,
+        "preflight_error": None,
+        "preflight_file": None,
+        "test_base": None,
+        "fix_model": None,
+        "tested_code": None,
         "history": [],
         "iteration_count": 0,
+        "output_dir": output_dir,
     }
-    final_state = tdd_app.invoke(initial_state)
+
+
+def run_config(thread_id: str = None, checkpoint_id: str = None) -> dict:
+    """Config da execução; thread_id identifica a execução para retomá-la depois"""
+    configurable = {"thread_id": thread_id or uuid.uuid4().hex}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {
+        "recursion_limit": AppConfig.GRAPH_RECURSION_LIMIT,
+        "max_concurrency": AppConfig.MAX_PARALLEL_FEATURES,
+        "configurable": configurable,
+    }
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    from llm_agent_smith.runner import TDDRunner
+    from llm_agent_smith.tracing.tracer import get_tracer
+
+    final_state = asyncio.run(
+        TDDRunner().run(
+            "Implemente um validador de CPF que verifique formato e dígitos",
+            output_dir=".",
+        )
+    )
     for h in final_state["history"]:
-        print(f"- [{h['timestamp']}] {h['action']}: {h['details']}")
+        print(f"- [{h.timestamp}] {h.action}: {h.details}")
+    get_tracer().export()
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config.main import AppConfig
+from llm_agent_smith.tracing.tracer import get_tracer
+from llm_agent_smith.utils.codeMerge import ModuleUnits
+from llm_agent_smith.utils.promptContext import relevant_symbols
+
+SparseVector = Dict[int, float]
+
+
+# Peso dos pares de palavras vizinhas em relação às palavras isoladas
+BIGRAM_WEIGHT = 0.5
+
+
+def _tokens(text: str) -> Dict[str, float]:
+    plain = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    words = [w for w in re.findall(r"[a-z0-9]+", plain.lower()) if len(w) >= 3]
+    weights: Dict[str, float] = {}
+    for word, count in Counter(words).items():
+        weights[word] = 1.0 + math.log(count)
+    # Pares ("validar cpf") distinguem ordem e contexto sem dominar o cosseno
+    for pair in zip(words, words[1:]):
+        weights[" ".join(pair)] = BIGRAM_WEIGHT
+    return weights
+
+
+class HashingVectorizer:
+    """Vetores esparsos por hashing de palavras: local, sem modelo nem rede
+
+    O hash é estável entre processos (crc32), então vetores gravados em
+    disco continuam comparáveis em execuções futuras.
+    """
+
+    def __init__(self, dim: int = 2**18):
+        self.dim = dim
+
+    def transform(self, text: str) -> SparseVector:
+        vector: SparseVector = defaultdict(float)
+        for token, weight in _tokens(text).items():
+            h = zlib.crc32(token.encode("utf-8"))
+            sign = 1.0 if (h // self.dim) % 2 == 0 else -1.0
+            vector[h % self.dim] += sign * weight
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {i: v / norm for i, v in vector.items() if v} if norm else {}
+
+
+@dataclass
+class MemoryHit:
+    """Feature lembrada e sua similaridade (cosseno) com a consulta"""
+
+    score: float
+    feature: str
+    test_code: str
+    production_code: str
+
+
+class VectorMemory:
+    """Memória de features já implementadas, persistida em SQLite
+
+    Cada entrada guarda a feature, os testes e o código que a fizeram
+    passar. A busca é força bruta sobre um índice invertido em memória:
+    só entradas com alguma dimensão em comum com a consulta são pontuadas.
+    """
+
+    def __init__(self, path: str, vectorizer: Optional[HashingVectorizer] = None):
+        self.path = path
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[str, str, str]] = []
+        self._index: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memories ("
+            " digest TEXT PRIMARY KEY,"
+            " feature TEXT NOT NULL,"
+            " test_code TEXT NOT NULL,"
+            " production_code TEXT NOT NULL,"
+            " vector TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT feature, test_code, production_code, vector FROM memories"
+            " ORDER BY created"
+        )
+        for feature, test_code, production_code, vector in rows:
+            entry = (feature, test_code, production_code)
+            self._insert(entry, {int(i): v for i, v in json.loads(vector).items()})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, entry: Tuple[str, str, str], vector: SparseVector):
+        position = len(self._entries)
+        self._entries.append(entry)
+        for i, weight in vector.items():
+            self._index[i].append((position, weight))
+
+    def add(self, feature: str, test_code: str, production_code: str) -> bool:
+        """Guarda uma feature concluída; False se a mesma entrada já existia"""
+        entry = (feature, test_code, production_code)
+        digest = hashlib.sha256("\x1f".join(entry).encode("utf-8")).hexdigest()
+        vector = self.vectorizer.transform(feature)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO memories VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, *entry, json.dumps(vector), time.time()),
+            )
+            self._conn.commit()
+            if not cursor.rowcount:
+                return False
+            self._insert(entry, vector)
+        return True
+
+    def search(self, text: str, k: int = 3, min_score: float = 0.0) -> List[MemoryHit]:
+        """As `k` features mais parecidas com `text`, da mais para a menos similar"""
+        scores: Dict[int, float] = defaultdict(float)
+        with self._lock:
+            for i, weight in self.vectorizer.transform(text).items():
+                for position, other in self._index.get(i, ()):
+                    scores[position] += weight * other
+            ranked = sorted(scores.items(), key=lambda item: -item[1])
+            entries = self._entries
+            return [
+                MemoryHit(round(score, 4), *entries[position])
+                for position, score in ranked[:k]
+                if score >= min_score
+            ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_memory = None
+
+
+def get_memory() -> Optional[VectorMemory]:
+    """Memória configurada (None se MEMORY_PATH não definido)"""
+    global _memory
+    if _memory is None and AppConfig.MEMORY_PATH:
+        _memory = VectorMemory(AppConfig.MEMORY_PATH)
+    return _memory
+
+
+def set_memory(memory: Optional[VectorMemory]):
+    global _memory
+    _memory = memory
+
+
+def recall(feature: str) -> Tuple[Optional[MemoryHit], List[MemoryHit]]:
+    """Busca a feature na memória: (entrada reutilizável, exemplos few-shot)
+
+    Uma entrada com similaridade acima de MEMORY_REUSE_SIMILARITY é
+    reaproveitada sem chamar o LLM; as acima de MEMORY_EXAMPLE_SIMILARITY
+    entram no prompt como exemplos.
+    """
+    memory = get_memory()
+    if memory is None or not feature:
+        return None, []
+    hits = memory.search(
+        feature,
+        k=AppConfig.MEMORY_EXAMPLES,
+        min_score=AppConfig.MEMORY_EXAMPLE_SIMILARITY,
+    )
+    reuse = (
+        hits[0] if hits and hits[0].score >= AppConfig.MEMORY_REUSE_SIMILARITY else None
+    )
+    if reuse is not None:
+        result = "reuse"
+    else:
+        result = "examples" if hits else "miss"
+    get_tracer().record_memory(result, hits[0].score if hits else 0.0)
+    return reuse, hits
+
+
+def few_shot_examples(hits: List[MemoryHit], field: str) -> str:
+    """Bloco de exemplos para o prompt (vazio sem exemplos)"""
+    if not hits:
+        return ""
+    blocks = [
+        f"### Exemplo: {hit.feature}\n```python\n{getattr(hit, field).strip()}\n```"
+        for hit in hits
+    ]
+    return (
+        "Exemplos de features parecidas já resolvidas:\n\n"
+        + "\n\n".join(blocks)
+        + "\n\n"
+    )
+
+
+def _delta(base: str, final: str) -> str:
+    """Unidades que a feature criou ou alterou, com as dependências delas"""
+    try:
+        before = ModuleUnits.parse(base) if base.strip() else ModuleUnits()
+        after = ModuleUnits.parse(final)
+    except SyntaxError:
+        return final
+    changed = [key for key, s in after.units.items() if before.units.get(key) != s]
+    keep = set(relevant_symbols(after, seeds=changed))
+    delta = ModuleUnits()
+    delta.imports = after.imports
+    delta.units = {key: s for key, s in after.units.items() if key in keep}
+    return delta.render()
+
+
+def remember_feature(feature: str, base: dict, result: dict) -> bool:
+    """Guarda o que a feature acrescentou aos testes e ao código, se passou"""
+    memory = get_memory()
+    if memory is None:
+        return False
+    test_code = _delta(base["test_code"], result["test_code"])
+    production_code = _delta(base["production_code"], result["production_code"])
+    if not test_code.strip() or not production_code.strip():
+        return False
+    return memory.add(feature, test_code, production_code)
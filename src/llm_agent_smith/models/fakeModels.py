@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from config.main import AppConfig
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+
+# Regras genéricas, aplicadas depois das regras do roteiro
+DEFAULT_RULES = [
+    # Refatoração: devolve o código atual sem mudanças
+    {
+        "match": r"^Refatore o código.*?Código atual:\n(.*)\n\nDiretrizes:",
+        "template": "```python\n{1}\n```",
+    },
+    # Decomposição sem roteiro: resposta vazia vira uma única feature
+    {"match": r"^Solicitação do usuário:", "responses": ["[]"]},
+]
+
+
+def prompt_digest(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def _estimate_usage(prompt: str, text: str) -> dict:
+    # Aproximação de ~4 caracteres por token, suficiente para as métricas
+    input_tokens, output_tokens = len(prompt) // 4, len(text) // 4
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+class OfflineChatModel(BaseChatModel):
+    """Base dos modelos sem rede: resposta completa ou em chunks por linha"""
+
+    model: str = "offline"
+    temperature: float = 0.0
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline"
+
+    def respond(self, prompt: str) -> Tuple[str, Optional[dict]]:
+        """Texto da resposta e usage_metadata para o prompt"""
+        raise NotImplementedError
+
+    def _reply(self, messages: List[BaseMessage]) -> Tuple[str, Optional[dict]]:
+        prompt = "\n".join(str(m.content) for m in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(prompt)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage = self._reply(messages)
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        text, usage = self._reply(messages)
+        for line in text.splitlines(keepends=True):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=line))
+        # O uso de tokens vem no último chunk, como nos provedores reais
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=usage)
+        )
+
+
+def load_script(path: str) -> List[dict]:
+    """Regras de um roteiro JSON: lista de regras ou {"rules": [...]}"""
+    with open(path, encoding="utf-8") as f:
+        script = json.load(f)
+    return script["rules"] if isinstance(script, dict) else script
+
+
+class ScriptedChatModel(OfflineChatModel):
+    """Modelo determinístico guiado por um roteiro de regras
+
+    Cada regra tem `match` (regex procurada no prompt) e `responses`
+    (devolvidas em ordem a cada repetição do mesmo prompt; a última se
+    repete) ou `template` (formatado com os grupos do match: {1}, {2}...).
+    Vale a primeira regra que casar; nenhuma regra é um erro.
+    """
+
+    model: str = "fake"
+    rules: List[dict] = []
+
+    _compiled: list = PrivateAttr(default_factory=list)
+    _calls: Dict[Tuple[int, str], int] = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context):
+        self._compiled = [
+            re.compile(rule["match"], re.DOTALL | re.MULTILINE) for rule in self.rules
+        ]
+
+    def respond(self, prompt: str) -> Tuple[str, Optional[dict]]:
+        for index, (rule, pattern) in enumerate(zip(self.rules, self._compiled)):
+            found = pattern.search(prompt)
+            if found is None:
+                continue
+            if "template" in rule:
+                text = rule["template"].format(found.group(0), *found.groups())
+            else:
+                key = (index, prompt_digest(prompt))
+                with self._lock:
+                    call = self._calls.get(key, 0)
+                    self._calls[key] = call + 1
+                responses = rule["responses"]
+                text = responses[min(call, len(responses) - 1)]
+            return text, _estimate_usage(prompt, text)
+        raise LookupError(f"Nenhuma regra do roteiro corresponde ao prompt:\n{prompt}")
+
+
+class ReplayChatModel(OfflineChatModel):
+    """Reproduz respostas gravadas em JSONL, indexadas pelo hash do prompt
+
+    Com `inner`, prompts sem gravação são enviados ao modelo real e a
+    resposta é acrescentada ao arquivo (modo de gravação). Sem `inner`, um
+    prompt desconhecido é um erro. Prompts repetidos recebem as respostas
+    na ordem em que foram gravadas.
+    """
+
+    model: str = "replay"
+    path: str
+    inner: Optional[BaseChatModel] = None
+
+    _records: Dict[str, List[dict]] = PrivateAttr(default_factory=dict)
+    _calls: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records.setdefault(record["key"], []).append(record)
+
+    def respond(self, prompt: str) -> Tuple[str, Optional[dict]]:
+        key = prompt_digest(prompt)
+        with self._lock:
+            call = self._calls.get(key, 0)
+            self._calls[key] = call + 1
+            records = self._records.get(key, [])
+        if call < len(records) or (records and self.inner is None):
+            record = records[min(call, len(records) - 1)]
+            return record["response"], record.get("usage")
+        if self.inner is None:
+            raise LookupError(f"Prompt sem gravação em {self.path}:\n{prompt}")
+        return self._record(key, prompt)
+
+    def _record(self, key: str, prompt: str) -> Tuple[str, Optional[dict]]:
+        message = self.inner.invoke(prompt)
+        usage = dict(getattr(message, "usage_metadata", None) or {}) or None
+        record = {
+            "key": key,
+            "prompt": prompt,
+            "response": str(message.content),
+            "usage": usage,
+        }
+        with self._lock:
+            self._records.setdefault(key, []).append(record)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record["response"], usage
+
+
+def _argument(model_name: str) -> str:
+    return model_name.partition(":")[2]
+
+
+def _build_scripted(model_name: str, **params):
+    path = _argument(model_name)
+    rules = (load_script(path) if path else []) + DEFAULT_RULES
+    return ScriptedChatModel(
+        model=model_name, rules=rules, latency=AppConfig.FAKE_LLM_LATENCY
+    )
+
+
+def _build_replay(model_name: str, **params):
+    return ReplayChatModel(
+        model=model_name, path=_argument(model_name), latency=AppConfig.FAKE_LLM_LATENCY
+    )
+
+
+def _build_recorder(model_name: str, **params):
+    return ReplayChatModel(
+        model=model_name,
+        path=_argument(model_name),
+        inner=ModelRegistry.get(AppConfig.LLM_RECORD_MODEL, **params),
+    )
+
+
+# DEFAULT_LLM_MODEL="fake:roteiro.json", "replay:gravacao.jsonl" ou
+# "record:gravacao.jsonl" (grava as respostas de LLM_RECORD_MODEL)
+ModelRegistry.register_backend("fake", _build_scripted)
+ModelRegistry.register_backend("replay", _build_replay)
+ModelRegistry.register_backend("record", _build_recorder)
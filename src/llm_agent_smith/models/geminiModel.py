@@ -1,8 +1,30 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from config.main import AppConfig
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+
+# Registra os backends offline "fake", "replay" e "record"
+from llm_agent_smith.models import fakeModels  # noqa: F401
+
+
+def _build_gemini(model_name: str, **params):
+    # Import tardio: o SDK do Gemini é pesado e só é necessário com chave válida
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    AppConfig.validate()
+    # Erros de cota são repetidos pelo LLMScheduler; os retries do SDK se
+    # somariam aos dele, sem respeitar a fila
+    params.setdefault("max_retries", 0)
+    if AppConfig.GEMINI_API_ENDPOINT:
+        params.setdefault("transport", "rest")
+        params.setdefault(
+            "client_options", {"api_endpoint": AppConfig.GEMINI_API_ENDPOINT}
+        )
+    return ChatGoogleGenerativeAI(model=model_name, **params)
+
+
+ModelRegistry.set_factory(_build_gemini)
 
 
 class GeminiModel:
     @staticmethod
-    def llm_model():
-        return ChatGoogleGenerativeAI(model=AppConfig.DEFAULT_LLM_MODEL)
+    def llm_model(model_name: str = None, **params):
+        return ModelRegistry.get(model_name or AppConfig.DEFAULT_LLM_MODEL, **params)
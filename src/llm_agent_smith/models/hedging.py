@@ -0,0 +1,197 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures import wait
+from typing import Callable, Deque, Dict, Optional
+
+from config.main import AppConfig
+from llm_agent_smith.tracing.tracer import current_node, get_tracer
+
+
+class HedgingPolicy:
+    """Duplica chamadas lentas ao LLM e fica com a primeira resposta
+
+    Para cada nó são guardadas as latências recentes; uma chamada que passa
+    do percentil `percentile` delas ganha uma cópia, e a que terminar
+    depois é cancelada. Nas últimas `window` chamadas, no máximo uma fração
+    `max_rate` é duplicada, o que limita o custo extra.
+
+    `func(cancelled)` executa uma tentativa; `cancelled` (threading.Event)
+    é sinalizado quando a tentativa perdeu e pode parar de consumir a
+    resposta (na versão assíncrona a task é cancelada).
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_rate: float = 0.1,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._recent: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def hedge_delay(self, node: Optional[str] = None) -> Optional[float]:
+        """Espera antes de duplicar uma chamada do nó (None: poucas amostras)"""
+        with self._lock:
+            samples = sorted(self._latencies.get(node or current_node() or "-", ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(self.percentile * len(samples)))
+        return samples[index]
+
+    def record(self, node: Optional[str], seconds: float, hedged: bool = False):
+        with self._lock:
+            history = self._latencies.setdefault(
+                node or "-", deque(maxlen=self._recent.maxlen)
+            )
+            history.append(seconds)
+            self._recent.append(hedged)
+
+    def _allow_hedge(self) -> bool:
+        with self._lock:
+            hedges = sum(self._recent)
+            return hedges + 1 <= self.max_rate * (len(self._recent) + 1)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+            return self._pool
+
+    def run(self, func: Callable, on_hedge: Optional[Callable] = None):
+        """Executa `func` (síncrona), duplicando-a se demorar demais"""
+        node = current_node()
+        delay = self.hedge_delay(node)
+        if delay is None:
+            started = time.perf_counter()
+            result = func(threading.Event())
+            self.record(node, time.perf_counter() - started)
+            return result
+
+        pool = self._executor()
+        attempts = {}
+
+        def submit(index: int):
+            cancelled, began = threading.Event(), threading.Event()
+
+            def attempt():
+                began.set()
+                started = time.perf_counter()
+                return func(cancelled), time.perf_counter() - started
+
+            future = pool.submit(contextvars.copy_context().run, attempt)
+            attempts[future] = (index, cancelled)
+            return future, began
+
+        primary, began = submit(0)
+        # O prazo conta a partir do início da chamada, não do submit: tempo na
+        # fila do pool (threads ocupadas por outras chamadas) não é latência
+        began.wait()
+        try:
+            result, seconds = primary.result(timeout=delay)
+            self.record(node, seconds)
+            return result
+        except FutureTimeout:
+            pass
+        if not self._allow_hedge():
+            result, seconds = primary.result()
+            self.record(node, seconds)
+            return result
+
+        if on_hedge is not None:
+            on_hedge()
+        submit(1)
+        pending, error = set(attempts), None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    attempts[loser][1].set()
+                    loser.cancel()
+                result, seconds = future.result()
+                won = attempts[future][0] == 1
+                self.record(node, seconds, hedged=True)
+                get_tracer().record_llm_hedge(won)
+                return result
+        raise error
+
+    async def arun(self, func: Callable, on_hedge: Optional[Callable] = None):
+        """Versão assíncrona de run (`func(cancelled)` retorna um awaitable)"""
+        node = current_node()
+        delay = self.hedge_delay(node)
+
+        async def attempt():
+            started = time.perf_counter()
+            return await func(threading.Event()), time.perf_counter() - started
+
+        primary = asyncio.ensure_future(attempt())
+        tasks = {primary}
+        try:
+            hedge = False
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                hedge = not done and self._allow_hedge()
+            if not hedge:
+                result, seconds = await primary
+                self.record(node, seconds)
+                return result
+
+            if on_hedge is not None:
+                on_hedge()
+            secondary = asyncio.ensure_future(attempt())
+            tasks.add(secondary)
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    result, seconds = task.result()
+                    self.record(node, seconds, hedged=True)
+                    get_tracer().record_llm_hedge(task is secondary)
+                    return result
+            raise error
+        finally:
+            # A perdedora (ou todas, se a chamada foi cancelada) é cancelada
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def get_hedging_policy() -> Optional[HedgingPolicy]:
+    """Política configurada (None se LLM_HEDGE_PERCENTILE for 0)"""
+    global _policy
+    if _policy is None and AppConfig.LLM_HEDGE_PERCENTILE:
+        with _policy_lock:
+            if _policy is None:
+                _policy = HedgingPolicy(
+                    percentile=AppConfig.LLM_HEDGE_PERCENTILE,
+                    max_rate=AppConfig.LLM_HEDGE_MAX_RATE,
+                    min_samples=AppConfig.LLM_HEDGE_MIN_SAMPLES,
+                )
+    return _policy
+
+
+def set_hedging_policy(policy: Optional[HedgingPolicy]):
+    global _policy
+    _policy = policy
@@ -0,0 +1,275 @@
+import functools
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from config.main import AppConfig
+from llm_agent_smith.cache.llmResponseCache import LLMResponseCache
+from llm_agent_smith.models.geminiModel import GeminiModel
+from llm_agent_smith.models.hedging import get_hedging_policy
+from llm_agent_smith.models.llmScheduler import get_llm_scheduler
+from llm_agent_smith.models.modelRouter import get_model_router, note_route
+from llm_agent_smith.tracing.tracer import current_node, get_tracer
+from llm_agent_smith.utils.codeUtils import CodeBlockStream
+from llm_agent_smith.utils.promptContext import estimate_tokens
+
+_cache = None
+
+# Uso de tokens acumulado pela execução corrente (ver track_token_usage)
+_token_usage: ContextVar[Optional[dict]] = ContextVar("token_usage", default=None)
+
+
+def get_llm_cache():
+    """Retorna o cache de respostas configurado (None se LLM_CACHE_PATH não definido)"""
+    global _cache
+    if _cache is None and AppConfig.LLM_CACHE_PATH:
+        _cache = LLMResponseCache(
+            AppConfig.LLM_CACHE_PATH,
+            max_entries=AppConfig.LLM_CACHE_MAX_ENTRIES,
+            ttl=AppConfig.LLM_CACHE_TTL,
+        )
+    return _cache
+
+
+def set_llm_cache(cache):
+    global _cache
+    _cache = cache
+
+
+def _empty_usage() -> dict:
+    return {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+
+def track_token_usage() -> dict:
+    """Passa a somar, no contexto atual, os tokens das chamadas ao LLM
+
+    Tasks e nós do grafo herdam o contexto, então o dict retornado acumula
+    o uso de toda a execução iniciada a partir daqui. Respostas vindas do
+    cache não consomem tokens.
+    """
+    usage = _empty_usage()
+    _token_usage.set(usage)
+    return usage
+
+
+def _record_usage(message, usage: dict):
+    """Soma o usage_metadata da resposta (ou do chunk) em `usage`"""
+    metadata = getattr(message, "usage_metadata", None)
+    if metadata:
+        for key in usage:
+            usage[key] += metadata.get(key) or 0
+
+
+def _account(span, llm, usage: dict, cache_hit: bool = False):
+    total = _token_usage.get()
+    if total is not None:
+        for key in total:
+            total[key] += usage.get(key, 0)
+    get_tracer().record_llm(span, model_identity(llm)[0], usage, cache_hit)
+
+
+def model_identity(llm) -> tuple:
+    """Nome do modelo e temperatura, usados na chave do cache"""
+    name = getattr(llm, "model", None) or getattr(llm, "model_name", None)
+    return str(name or type(llm).__name__), getattr(llm, "temperature", None)
+
+
+def _cache_lookup(llm, prompt_value, cache_salt: str):
+    """Retorna (cache, chave, resposta em cache ou None)"""
+    cache = get_llm_cache()
+    if cache is None:
+        return None, None, None
+    model, temperature = model_identity(llm)
+    key = cache.make_key(prompt_value.to_string(), model, temperature, cache_salt)
+    return cache, key, cache.get(key)
+
+
+def _store(cache, key, llm, response) -> str:
+    content = str(getattr(response, "content", response))
+    if cache is not None:
+        cache.put(key, content, model_identity(llm)[0])
+    return content
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "") for part in content
+        )
+    return str(content)
+
+
+def _stream_until_code(llm, prompt_value, usage: dict, cancelled=None) -> str:
+    """Consome o stream e o encerra assim que o bloco de código fecha
+
+    Também encerra se `cancelled` (threading.Event) for sinalizado, por
+    exemplo quando uma cópia da chamada (hedging) respondeu antes.
+    """
+    stream = CodeBlockStream()
+    chunks = llm.stream(prompt_value)
+    try:
+        for chunk in chunks:
+            _record_usage(chunk, usage)
+            if stream.feed(_chunk_text(chunk)):
+                break
+            if cancelled is not None and cancelled.is_set():
+                break
+    finally:
+        # Fechar o gerador interrompe a geração no provedor
+        chunks.close()
+    return stream.text
+
+
+async def _astream_until_code(llm, prompt_value, usage: dict) -> str:
+    stream = CodeBlockStream()
+    chunks = llm.astream(prompt_value)
+    try:
+        async for chunk in chunks:
+            _record_usage(chunk, usage)
+            if stream.feed(_chunk_text(chunk)):
+                break
+    finally:
+        await chunks.aclose()
+    return stream.text
+
+
+def _reserved_tokens(prompt_value) -> int:
+    """Tokens reservados no agendador antes de conhecer o consumo real"""
+    return (
+        estimate_tokens(prompt_value.to_string()) + AppConfig.LLM_RESERVED_OUTPUT_TOKENS
+    )
+
+
+def _settle(scheduler, reserved: int, usage: dict):
+    # Sem usage_metadata na resposta, a reserva fica como estimativa
+    if usage["total_tokens"]:
+        scheduler.settle(reserved, usage["total_tokens"])
+
+
+def _streams(until_code_block: bool) -> bool:
+    return until_code_block and AppConfig.LLM_STREAM_CODE
+
+
+def _route(prompt_value, escalation: int):
+    """(nó, modelo escolhido pelo ModelRouter, cliente do modelo)"""
+    node = current_node()
+    model_name = get_model_router().select(
+        node, escalation, estimate_tokens(prompt_value.to_string())
+    )
+    note_route(node, model_name)
+    return node, model_name, GeminiModel.llm_model(model_name)
+
+
+def _timed(call, node: str, model_name: str):
+    """`call` medido por dentro do agendador: fila e backoff não contam"""
+
+    def timed():
+        started = time.perf_counter()
+        result = call()
+        get_model_router().record_call(node, model_name, time.perf_counter() - started)
+        return result
+
+    return timed
+
+
+def _atimed(call, node: str, model_name: str):
+    """Versão assíncrona de _timed"""
+
+    async def timed():
+        started = time.perf_counter()
+        result = await call()
+        get_model_router().record_call(node, model_name, time.perf_counter() - started)
+        return result
+
+    return timed
+
+
+def invoke_llm(
+    prompt: ChatPromptTemplate,
+    variables: dict,
+    cache_salt: str = "",
+    until_code_block: bool = False,
+    escalation: int = 0,
+) -> str:
+    """Renderiza o prompt, consulta o cache e só então chama o LLM
+
+    `cache_salt` diferencia chamadas com o mesmo prompt que devem gerar
+    respostas distintas (ex.: nova tentativa de correção). Com
+    `until_code_block=True` a resposta é lida em streaming e cortada logo
+    após o fechamento do bloco ```python, descartando a prosa seguinte.
+    `escalation` (tentativas que já falharam) pode levar a um modelo mais
+    forte, conforme a rota do nó (ver ModelRouter).
+    """
+    prompt_value = prompt.invoke(variables)
+    node, model_name, llm = _route(prompt_value, escalation)
+
+    with get_tracer().span("llm", model_identity(llm)[0]) as span:
+        cache, key, cached = _cache_lookup(llm, prompt_value, cache_salt)
+        if cached is not None:
+            _account(span, llm, _empty_usage(), cache_hit=True)
+            return cached
+
+        def request(cancelled=None):
+            usage = _empty_usage()
+            if _streams(until_code_block):
+                text = _stream_until_code(llm, prompt_value, usage, cancelled)
+                return text, usage
+            response = llm.invoke(prompt_value)
+            _record_usage(response, usage)
+            return response, usage
+
+        scheduler, reserved = get_llm_scheduler(), _reserved_tokens(prompt_value)
+        hedging = get_hedging_policy()
+        call = request
+        if hedging is not None:
+            # A cópia de uma chamada lenta também conta nos limites do agendador
+            charge = functools.partial(scheduler.charge, reserved)
+            call = functools.partial(hedging.run, request, charge)
+        response, usage = scheduler.call(_timed(call, node, model_name), reserved)
+        _settle(scheduler, reserved, usage)
+        _account(span, llm, usage)
+        return _store(cache, key, llm, response)
+
+
+async def ainvoke_llm(
+    prompt: ChatPromptTemplate,
+    variables: dict,
+    cache_salt: str = "",
+    until_code_block: bool = False,
+    escalation: int = 0,
+) -> str:
+    """Versão assíncrona de invoke_llm"""
+    prompt_value = prompt.invoke(variables)
+    node, model_name, llm = _route(prompt_value, escalation)
+
+    with get_tracer().span("llm", model_identity(llm)[0]) as span:
+        cache, key, cached = _cache_lookup(llm, prompt_value, cache_salt)
+        if cached is not None:
+            _account(span, llm, _empty_usage(), cache_hit=True)
+            return cached
+
+        async def request(cancelled=None):
+            usage = _empty_usage()
+            if _streams(until_code_block):
+                text = await _astream_until_code(llm, prompt_value, usage)
+                return text, usage
+            response = await llm.ainvoke(prompt_value)
+            _record_usage(response, usage)
+            return response, usage
+
+        scheduler, reserved = get_llm_scheduler(), _reserved_tokens(prompt_value)
+        hedging = get_hedging_policy()
+        call = request
+        if hedging is not None:
+            # A cópia de uma chamada lenta também conta nos limites do agendador
+            charge = functools.partial(scheduler.charge, reserved)
+            call = functools.partial(hedging.arun, request, charge)
+        response, usage = await scheduler.acall(
+            _atimed(call, node, model_name), reserved
+        )
+        _settle(scheduler, reserved, usage)
+        _account(span, llm, usage)
+        return _store(cache, key, llm, response)
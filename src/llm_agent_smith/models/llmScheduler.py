@@ -0,0 +1,259 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+from config.main import AppConfig
+from llm_agent_smith.tracing.tracer import current_node, get_tracer
+
+# Menor valor sai primeiro da fila: destravar um GREEN vale mais que
+# começar uma decomposição nova
+NODE_PRIORITIES = {
+    "implement_fix": 0,
+    "write_test": 1,
+    "refactor": 2,
+    "decompose_features": 3,
+}
+DEFAULT_PRIORITY = 2
+
+# Intervalo máximo entre verificações de quem espera na fila
+POLL_INTERVAL = 0.05
+
+
+def node_priority(node: Optional[str] = None) -> int:
+    """Prioridade das chamadas feitas pelo nó (por padrão, o nó atual do trace)"""
+    return NODE_PRIORITIES.get(node or current_node(), DEFAULT_PRIORITY)
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """429/RESOURCE_EXHAUSTED ou 503 do provedor: vale esperar e repetir"""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code in (429, 503):
+        return True
+    text = f"{type(error).__name__} {error}"
+    return any(
+        marker in text
+        for marker in ("ResourceExhausted", "RESOURCE_EXHAUSTED", "TooManyRequests")
+    )
+
+
+class TokenBucket:
+    """Balde de fichas reabastecido continuamente (`per_minute` por minuto)
+
+    Um limite <= 0 desativa o balde. O saldo pode ficar negativo quando o
+    consumo real supera o reservado; a dívida atrasa as próximas chamadas.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self):
+        now = self._clock()
+        self.available = min(
+            self.capacity, self.available + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Segundos até haver `amount` fichas (0: disponível agora)"""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        """Consome `amount` fichas (negativo devolve, até a capacidade)"""
+        if not self.unlimited:
+            self._refill()
+            self.available = min(self.capacity, self.available - amount)
+
+    def drain(self):
+        """Zera o saldo (ex.: após um 429, o provedor já está no limite)"""
+        if not self.unlimited:
+            self._refill()
+            self.available = min(self.available, 0.0)
+
+
+class LLMScheduler:
+    """Fila de prioridade e limites de requisições/tokens por minuto
+
+    Compartilhado por todas as execuções do processo (threads e event
+    loops): só o primeiro da fila é liberado, quando os dois baldes têm
+    saldo. Em erro de cota a chamada volta para a fila após um backoff
+    exponencial com jitter, e a fila inteira pausa pelo mesmo intervalo.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._lock = threading.Condition()
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def _enqueue(self, priority: int) -> tuple:
+        ticket = (priority, next(self._seq))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            get_tracer().record_llm_queue(len(self._queue))
+        return ticket
+
+    def _leave(self, ticket: tuple):
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+            get_tracer().record_llm_queue(len(self._queue))
+            self._lock.notify_all()
+
+    def _try_admit(self, ticket: tuple, tokens: int) -> float:
+        """0 se `ticket` foi liberado; senão, quanto esperar antes de tentar de novo"""
+        with self._lock:
+            if self._queue[0] != ticket:
+                return POLL_INTERVAL
+            wait = max(
+                self._paused_until - self._clock(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens),
+            )
+            if wait > 0:
+                return min(wait, self.backoff_max)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            heapq.heappop(self._queue)
+            get_tracer().record_llm_queue(len(self._queue))
+            self._lock.notify_all()
+            return 0.0
+
+    def acquire(self, priority: int, tokens: int) -> float:
+        """Bloqueia até a vez da chamada; retorna o tempo de espera"""
+        started = self._clock()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try_admit(ticket, tokens)
+                if not wait:
+                    break
+                with self._lock:
+                    self._lock.wait(wait)
+        except BaseException:
+            self._leave(ticket)
+            raise
+        return self._clock() - started
+
+    async def aacquire(self, priority: int, tokens: int) -> float:
+        """Versão assíncrona de acquire (não bloqueia o event loop)"""
+        started = self._clock()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try_admit(ticket, tokens)
+                if not wait:
+                    break
+                await asyncio.sleep(min(wait, POLL_INTERVAL))
+        except BaseException:
+            self._leave(ticket)
+            raise
+        return self._clock() - started
+
+    def charge(self, tokens: int):
+        """Debita uma chamada extra sem passar pela fila (ex.: hedging)"""
+        with self._lock:
+            self.requests.take(1)
+            self.tokens.take(tokens)
+
+    def settle(self, reserved: int, used: int):
+        """Ajusta o balde de tokens pelo consumo real da chamada"""
+        with self._lock:
+            self.tokens.take(used - reserved)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """Registra o erro de cota e pausa a fila; retorna o atraso sorteado"""
+        # Jitter "full": espalha as novas tentativas de quem bateu no limite junto
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        with self._lock:
+            self.requests.drain()
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+        get_tracer().record_llm_quota_error(delay)
+        print(
+            f"⏳ Cota do LLM excedida ({type(error).__name__}); nova tentativa em {delay:.1f}s"
+        )
+        return delay
+
+    def call(self, func: Callable, tokens: int, priority: Optional[int] = None):
+        """Executa `func()` quando liberado, repetindo em erro de cota"""
+        priority = node_priority() if priority is None else priority
+        for attempt in itertools.count():
+            get_tracer().record_llm_wait(self.acquire(priority, tokens))
+            try:
+                return func()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_quota_error(e):
+                    raise
+                time.sleep(self._backoff(attempt, e))
+
+    async def acall(self, func: Callable, tokens: int, priority: Optional[int] = None):
+        """Versão assíncrona de call (`func()` retorna um awaitable)"""
+        priority = node_priority() if priority is None else priority
+        for attempt in itertools.count():
+            get_tracer().record_llm_wait(await self.aacquire(priority, tokens))
+            try:
+                return await func()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_quota_error(e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Agendador compartilhado, configurado por AppConfig na primeira chamada"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler(
+                    requests_per_minute=AppConfig.LLM_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=AppConfig.LLM_TOKENS_PER_MINUTE,
+                    max_retries=AppConfig.LLM_QUOTA_RETRIES,
+                    backoff_base=AppConfig.LLM_BACKOFF_BASE,
+                    backoff_max=AppConfig.LLM_BACKOFF_MAX,
+                )
+    return _scheduler
+
+
+def set_llm_scheduler(scheduler: Optional[LLMScheduler]):
+    """Substitui o agendador (None: recria a partir de AppConfig)"""
+    global _scheduler
+    _scheduler = scheduler
@@ -0,0 +1,69 @@
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+
+ModelFactory = Callable[..., BaseChatModel]
+
+
+class ModelRegistry:
+    """Registro compartilhado de clientes LLM, criados sob demanda
+
+    Cada combinação (modelo, parâmetros) gera um único cliente reutilizado
+    por todos os tools, mantendo um só pool de conexões keep-alive. Um modelo
+    local (ex.: fake para testes offline) pode ser injetado com `use`, ou
+    escolhido pelo nome com um prefixo de backend (ex.: "fake:roteiro.json").
+    """
+
+    _models: Dict[Tuple[str, Tuple[Tuple[str, Hashable], ...]], BaseChatModel] = {}
+    _factory: Optional[ModelFactory] = None
+    _backends: Dict[str, ModelFactory] = {}
+    _override: Optional[BaseChatModel] = None
+    # Reentrante: uma fábrica pode obter do registro o modelo que embrulha
+    _lock = threading.RLock()
+
+    @classmethod
+    def set_factory(cls, factory: ModelFactory):
+        """Define a função que constrói o cliente real a partir do nome do modelo"""
+        cls._factory = factory
+
+    @classmethod
+    def register_backend(cls, prefix: str, factory: ModelFactory):
+        """Usa `factory` para os nomes `prefix` e `prefix:argumento`"""
+        cls._backends[prefix] = factory
+
+    @classmethod
+    def _factory_for(cls, model_name: str) -> Optional[ModelFactory]:
+        prefix = model_name.partition(":")[0]
+        return cls._backends.get(prefix, cls._factory)
+
+    @classmethod
+    def use(cls, model: Optional[BaseChatModel]):
+        """Força todos os tools a usarem este modelo (None remove a substituição)"""
+        cls._override = model
+
+    @classmethod
+    def get(cls, model_name: str, **params) -> BaseChatModel:
+        if cls._override is not None:
+            return cls._override
+
+        key = (model_name, tuple(sorted(params.items())))
+        model = cls._models.get(key)
+        if model is not None:
+            return model
+
+        with cls._lock:
+            model = cls._models.get(key)
+            if model is None:
+                factory = cls._factory_for(model_name)
+                if factory is None:
+                    raise RuntimeError("Nenhuma fábrica de modelos registrada")
+                model = factory(model_name, **params)
+                cls._models[key] = model
+        return model
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._models.clear()
+            cls._override = None
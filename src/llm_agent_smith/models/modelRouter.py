@@ -0,0 +1,183 @@
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from config.main import AppConfig
+from llm_agent_smith.tracing.tracer import current_node, get_tracer
+
+# Amostras de uma rota antes que a taxa de sucesso dela influencie a escolha
+MIN_ROUTE_SAMPLES = 10
+
+# Modelos usados pelas chamadas da execução corrente (ver track_llm_routes)
+_routes: ContextVar[Optional[list]] = ContextVar("llm_routes", default=None)
+
+
+def parse_routes(spec: str) -> Dict[str, List[str]]:
+    """Lê rotas no formato "nó=modelo>modelo;..." (ver AppConfig.LLM_ROUTES)
+
+    Retorna {nó: escada de modelos, do mais barato ao mais forte}; o nó "*"
+    vale para os nós não listados.
+    """
+    routes = {}
+    for entry in spec.split(";"):
+        node, _, ladder = entry.partition("=")
+        models = [model.strip() for model in ladder.split(">") if model.strip()]
+        if node.strip() and models:
+            routes[node.strip()] = models
+    return routes
+
+
+class ModelRouter:
+    """Escolhe o modelo de cada chamada ao LLM pelo nó e pelas tentativas
+
+    Cada nó tem uma escada de modelos: a primeira tentativa usa o degrau
+    mais barato e, a cada `escalate_after` tentativas que falharam, a
+    chamada sobe um degrau. Prompts de até `light_prompt_tokens` tokens sem
+    tentativas anteriores vão para `light_model`. Com `min_success`, um
+    degrau cuja taxa de sucesso observada (no nó) fica abaixo dela é pulado.
+
+    Latência e sucesso de cada rota (nó, modelo) são acumulados em `stats`
+    e nas métricas tdd_llm_routes_total e tdd_llm_seconds.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, List[str]]] = None,
+        escalate_after: int = 1,
+        light_model: str = "",
+        light_prompt_tokens: int = 0,
+        min_success: float = 0.0,
+    ):
+        self.routes = routes or {}
+        self.escalate_after = max(1, escalate_after)
+        self.light_model = light_model
+        self.light_prompt_tokens = light_prompt_tokens
+        self.min_success = min_success
+        self._stats: Dict[Tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    def ladder(self, node: Optional[str]) -> List[str]:
+        return (
+            self.routes.get(node or "-")
+            or self.routes.get("*")
+            or [AppConfig.DEFAULT_LLM_MODEL]
+        )
+
+    def _unreliable(self, node: str, model: str) -> bool:
+        with self._lock:
+            stats = self._stats.get((node, model))
+        if not self.min_success or stats is None:
+            return False
+        outcomes = stats["successes"] + stats["failures"]
+        return (
+            outcomes >= MIN_ROUTE_SAMPLES
+            and stats["successes"] / outcomes < self.min_success
+        )
+
+    def select(
+        self, node: Optional[str] = None, escalation: int = 0, prompt_tokens: int = 0
+    ) -> str:
+        """Modelo para uma chamada do nó após `escalation` tentativas falhas"""
+        node = node or current_node() or "-"
+        ladder = self.ladder(node)
+        if (
+            not escalation
+            and self.light_model
+            and prompt_tokens <= self.light_prompt_tokens
+            and not self._unreliable(node, self.light_model)
+        ):
+            return self.light_model
+
+        rung = min(escalation // self.escalate_after, len(ladder) - 1)
+        while rung < len(ladder) - 1 and self._unreliable(node, ladder[rung]):
+            rung += 1
+        return ladder[rung]
+
+    def _entry(self, node: str, model: str) -> dict:
+        return self._stats.setdefault(
+            (node, model), {"calls": 0, "seconds": 0.0, "successes": 0, "failures": 0}
+        )
+
+    def record_call(self, node: Optional[str], model: str, seconds: float):
+        """Latência de uma chamada feita ao provedor (acertos de cache não contam)"""
+        with self._lock:
+            entry = self._entry(node or "-", model)
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    def record_outcome(self, node: Optional[str], model: str, ok: bool):
+        """Resposta aproveitada (ok) ou descartada/reprovada pelos testes"""
+        node = node or "-"
+        with self._lock:
+            self._entry(node, model)["successes" if ok else "failures"] += 1
+        get_tracer().record_llm_route(node, model, ok)
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            rows = []
+            for (node, model), entry in sorted(self._stats.items()):
+                outcomes = entry["successes"] + entry["failures"]
+                rows.append(
+                    {
+                        "node": node,
+                        "model": model,
+                        **entry,
+                        "success_rate": (
+                            entry["successes"] / outcomes if outcomes else None
+                        ),
+                        "mean_seconds": (
+                            entry["seconds"] / entry["calls"] if entry["calls"] else 0.0
+                        ),
+                    }
+                )
+            return rows
+
+
+def track_llm_routes() -> list:
+    """Passa a anotar, no contexto atual, o (nó, modelo) de cada chamada ao LLM
+
+    Como em track_token_usage, threads e tasks criadas a partir daqui
+    compartilham a lista, que o nó usa depois para registrar o resultado.
+    """
+    routes = []
+    _routes.set(routes)
+    return routes
+
+
+def note_route(node: Optional[str], model: str):
+    routes = _routes.get()
+    if routes is not None:
+        routes.append((node or "-", model))
+
+
+def record_routes(routes: list, ok: bool):
+    """Registra o resultado de cada chamada anotada em `routes`"""
+    router = get_model_router()
+    for node, model in routes:
+        router.record_outcome(node, model, ok)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Roteador compartilhado, configurado por AppConfig na primeira chamada"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter(
+                    routes=parse_routes(AppConfig.LLM_ROUTES),
+                    escalate_after=AppConfig.LLM_ESCALATE_AFTER,
+                    light_model=AppConfig.LLM_LIGHT_MODEL,
+                    light_prompt_tokens=AppConfig.LLM_LIGHT_PROMPT_TOKENS,
+                    min_success=AppConfig.LLM_ROUTE_MIN_SUCCESS,
+                )
+    return _router
+
+
+def set_model_router(router: Optional[ModelRouter]):
+    """Substitui o roteador (None: recria a partir de AppConfig)"""
+    global _router
+    _router = router
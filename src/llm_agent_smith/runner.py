@@ -0,0 +1,149 @@
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+
+from config.main import AppConfig
+from llm_agent_smith.main import initial_state, run_config, tdd_app
+from llm_agent_smith.models.llmInvoker import track_token_usage
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.tracing.tracer import set_trace_id
+
+RequestItem = Union[str, Tuple[str, str]]
+
+
+@dataclass
+class RunOutcome:
+    """Resultado de uma solicitação processada pelo TDDRunner"""
+
+    request_id: str
+    state: Optional[TDDState] = None
+    error: Optional[BaseException] = None
+    duration: float = 0.0
+    tokens: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        results = (self.state or {}).get("test_results")
+        return self.error is None and results is not None and results.all_passed
+
+
+class TDDRunner:
+    """Executa várias solicitações TDD concorrentes no mesmo event loop
+
+    `concurrency` limita quantos grafos rodam ao mesmo tempo; cada
+    solicitação pode ser cancelada individualmente pelo seu id.
+    """
+
+    def __init__(self, concurrency: int = None, output_dir: Optional[str] = None):
+        self.concurrency = concurrency or AppConfig.MAX_CONCURRENT_REQUESTS
+        self.output_dir = output_dir
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _request_output_dir(self, request_id: str) -> Optional[str]:
+        if self.output_dir is None:
+            return None
+        return os.path.join(self.output_dir, request_id)
+
+    async def _invoke(self, state: Optional[TDDState], config: dict) -> TDDState:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            return await tdd_app.ainvoke(state, config)
+
+    async def run(
+        self,
+        user_request: str,
+        output_dir: Optional[str] = None,
+        thread_id: str = None,
+    ) -> TDDState:
+        """Executa uma solicitação respeitando o limite de concorrência"""
+        return await self._invoke(
+            initial_state(user_request, output_dir), run_config(thread_id)
+        )
+
+    async def resume(self, thread_id: str, checkpoint_id: str = None) -> TDDState:
+        """Retoma uma execução interrompida (requer CHECKPOINT_PATH)
+
+        Com `checkpoint_id` a execução recomeça daquele checkpoint, criando
+        um ramo novo na mesma thread.
+        """
+        return await self._invoke(None, run_config(thread_id, checkpoint_id))
+
+    async def _tracked(self, user_request: str, request_id: str) -> RunOutcome:
+        # Roda dentro da própria task: contador de tokens e trace ficam isolados
+        set_trace_id(request_id)
+        outcome = RunOutcome(request_id, tokens=track_token_usage())
+        started = time.perf_counter()
+        try:
+            outcome.state = await self.run(
+                user_request,
+                self._request_output_dir(request_id),
+                thread_id=request_id,
+            )
+        except Exception as e:
+            outcome.error = e
+        outcome.duration = time.perf_counter() - started
+        return outcome
+
+    def submit(self, user_request: str, request_id: str = None) -> asyncio.Task:
+        """Agenda a solicitação e devolve a task (cancelável via `cancel`)
+
+        A task produz um RunOutcome; o request_id também é o thread_id dos
+        checkpoints, para `resume`.
+        """
+        request_id = request_id or uuid.uuid4().hex
+        task = asyncio.ensure_future(self._tracked(user_request, request_id))
+        self._tasks[request_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(request_id, None))
+        return task
+
+    def cancel(self, request_id: str) -> bool:
+        task = self._tasks.get(request_id)
+        return task.cancel() if task is not None else False
+
+    def cancel_all(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    @property
+    def active_requests(self) -> list:
+        return list(self._tasks)
+
+    async def run_many(
+        self, requests: Iterable[RequestItem]
+    ) -> AsyncIterator[RunOutcome]:
+        """Processa as solicitações conforme terminam, sem carregar todas de uma vez
+
+        Aceita strings ou pares (request_id, user_request) e produz um
+        RunOutcome por solicitação, na ordem de conclusão. O iterável é
+        consumido aos poucos: no máximo `concurrency` solicitações pendentes.
+        """
+        pending: Dict[asyncio.Task, str] = {}
+        iterator = iter(requests)
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < self.concurrency:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                request_id, user_request = (
+                    item if isinstance(item, tuple) else (uuid.uuid4().hex, item)
+                )
+                pending[self.submit(user_request, request_id)] = request_id
+
+            if not pending:
+                break
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                request_id = pending.pop(task)
+                if task.cancelled():
+                    yield RunOutcome(request_id, error=asyncio.CancelledError())
+                else:
+                    yield task.result()
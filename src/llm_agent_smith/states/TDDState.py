@@ -1,14 +1,39 @@
 from datetime import datetime
 import json
+import operator
 from typing import Dict, List, TypedDict, Optional, Annotated
 
+from llm_agent_smith.executors.testResult import TestRunResult
+from llm_agent_smith.states.historyLog import HistoryLog, append_history
+
 
 class TDDState(TypedDict):
     user_request: str
-    features: Annotated[List[str], lambda l1, l2: l1 + l2]
+    features: List[str]
+    # Grafo de dependências entre features: feature -> features das quais depende
+    feature_deps: Dict[str, List[str]]
+    completed_features: List[str]
+    # Resultados dos subgrafos por feature, acumulados no fan-in
+    feature_results: Annotated[List[Dict], operator.add]
     current_feature: Optional[str]
     production_code: str
     test_code: str
-    test_results: Optional[str]
-    history: Annotated[List[Dict], lambda l1, l2: l1 + l2]
+    test_results: Optional[TestRunResult]
+    # Testes recém-escritos (fase RED): a próxima execução roda só eles
+    test_scope: Optional[List[str]]
+    # Erro da pré-verificação (código que nem compila): os testes não rodam
+    preflight_error: Optional[str]
+    # Arquivo que a pré-verificação rejeitou: um teste que nem compila volta
+    # para write_test, que o reescreve sobre `test_base` (a suíte anterior)
+    preflight_file: Optional[str]
+    test_base: Optional[str]
+    # Modelo que gerou a correção ainda não testada (ver ModelRouter): a
+    # próxima rodada de testes decide se a rota acertou
+    fix_model: Optional[str]
+    # Código de produção sobre o qual test_results já foi obtido (ex.: pela
+    # correção especulativa): execute_tests não roda os mesmos testes de novo
+    tested_code: Optional[str]
+    history: Annotated[HistoryLog, append_history]
     iteration_count: int
+    # Onde o finalize grava os artefatos (None: não grava)
+    output_dir: Optional[str]
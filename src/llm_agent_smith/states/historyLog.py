@@ -0,0 +1,123 @@
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Union
+
+
+class HistoryEntry:
+    """Evento do histórico do ciclo TDD em representação compacta"""
+
+    __slots__ = ("timestamp", "action", "details")
+
+    def __init__(self, action: str, details: str = "", timestamp: Optional[str] = None):
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.action = action
+        self.details = details
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HistoryEntry":
+        return cls(data["action"], data.get("details", ""), data.get("timestamp"))
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp,
+            "action": self.action,
+            "details": self.details,
+        }
+
+    def __getitem__(self, key: str):
+        # Mantém compatibilidade com o formato antigo em dict (h["action"])
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HistoryEntry):
+            return NotImplemented
+        return (self.timestamp, self.action, self.details) == (
+            other.timestamp,
+            other.action,
+            other.details,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"HistoryEntry({self.action!r}, {self.details[:40]!r}, {self.timestamp!r})"
+        )
+
+
+class HistoryLog:
+    """Log append-only do histórico
+
+    Versões sucessivas compartilham a mesma lista de eventos: cada versão
+    enxerga apenas os primeiros `len(self)` itens. Acrescentar na versão
+    mais recente é O(1) amortizado; acrescentar numa versão antiga (ex.:
+    ao retomar de um checkpoint anterior) copia apenas o prefixo dela.
+    """
+
+    __slots__ = ("_events", "_size")
+
+    def __init__(self, entries: Optional[Iterable] = None):
+        self._events: List[HistoryEntry] = [_as_entry(e) for e in entries or ()]
+        self._size = len(self._events)
+
+    @classmethod
+    def _view(cls, events: List[HistoryEntry], size: int) -> "HistoryLog":
+        log = cls.__new__(cls)
+        log._events = events
+        log._size = size
+        return log
+
+    def append(self, entries: Iterable) -> "HistoryLog":
+        new_entries = [_as_entry(e) for e in entries]
+        if not new_entries:
+            return self
+        if self._size == len(self._events):
+            events = self._events
+        else:
+            events = self._events[: self._size]
+        events.extend(new_entries)
+        return HistoryLog._view(events, len(events))
+
+    def __iter__(self) -> Iterator[HistoryEntry]:
+        return islice(self._events, self._size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("índice fora do histórico")
+        return self._events[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (HistoryLog, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"HistoryLog({len(self)} eventos)"
+
+    def to_list(self) -> List[HistoryEntry]:
+        return self._events[: self._size]
+
+    def to_dicts(self) -> List[dict]:
+        return [e.to_dict() for e in self]
+
+
+def _as_entry(entry: Union[HistoryEntry, dict]) -> HistoryEntry:
+    return entry if isinstance(entry, HistoryEntry) else HistoryEntry.from_dict(entry)
+
+
+def append_history(current, update) -> HistoryLog:
+    """Reducer do canal `history`: os nós emitem apenas as entradas novas"""
+    if not isinstance(current, HistoryLog):
+        current = HistoryLog(current)
+    if update is None:
+        return current
+    if isinstance(update, (HistoryEntry, dict)):
+        update = [update]
+    return current.append(update)
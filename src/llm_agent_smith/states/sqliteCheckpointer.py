@@ -0,0 +1,415 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from llm_agent_smith.states.historyLog import HistoryLog
+
+# Tipo gravado para canais append-only: só as entradas novas + versão base
+HISTORY_DELTA = "history-delta"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS checkpoints ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL DEFAULT '',"
+    " checkpoint_id TEXT NOT NULL,"
+    " parent_checkpoint_id TEXT,"
+    " type TEXT,"
+    " checkpoint BLOB,"
+    " metadata_type TEXT,"
+    " metadata BLOB,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL DEFAULT '',"
+    " channel TEXT NOT NULL,"
+    " version TEXT NOT NULL,"
+    " type TEXT NOT NULL,"
+    " blob BLOB,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS writes ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL DEFAULT '',"
+    " checkpoint_id TEXT NOT NULL,"
+    " task_id TEXT NOT NULL,"
+    " idx INTEGER NOT NULL,"
+    " channel TEXT NOT NULL,"
+    " type TEXT,"
+    " blob BLOB,"
+    " task_path TEXT NOT NULL DEFAULT '',"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+)
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """Checkpointer do LangGraph em SQLite, gravando apenas deltas
+
+    Cada checkpoint guarda só os canais cuja versão mudou no passo. O canal
+    `history` (HistoryLog, append-only) é gravado como as entradas novas mais
+    a versão anterior, então um passo custa O(entradas novas) e não
+    O(histórico inteiro). Retomar é invocar o grafo com o mesmo thread_id;
+    `fork` copia um checkpoint antigo para outra thread.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(serde=JsonPlusSerializer(pickle_fallback=True))
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    # Canais ------------------------------------------------------------
+
+    def _dump_history(
+        self, thread_id, checkpoint_ns, channel, log: HistoryLog, previous
+    ) -> bytes:
+        base, start = None, 0
+        if previous is not None:
+            previous = str(previous)
+            row = self._conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND"
+                " checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, previous),
+            ).fetchone()
+            if row is not None and row[0] == HISTORY_DELTA:
+                size = json.loads(row[1])["size"]
+                if size <= len(log):
+                    base, start = previous, size
+
+        payload = {
+            "base": base,
+            "size": len(log),
+            "entries": [entry.to_dict() for entry in log.to_list()[start:]],
+        }
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def _load_history(self, thread_id, checkpoint_ns, channel, blob) -> HistoryLog:
+        chunks = []
+        while True:
+            payload = json.loads(blob)
+            chunks.append(payload["entries"])
+            if payload["base"] is None:
+                break
+            (blob,) = self._conn.execute(
+                "SELECT blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?"
+                " AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, payload["base"]),
+            ).fetchone()
+        return HistoryLog(entry for chunk in reversed(chunks) for entry in chunk)
+
+    def _load_channels(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            row = self._conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND"
+                " checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            if row[0] == HISTORY_DELTA:
+                values[channel] = self._load_history(
+                    thread_id, checkpoint_ns, channel, row[1]
+                )
+            else:
+                values[channel] = self.serde.loads_typed(row)
+        return values
+
+    def _parent_versions(self, thread_id, checkpoint_ns, parent_id) -> ChannelVersions:
+        if parent_id is None:
+            return {}
+        row = self._conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND"
+            " checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, parent_id),
+        ).fetchone()
+        return self.serde.loads_typed(row)["channel_versions"] if row else {}
+
+    # Leitura -------------------------------------------------------------
+
+    def _tuple(self, row) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id = row[:4]
+        checkpoint = self.serde.loads_typed((row[4], row[5]))
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes WHERE thread_id = ?"
+            " AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_channels(
+                    thread_id, checkpoint_ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=self.serde.loads_typed((row[6], row[7])),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((kind, blob)))
+                for task_id, channel, kind, blob in writes
+            ],
+            parent_config=(
+                _config(thread_id, checkpoint_ns, parent_id) if parent_id else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+            " type, checkpoint, metadata_type, metadata FROM checkpoints"
+            " WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params = [configurable["thread_id"], configurable.get("checkpoint_ns", "")]
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            return self._tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+            " type, checkpoint, metadata_type, metadata FROM checkpoints WHERE 1 = 1"
+        )
+        params = []
+        if config:
+            configurable = config["configurable"]
+            query += " AND thread_id = ?"
+            params.append(configurable["thread_id"])
+            if configurable.get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params.append(configurable["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params.append(before_id)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row[6], row[7]))
+                if filter and any(metadata.get(k) != v for k, v in filter.items()):
+                    continue
+                results.append(self._tuple(row))
+        yield from results
+
+    # Escrita -------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        parent_id = configurable.get("checkpoint_id")
+
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+
+        with self._lock:
+            previous = self._parent_versions(thread_id, checkpoint_ns, parent_id)
+            for channel, version in new_versions.items():
+                value = values.get(channel)
+                if channel not in values:
+                    kind, blob = "empty", None
+                elif isinstance(value, HistoryLog):
+                    kind = HISTORY_DELTA
+                    blob = self._dump_history(
+                        thread_id,
+                        checkpoint_ns,
+                        channel,
+                        value,
+                        previous.get(channel),
+                    )
+                else:
+                    kind, blob = self.serde.dumps_typed(value)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, channel, str(version), kind, blob),
+                )
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    parent_id,
+                    *self.serde.dumps_typed(stored),
+                    *self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+                ),
+            )
+            self._conn.commit()
+
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        key = (
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            configurable["checkpoint_id"],
+        )
+        with self._lock:
+            for index, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, index)
+                # Escritas especiais (erros, interrupções) substituem as anteriores
+                verb = "INSERT OR REPLACE" if idx < 0 else "INSERT OR IGNORE"
+                self._conn.execute(
+                    f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        *key,
+                        task_id,
+                        idx,
+                        channel,
+                        *self.serde.dumps_typed(value),
+                        task_path,
+                    ),
+                )
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,)
+                )
+            self._conn.commit()
+
+    def fork(
+        self, thread_id: str, checkpoint_id: str, new_thread_id: str
+    ) -> RunnableConfig:
+        """Copia um checkpoint para outra thread, que segue a partir dele
+
+        Útil para refazer uma feature sem recalcular as anteriores: a thread
+        original continua intacta.
+        """
+        source = self.get_tuple(_config(thread_id, "", checkpoint_id))
+        if source is None:
+            raise KeyError(f"Checkpoint {checkpoint_id} não encontrado em {thread_id}")
+        return self.put(
+            {"configurable": {"thread_id": new_thread_id, "checkpoint_ns": ""}},
+            source.checkpoint,
+            {**source.metadata, "source": "fork", "forked_from": checkpoint_id},
+            source.checkpoint["channel_versions"],
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_next_version(self, current: Optional[str], channel) -> str:
+        # Sufixo aleatório: ramos criados a partir do mesmo checkpoint não
+        # podem sobrescrever os blobs um do outro
+        if current is None:
+            number = 0
+        elif isinstance(current, int):
+            number = current
+        else:
+            number = int(current.split(".")[0])
+        return f"{number + 1:032}.{random.random():016}"
+
+    # Assíncrono: a mesma conexão, em uma thread, para não travar o loop -----
+    # Um commit do SQLite espera o fsync; com features em paralelo no
+    # ainvoke, chamá-lo direto pararia todas as corrotinas da rodada.
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
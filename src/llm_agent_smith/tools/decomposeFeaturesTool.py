@@ -1,35 +1,83 @@
 import json
-from datetime import datetime
+import re
+from typing import Dict, List, Tuple
 from langchain_core.prompts import ChatPromptTemplate
 from llm_agent_smith.states.TDDState import TDDState
-from llm_agent_smith.models.geminiModel import GeminiModel
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.models.llmInvoker import ainvoke_llm, invoke_llm
+from llm_agent_smith.models.modelRouter import record_routes, track_llm_routes
 
-llm = GeminiModel.llm_model()
+DECOMPOSE_PROMPT = ChatPromptTemplate.from_template(
+    "Solicitação do usuário: {request}\n\n"
+    "Decomponha em features mínimas testáveis (MFVs):\n"
+    "- Um objeto por feature: "
+    '{{"id": 1, "feature": "descrição", "depends_on": [ids]}}\n'
+    "- depends_on lista apenas as features realmente necessárias antes\n"
+    "- Formato JSON array\n\n"
+    "Apenas a lista em formato JSON:"
+)
 
 
-def decompose_features(state: TDDState) -> TDDState:
-    prompt = ChatPromptTemplate.from_template(
-        "Solicitação do usuário: {request}\n\n"
-        "Decomponha em features mínimas testáveis (MFVs):\n"
-        "- Uma por linha\n"
-        "- Ordenadas por dependência\n"
-        "- Formato JSON array\n\n"
-        "Apenas a lista em formato JSON:"
-    )
-    chain = prompt | llm
-    response = chain.invoke({"request": state["user_request"]})
-    content = getattr(response, "content", str(response))
+def parse_feature_graph(
+    content: str, fallback: str
+) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Converte a resposta do LLM em features e suas dependências
+
+    Aceita objetos {"id", "feature", "depends_on"}; uma lista simples de
+    strings é tratada como cadeia linear (cada feature depende da anterior).
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
     try:
-        features = json.loads(str(content))
-    except Exception:
-        features = [state["user_request"]]
-    history_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action": "Decomposição de features",
-        "details": str(content)[:500],
-    }
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        return [fallback], {fallback: []}
+    if not isinstance(items, list) or not items:
+        return [fallback], {fallback: []}
+
+    if all(isinstance(item, str) for item in items):
+        return items, {f: items[i - 1 : i] for i, f in enumerate(items)}
+
+    by_id = {}
+    features = []
+    raw_deps = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            item = {"feature": str(item)}
+        feature = str(item.get("feature", item))
+        by_id[str(item.get("id", index))] = feature
+        features.append(feature)
+        raw_deps.append(item.get("depends_on") or [])
+
+    deps = {}
+    for feature, raw in zip(features, raw_deps):
+        deps[feature] = [
+            by_id[str(d)] for d in raw if by_id.get(str(d), feature) != feature
+        ]
+    return features, deps
+
+
+def _apply_decomposition(state: TDDState, content: str, routes=()) -> TDDState:
+    features, feature_deps = parse_feature_graph(content, state["user_request"])
+    # Resposta que não virou lista de features cai no fallback: a própria solicitação
+    record_routes(routes, features != [state["user_request"]])
+    history_entry = HistoryEntry("Decomposição de features", str(content)[:500])
     return {
-        **state,
         "features": features,
-        "history": state["history"] + [history_entry],
+        "feature_deps": feature_deps,
+        "completed_features": [],
+        "history": [history_entry],
     }
+
+
+def decompose_features(state: TDDState) -> TDDState:
+    """Decompõe a solicitação em features mínimas testáveis"""
+    routes = track_llm_routes()
+    content = invoke_llm(DECOMPOSE_PROMPT, {"request": state["user_request"]})
+    return _apply_decomposition(state, content, routes)
+
+
+async def adecompose_features(state: TDDState) -> TDDState:
+    """Versão assíncrona de decompose_features"""
+    routes = track_llm_routes()
+    content = await ainvoke_llm(DECOMPOSE_PROMPT, {"request": state["user_request"]})
+    return _apply_decomposition(state, content, routes)
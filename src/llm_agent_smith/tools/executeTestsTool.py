@@ -0,0 +1,231 @@
+import threading
+from typing import List, Optional, Tuple
+
+from config.main import AppConfig
+from llm_agent_smith.cache.testResultCache import TestResultCache
+from llm_agent_smith.executors.forkServerExecutor import ForkServerExecutor
+from llm_agent_smith.executors.pytestWorkerPool import PytestWorkerPool
+from llm_agent_smith.executors.subprocessExecutor import SubprocessExecutor
+from llm_agent_smith.executors.testResult import NO_TESTS_COLLECTED, TestRunResult
+from llm_agent_smith.executors.testSelection import failing_first
+from llm_agent_smith.models.modelRouter import get_model_router
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.tracing.tracer import get_tracer
+
+_executor = None
+_executor_lock = threading.Lock()
+_cache = None
+
+
+def get_test_executor():
+    """Retorna o executor de testes configurado, criado sob demanda"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if AppConfig.TEST_EXECUTOR == "forkserver":
+                _executor = ForkServerExecutor(
+                    timeout=AppConfig.TEST_TIMEOUT,
+                    cpu_limit=AppConfig.TEST_CPU_LIMIT,
+                    memory_limit_mb=AppConfig.TEST_MEMORY_LIMIT_MB,
+                )
+            elif AppConfig.TEST_EXECUTOR == "pool":
+                _executor = PytestWorkerPool(
+                    size=AppConfig.TEST_POOL_SIZE,
+                    max_runs=AppConfig.TEST_WORKER_MAX_RUNS,
+                    timeout=AppConfig.TEST_TIMEOUT,
+                )
+            else:
+                _executor = SubprocessExecutor(timeout=AppConfig.TEST_TIMEOUT)
+        return _executor
+
+
+def set_test_executor(executor):
+    """Substitui o executor de testes (ex.: um PytestWorkerPool já aquecido)"""
+    global _executor
+    if _executor is not None and _executor is not executor:
+        _executor.close()
+    _executor = executor
+
+
+def get_test_cache():
+    """Retorna o cache de resultados configurado (None se TEST_CACHE_SIZE for 0)"""
+    global _cache
+    with _executor_lock:
+        if _cache is None and AppConfig.TEST_CACHE_SIZE > 0:
+            _cache = TestResultCache(
+                AppConfig.TEST_CACHE_SIZE,
+                path=AppConfig.TEST_CACHE_PATH,
+                disk_entries=AppConfig.TEST_CACHE_MAX_ENTRIES,
+            )
+        return _cache
+
+
+def set_test_cache(cache):
+    global _cache
+    _cache = cache
+
+
+def _environment(executor) -> str:
+    """Executor e limites (tempo, CPU, memória) que entram na chave do cache
+
+    Uma rodada que estourou o timeout de 10s pode passar com 60s: resultados
+    de uma configuração não valem para outra.
+    """
+    return repr(
+        (
+            type(executor).__name__,
+            getattr(executor, "timeout", None),
+            getattr(executor, "limits", None),
+        )
+    )
+
+
+def _cached(executor, production_code, test_code, selection, fail_fast):
+    """(cache, chave, resultado já conhecido ou None)"""
+    cache = get_test_cache()
+    if cache is None:
+        return None, None, None
+    key = cache.make_key(
+        production_code,
+        test_code,
+        selection,
+        fail_fast,
+        _environment(executor),
+    )
+    results, result = cache.lookup(key)
+    get_tracer().record_test_cache(result)
+    return cache, key, results
+
+
+def run_tests(
+    production_code: str,
+    test_code: str,
+    selection: Optional[List[str]] = None,
+    fail_fast: bool = False,
+) -> TestRunResult:
+    """Executa os testes (todos ou só `selection`, nessa ordem) e retorna os resultados
+
+    Um par (produção, testes) já executado com a mesma seleção vem do cache
+    de resultados, sem iniciar nenhum processo.
+    """
+    if not test_code.strip():
+        return TestRunResult(
+            exit_code=NO_TESTS_COLLECTED, output="Nenhum teste definido"
+        )
+
+    executor = get_test_executor()
+    cache, key, results = _cached(
+        executor, production_code, test_code, selection, fail_fast
+    )
+    if results is not None:
+        return results
+
+    name = type(executor).__name__
+    with get_tracer().span("test", name, selection=selection) as span:
+        results = executor.run(production_code, test_code, selection, fail_fast)
+        get_tracer().record_tests(span, name, results)
+    if cache is not None:
+        cache.put(key, results)
+    return results
+
+
+async def arun_tests(
+    production_code: str,
+    test_code: str,
+    selection: Optional[List[str]] = None,
+    fail_fast: bool = False,
+) -> TestRunResult:
+    """Versão assíncrona de run_tests"""
+    if not test_code.strip():
+        return TestRunResult(
+            exit_code=NO_TESTS_COLLECTED, output="Nenhum teste definido"
+        )
+
+    executor = get_test_executor()
+    cache, key, results = _cached(
+        executor, production_code, test_code, selection, fail_fast
+    )
+    if results is not None:
+        return results
+
+    name = type(executor).__name__
+    with get_tracer().span("test", name, selection=selection) as span:
+        results = await executor.arun(production_code, test_code, selection, fail_fast)
+        get_tracer().record_tests(span, name, results)
+    if cache is not None:
+        cache.put(key, results)
+    return results
+
+
+def select_tests(state: TDDState) -> Tuple[Optional[List[str]], bool]:
+    """Escolhe (seleção, parar na primeira falha) para a próxima execução
+
+    RED roda só o teste recém-escrito; GREEN roda primeiro os que falharam e
+    depois o restante com -x. Sem histórico, roda a suíte completa.
+    """
+    if state.get("test_scope"):
+        return state["test_scope"], False
+
+    previous = state.get("test_results")
+    if previous is not None and not previous.all_passed:
+        ordered = failing_first(previous, state["test_code"])
+        if ordered:
+            return ordered, True
+    return None, False
+
+
+def _needs_full_run(state: TDDState, test_results: TestRunResult) -> bool:
+    # O teste novo já passa: confirmar com a suíte completa antes do refactor
+    return bool(state.get("test_scope")) and test_results.all_passed
+
+
+def _apply_results(state: TDDState, test_results: TestRunResult) -> TDDState:
+    history_entry = HistoryEntry("Executar testes", test_results.summary())
+
+    print(f"🧪 Resultado dos testes: {test_results.summary()}")
+
+    if state.get("fix_model"):
+        # A correção recém-aplicada fez os testes passarem?
+        get_model_router().record_outcome(
+            "implement_fix", state["fix_model"], test_results.all_passed
+        )
+
+    return {
+        "test_results": test_results,
+        "test_scope": None,
+        "fix_model": None,
+        "tested_code": None,
+        "history": [history_entry],
+    }
+
+
+def _already_tested(state: TDDState) -> bool:
+    # Os resultados no estado já são desta versão do código (e dos testes)
+    return (
+        state.get("tested_code") is not None
+        and state["tested_code"] == state["production_code"]
+        and not state.get("test_scope")
+    )
+
+
+def execute_tests(state: TDDState) -> TDDState:
+    """Executa os testes relevantes para a fase atual e armazena os resultados"""
+    if _already_tested(state):
+        return _apply_results(state, state["test_results"])
+    production_code, test_code = state["production_code"], state["test_code"]
+    test_results = run_tests(production_code, test_code, *select_tests(state))
+    if _needs_full_run(state, test_results):
+        test_results = run_tests(production_code, test_code)
+    return _apply_results(state, test_results)
+
+
+async def aexecute_tests(state: TDDState) -> TDDState:
+    """Versão assíncrona de execute_tests"""
+    if _already_tested(state):
+        return _apply_results(state, state["test_results"])
+    production_code, test_code = state["production_code"], state["test_code"]
+    test_results = await arun_tests(production_code, test_code, *select_tests(state))
+    if _needs_full_run(state, test_results):
+        test_results = await arun_tests(production_code, test_code)
+    return _apply_results(state, test_results)
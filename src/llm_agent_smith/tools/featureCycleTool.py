@@ -0,0 +1,91 @@
+from langgraph.graph import END, StateGraph
+
+from config.main import AppConfig
+from llm_agent_smith.memory.vectorMemory import remember_feature
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.tools.executeTestsTool import aexecute_tests, execute_tests
+from llm_agent_smith.tools.implementMinimalFixTool import (
+    aimplement_minimal_fix,
+    implement_minimal_fix,
+)
+from llm_agent_smith.tools.preflightTool import after_preflight, preflight
+from llm_agent_smith.tools.refactorCodeTool import arefactor_code, refactor_code
+from llm_agent_smith.tools.shouldContinueTool import should_continue
+from llm_agent_smith.tools.writeTestTool import awrite_test, write_test
+from llm_agent_smith.tracing.tracer import traced, traced_node
+
+# Subgrafo RED -> GREEN -> REFACTOR de uma única feature.
+# Cada nó tem versão síncrona (invoke) e assíncrona (ainvoke); a
+# pré-verificação é síncrona (só compila, sem I/O).
+feature_graph = StateGraph(TDDState)
+feature_graph.add_node("write_test", traced_node("write_test", write_test, awrite_test))
+feature_graph.add_node("preflight", traced_node("preflight", preflight))
+feature_graph.add_node(
+    "execute_tests", traced_node("execute_tests", execute_tests, aexecute_tests)
+)
+feature_graph.add_node(
+    "implement_fix",
+    traced_node("implement_fix", implement_minimal_fix, aimplement_minimal_fix),
+)
+feature_graph.add_node(
+    "refactor", traced_node("refactor", refactor_code, arefactor_code)
+)
+
+feature_graph.set_entry_point("write_test")
+feature_graph.add_edge("write_test", "preflight")
+feature_graph.add_conditional_edges(
+    "preflight",
+    traced("after_preflight", after_preflight),
+    {
+        "execute_tests": "execute_tests",
+        "write_test": "write_test",
+        "implement_fix": "implement_fix",
+        "refactor": "refactor",
+        "done": END,
+    },
+)
+feature_graph.add_conditional_edges(
+    "execute_tests",
+    traced("should_continue", should_continue),
+    {"implement_fix": "implement_fix", "refactor": "refactor", "done": END},
+)
+feature_graph.add_edge("implement_fix", "preflight")
+# O refactor roda os testes sobre o código refatorado e o descarta se falharem
+feature_graph.add_edge("refactor", END)
+
+feature_app = feature_graph.compile()
+
+
+def _feature_result(state: TDDState, result: TDDState) -> TDDState:
+    test_results = result.get("test_results")
+    passed = test_results is not None and test_results.all_passed
+    if passed:
+        remember_feature(state["current_feature"], state, result)
+
+    return {
+        "feature_results": [
+            {
+                "feature": state["current_feature"],
+                "production_code": result["production_code"],
+                "test_code": result["test_code"],
+                "passed": passed,
+            }
+        ],
+        "history": list(result["history"]),
+    }
+
+
+def feature_cycle(state: TDDState) -> TDDState:
+    """Executa o ciclo TDD de uma feature sobre a sua cópia do código"""
+    result = feature_app.invoke(
+        state, {"recursion_limit": AppConfig.GRAPH_RECURSION_LIMIT}
+    )
+    return _feature_result(state, result)
+
+
+async def afeature_cycle(state: TDDState) -> TDDState:
+    """Versão assíncrona de feature_cycle"""
+    result = await feature_app.ainvoke(
+        state, {"recursion_limit": AppConfig.GRAPH_RECURSION_LIMIT}
+    )
+    return _feature_result(state, result)
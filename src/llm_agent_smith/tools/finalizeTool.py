@@ -0,0 +1,63 @@
+import json
+import os
+
+from llm_agent_smith.models.llmInvoker import get_llm_cache
+from llm_agent_smith.models.modelRouter import get_model_router
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.tools.executeTestsTool import get_test_cache
+
+
+def finalize(state: TDDState) -> TDDState:
+    """Ações finais após completar todas as features"""
+    print(f"\n{'='*60}\n🏁 TDD COMPLETO!")
+    print(f"📏 Código final: {len(state['production_code'].splitlines())} linhas")
+    print(f"🧪 Testes: {len(state['test_code'].splitlines())} linhas")
+
+    # Salvar resultados (output_dir=None desativa, ex.: execuções em lote)
+    output_dir = state.get("output_dir", ".")
+    if output_dir is not None:
+        _save_results(state, output_dir)
+
+    cache = get_llm_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"🗃️ Cache do LLM: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%})"
+        )
+
+    test_cache = get_test_cache()
+    if test_cache is not None:
+        stats = test_cache.stats()
+        print(
+            f"🗃️ Cache de testes: {stats['hits'] + stats['disk_hits']} hits "
+            f"({stats['disk_hits']} do disco), {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%})"
+        )
+
+    for route in get_model_router().stats():
+        rate = route["success_rate"]
+        print(
+            f"🧭 {route['node']} → {route['model']}: {route['calls']} chamadas, "
+            f"{'-' if rate is None else f'{rate:.0%}'} de sucesso, "
+            f"{route['mean_seconds']:.2f}s em média"
+        )
+
+    return {}
+
+
+def _save_results(state: TDDState, output_dir: str):
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "production_code.py"), "w") as f:
+        f.write(state["production_code"])
+
+    with open(os.path.join(output_dir, "test_production.py"), "w") as f:
+        f.write(state["test_code"])
+
+    with open(os.path.join(output_dir, "tdd_history.json"), "w") as f:
+        json.dump(state["history"].to_dicts(), f, indent=2)
+
+    print(f"\n💾 Resultados salvos em {output_dir}:")
+    print("- production_code.py: Código de produção")
+    print("- test_production.py: Testes unitários")
+    print("- tdd_history.json: Histórico do ciclo TDD")
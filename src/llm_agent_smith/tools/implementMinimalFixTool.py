@@ -0,0 +1,348 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from config.main import AppConfig
+from llm_agent_smith.executors.preflight import preflight_check
+from llm_agent_smith.executors.testResult import TestRunResult
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.memory.vectorMemory import few_shot_examples, recall
+from llm_agent_smith.models.llmInvoker import ainvoke_llm, invoke_llm
+from llm_agent_smith.models.modelRouter import record_routes, track_llm_routes
+from llm_agent_smith.tools.executeTestsTool import arun_tests, run_tests, select_tests
+from llm_agent_smith.tools.preflightTool import preflight_result
+from llm_agent_smith.utils.codeMerge import merge_code
+from llm_agent_smith.utils.codeUtils import (
+    extract_code,
+    validate_interface,
+)
+from llm_agent_smith.utils.promptContext import (
+    context_budget,
+    failing_test_symbols,
+    failure_context,
+    relevant_code,
+)
+from llm_agent_smith.utils.safetyPolicy import find_violations
+
+FIX_PROMPT = ChatPromptTemplate.from_template(
+    "Feature: {feature}\n"
+    "Código atual:\n{current_code}\n\n"
+    "Testes falhando:\n{test_results}\n\n"
+    "{examples}"
+    "Implemente a CORREÇÃO MÍNIMA para fazer os testes passarem:\n"
+    "- Alterações mínimas necessárias\n"
+    "- Mantenha KISS e DRY\n"
+    "- Não adicione funcionalidades extras\n\n"
+    "Código corrigido:"
+)
+
+
+def _prompt_variables(state: TDDState, examples) -> dict:
+    # Dois terços do orçamento para o código, um terço para as falhas
+    budget = context_budget()
+    results = state["test_results"]
+    return {
+        "feature": state["current_feature"],
+        "current_code": relevant_code(
+            state["production_code"],
+            hint=state["current_feature"],
+            seeds=failing_test_symbols(state["test_code"], results),
+            budget=budget * 2 // 3,
+        ),
+        "test_results": failure_context(results, budget=budget // 3),
+        "examples": few_shot_examples(examples, "production_code"),
+    }
+
+
+def _recall(state: TDDState):
+    """Código lembrado ainda não aplicado (ou None) e exemplos para o prompt
+
+    O código lembrado é tentado uma vez: se já está no módulo e os testes
+    continuam falhando, a próxima tentativa vai para o LLM.
+    """
+    reuse, examples = recall(state["current_feature"])
+    if reuse is None:
+        return None, examples
+    code = state["production_code"]
+    if merge_code(code, reuse.production_code) != merge_code(code, ""):
+        print(f"♻️ Código reutilizado da memória: {reuse.feature} ({reuse.score:.2f})")
+        return reuse.production_code, examples
+    return None, examples
+
+
+def _cache_salt(state: TDDState) -> str:
+    # Cada tentativa precisa de uma resposta nova, mesmo com o mesmo prompt
+    return f"tentativa-{state['iteration_count']}"
+
+
+def _escalation(state: TDDState) -> int:
+    """Tentativas de correção que já falharam (podem pedir um modelo mais forte)"""
+    # write_test conta a primeira volta: a primeira correção vê iteration_count 1
+    return max(0, state["iteration_count"] - 1)
+
+
+def _check_candidate(state: TDDState, content: str) -> Optional[Tuple[str, str]]:
+    """(código novo, módulo resultante), ou None se a correção for rejeitada"""
+    new_code = extract_code(content)
+    # A resposta pode trazer o módulo inteiro ou só as definições alteradas
+    merged_code = merge_code(state["production_code"], new_code)
+
+    # Validar segurança e interface
+    violations = find_violations(new_code)
+    if violations:
+        print(
+            "⛔ Correção rejeitada: Problemas de segurança detectados! "
+            + "; ".join(str(v) for v in violations[:3])
+        )
+        return None
+
+    if not validate_interface(
+        state["production_code"], merged_code, allow_additions=True
+    ):
+        print("⚠️ Correção rejeitada: Interface pública alterada!")
+        return None
+
+    return new_code, merged_code
+
+
+def _accept(state: TDDState, new_code: str, merged_code: str, action: str) -> TDDState:
+    history_entry = HistoryEntry(
+        action,
+        new_code[:500] + "..." if len(new_code) > 500 else new_code,
+    )
+
+    print(
+        f"🔧 Código atualizado (Fase GREEN):\n{new_code[:200]}{'...' if len(new_code) > 200 else ''}"
+    )
+
+    return {
+        "production_code": merged_code,
+        "history": [history_entry],
+        "iteration_count": state["iteration_count"] + 1,
+    }
+
+
+def _apply_fix(state: TDDState, content: str, routes=()) -> TDDState:
+    candidate = _check_candidate(state, content)
+    if candidate is None:
+        record_routes(routes, False)
+        return {"iteration_count": state["iteration_count"] + 1}
+    update = _accept(state, *candidate, "Implementar correção (Fase GREEN)")
+    if routes:
+        # O sucesso da rota só se sabe na próxima rodada de testes
+        update["fix_model"] = routes[-1][1]
+    return update
+
+
+def _candidate_salts(state: TDDState) -> List[str]:
+    return [
+        f"{_cache_salt(state)}-candidato-{i}" for i in range(AppConfig.FIX_CANDIDATES)
+    ]
+
+
+def _survivors(state: TDDState, contents: list) -> List[Tuple[str, str]]:
+    """Candidatos que passam nas verificações, sem duplicatas"""
+    errors = [c for c in contents if isinstance(c, BaseException)]
+    if errors and len(errors) == len(contents):
+        raise errors[0]
+
+    survivors = {}
+    for content in contents:
+        if isinstance(content, BaseException):
+            continue
+        candidate = _check_candidate(state, content)
+        if candidate is not None:
+            survivors.setdefault(candidate[1], candidate)
+    return list(survivors.values())
+
+
+def _size(code: str) -> Tuple[int, int]:
+    return sum(1 for line in code.splitlines() if line.strip()), len(code)
+
+
+def _choose(
+    state: TDDState,
+    survivors: List[Tuple[str, str]],
+    results: List[TestRunResult],
+    routes=(),
+) -> TDDState:
+    """Menor candidato que passa; sem nenhum, o que avançou mais nos testes"""
+    ranked = sorted(
+        zip(survivors, results),
+        key=lambda item: (
+            not item[1].all_passed,
+            -item[1].passed,
+            _size(item[0][1]),
+        ),
+    )
+    (new_code, merged_code), winner = ranked[0]
+    passing = sum(1 for r in results if r.all_passed)
+    record_routes(routes, winner.all_passed)
+    print(
+        f"🎯 {len(survivors)} candidatos testados em paralelo, {passing} passaram"
+        f" (escolhido: {_size(merged_code)[0]} linhas, {winner.summary()})"
+    )
+    update = _accept(
+        state, new_code, merged_code, "Implementar correção (Fase GREEN, especulativa)"
+    )
+    # O vencedor já foi testado com a seleção que execute_tests usaria
+    update["test_results"] = winner
+    update["tested_code"] = merged_code
+    return update
+
+
+def _in_parallel(calls: list) -> list:
+    """Executa em threads, cada uma com uma cópia do contexto (trace e tokens)"""
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, call) for call in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def _speculative_fix(state: TDDState, examples) -> TDDState:
+    """K correções pedidas e testadas em paralelo; vence a menor que passa"""
+    variables = _prompt_variables(state, examples)
+    routes = track_llm_routes()
+    contents = _in_parallel(
+        [
+            functools.partial(
+                invoke_llm,
+                FIX_PROMPT,
+                variables,
+                salt,
+                until_code_block=True,
+                escalation=_escalation(state),
+            )
+            for salt in _candidate_salts(state)
+        ]
+    )
+    survivors = _survivors(state, contents)
+    if not survivors:
+        record_routes(routes, False)
+        return {"iteration_count": state["iteration_count"] + 1}
+
+    results = _preflight_results(state, survivors)
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        selection, fail_fast = select_tests(state)
+        ran = _in_parallel(
+            [
+                functools.partial(
+                    run_tests, survivors[i][1], state["test_code"], selection, fail_fast
+                )
+                for i in pending
+            ]
+        )
+        for i, result in zip(pending, _as_results(ran)):
+            results[i] = result
+    return _choose(state, survivors, results, routes)
+
+
+async def _aspeculative_fix(state: TDDState, examples) -> TDDState:
+    """Versão assíncrona de _speculative_fix"""
+    variables = _prompt_variables(state, examples)
+    routes = track_llm_routes()
+    contents = await asyncio.gather(
+        *(
+            ainvoke_llm(
+                FIX_PROMPT,
+                variables,
+                salt,
+                until_code_block=True,
+                escalation=_escalation(state),
+            )
+            for salt in _candidate_salts(state)
+        ),
+        return_exceptions=True,
+    )
+    survivors = _survivors(state, contents)
+    if not survivors:
+        record_routes(routes, False)
+        return {"iteration_count": state["iteration_count"] + 1}
+
+    results = _preflight_results(state, survivors)
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        selection, fail_fast = select_tests(state)
+        ran = await asyncio.gather(
+            *(
+                arun_tests(survivors[i][1], state["test_code"], selection, fail_fast)
+                for i in pending
+            ),
+            return_exceptions=True,
+        )
+        for i, result in zip(pending, _as_results(ran)):
+            results[i] = result
+    return _choose(state, survivors, results, routes)
+
+
+def _preflight_results(
+    state: TDDState, survivors: List[Tuple[str, str]]
+) -> List[Optional[TestRunResult]]:
+    """Resultado dos candidatos que nem compilam (None: precisam do pytest)"""
+    results = []
+    for _, merged_code in survivors:
+        error = preflight_check(merged_code, state["test_code"])
+        results.append(None if error is None else preflight_result(error))
+    return results
+
+
+def _as_results(results: list) -> List[TestRunResult]:
+    return [
+        (
+            TestRunResult.from_error(f"ERRO: {type(r).__name__}: {r}")
+            if isinstance(r, BaseException)
+            else r
+        )
+        for r in results
+    ]
+
+
+def implement_minimal_fix(state: TDDState) -> TDDState:
+    """Implementa a correção mínima para passar nos testes
+
+    Com FIX_CANDIDATES > 1, pede vários candidatos de uma vez e testa todos
+    em paralelo, em vez de uma tentativa por volta do ciclo.
+    """
+    reused, examples = _recall(state)
+    if reused is not None:
+        return _apply_fix(state, reused)
+    if AppConfig.FIX_CANDIDATES > 1:
+        return _speculative_fix(state, examples)
+    routes = track_llm_routes()
+    content = invoke_llm(
+        FIX_PROMPT,
+        _prompt_variables(state, examples),
+        cache_salt=_cache_salt(state),
+        until_code_block=True,
+        escalation=_escalation(state),
+    )
+    return _apply_fix(state, content, routes)
+
+
+async def aimplement_minimal_fix(state: TDDState) -> TDDState:
+    """Versão assíncrona de implement_minimal_fix"""
+    reused, examples = _recall(state)
+    if reused is not None:
+        return _apply_fix(state, reused)
+    if AppConfig.FIX_CANDIDATES > 1:
+        return await _aspeculative_fix(state, examples)
+    routes = track_llm_routes()
+    content = await ainvoke_llm(
+        FIX_PROMPT,
+        _prompt_variables(state, examples),
+        cache_salt=_cache_salt(state),
+        until_code_block=True,
+        escalation=_escalation(state),
+    )
+    return _apply_fix(state, content, routes)
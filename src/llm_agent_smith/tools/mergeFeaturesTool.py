@@ -0,0 +1,54 @@
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.tools.executeTestsTool import arun_tests, run_tests
+from llm_agent_smith.utils.codeMerge import merge_modules
+
+
+def _merge_code(state: TDDState) -> tuple:
+    completed = state.get("completed_features") or []
+    new_results = [r for r in state["feature_results"] if r["feature"] not in completed]
+
+    production_code = merge_modules(
+        state["production_code"], [r["production_code"] for r in new_results]
+    )
+    test_code = merge_modules(
+        state["test_code"],
+        [r["test_code"] for r in new_results],
+        rename_tests=True,
+    )
+    return new_results, production_code, test_code
+
+
+def _apply_merge(state, new_results, production_code, test_code, test_results):
+    completed = state.get("completed_features") or []
+    features = [r["feature"] for r in new_results]
+    failed = [r["feature"] for r in new_results if not r["passed"]]
+    history_entry = HistoryEntry(
+        "Integrar features",
+        f"{len(features)} integradas ({len(failed)} sem passar isoladamente): "
+        f"{test_results.summary()}",
+    )
+
+    print(f"🔗 Integração de {len(features)} features: {test_results.summary()}")
+
+    return {
+        "production_code": production_code,
+        "test_code": test_code,
+        "test_results": test_results,
+        "completed_features": completed + features,
+        "history": [history_entry],
+    }
+
+
+def merge_features(state: TDDState) -> TDDState:
+    """Integra o código das features concluídas (fan-in) e roda a suíte combinada"""
+    new_results, production_code, test_code = _merge_code(state)
+    test_results = run_tests(production_code, test_code)
+    return _apply_merge(state, new_results, production_code, test_code, test_results)
+
+
+async def amerge_features(state: TDDState) -> TDDState:
+    """Versão assíncrona de merge_features"""
+    new_results, production_code, test_code = _merge_code(state)
+    test_results = await arun_tests(production_code, test_code)
+    return _apply_merge(state, new_results, production_code, test_code, test_results)
@@ -0,0 +1,52 @@
+from llm_agent_smith.executors.preflight import TEST_FILE, preflight_failure
+from llm_agent_smith.executors.testResult import TestCaseResult, TestRunResult
+from llm_agent_smith.models.modelRouter import get_model_router
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.tools.shouldContinueTool import should_continue
+from llm_agent_smith.tracing.tracer import get_tracer
+
+
+def preflight_result(error: str) -> TestRunResult:
+    """Rodada sem pytest cuja única falha é o erro da pré-verificação"""
+    case = TestCaseResult(nodeid="preflight", outcome="error", message=error)
+    return TestRunResult(cases=[case], exit_code=-1, output=error)
+
+
+def preflight(state: TDDState) -> TDDState:
+    """Rejeita código que não compila antes de iniciar o pytest
+
+    O erro vira o resultado da rodada, como se os testes tivessem falhado,
+    e volta direto para o LLM: para write_test se o erro está no arquivo de
+    testes, para implement_fix se está em production.py.
+    """
+    failure = preflight_failure(state["production_code"], state["test_code"])
+    get_tracer().record_preflight(failure is None)
+    if failure is None:
+        return {"preflight_error": None, "preflight_file": None}
+
+    file, error = failure
+    print(f"🚫 Pré-verificação falhou (pytest não executado):\n{error}")
+    if state.get("fix_model"):
+        get_model_router().record_outcome("implement_fix", state["fix_model"], False)
+
+    return {
+        "preflight_error": error,
+        "preflight_file": file,
+        "fix_model": None,
+        "test_results": preflight_result(error),
+        "tested_code": None,
+        "test_scope": None,
+        "history": [HistoryEntry("Pré-verificação", error[:500])],
+    }
+
+
+def after_preflight(state: TDDState) -> str:
+    """Executa os testes ou, se a pré-verificação falhou, decide como should_continue"""
+    if not state.get("preflight_error"):
+        return "execute_tests"
+    route = should_continue(state)
+    if route == "implement_fix" and state.get("preflight_file") == TEST_FILE:
+        # O teste é que está quebrado: corrigir production.py não adiantaria
+        return "write_test"
+    return route
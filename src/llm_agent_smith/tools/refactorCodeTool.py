@@ -0,0 +1,116 @@
+from typing import Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_agent_smith.executors.testResult import TestRunResult
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.models.llmInvoker import ainvoke_llm, invoke_llm
+from llm_agent_smith.models.modelRouter import record_routes, track_llm_routes
+from llm_agent_smith.tools.executeTestsTool import arun_tests, run_tests
+from llm_agent_smith.utils.codeMerge import merge_code
+from llm_agent_smith.utils.codeUtils import (
+    extract_code,
+    validate_interface,
+)
+from llm_agent_smith.utils.promptContext import relevant_code
+from llm_agent_smith.utils.safetyPolicy import find_violations
+
+REFACTOR_PROMPT = ChatPromptTemplate.from_template(
+    "Refatore o código mantendo o mesmo comportamento:\n"
+    "Código atual:\n{code}\n\n"
+    "Diretrizes:\n"
+    "1. Aplique KISS e DRY\n"
+    "2. Melhore legibilidade\n"
+    "3. Não altere funcionalidades\n"
+    "Código refatorado:"
+)
+
+
+def _prompt_variables(state: TDDState) -> dict:
+    # Só a parte do módulo ligada à feature; o merge preserva o restante
+    return {
+        "code": relevant_code(
+            state["production_code"], hint=state.get("current_feature") or ""
+        )
+    }
+
+
+def _check_refactor(state: TDDState, content: str) -> Optional[Tuple[str, str]]:
+    """(código novo, módulo mesclado) ou None se a refatoração for rejeitada"""
+    new_code = extract_code(content)
+    # A resposta pode trazer o módulo inteiro ou só as definições alteradas
+    merged_code = merge_code(state["production_code"], new_code)
+
+    # Validar segurança e interface
+    violations = find_violations(new_code)
+    if violations:
+        print(
+            "⛔ Refatoração rejeitada: Problemas de segurança! "
+            + "; ".join(str(v) for v in violations[:3])
+        )
+        return None
+
+    if not validate_interface(state["production_code"], merged_code):
+        print("⚠️ Refatoração rejeitada: Interface pública alterada!")
+        return None
+
+    return new_code, merged_code
+
+
+def _apply_refactor(
+    new_code: str, merged_code: str, test_results: TestRunResult, routes=()
+) -> TDDState:
+    # Só o código que continua passando sai da feature (e vai para a memória);
+    # caso contrário fica o código da fase GREEN, já verificado
+    if not test_results.all_passed:
+        print(
+            "⚠️ Refatoração rejeitada: Testes falharam após refatorar! "
+            + test_results.summary()
+        )
+        record_routes(routes, False)
+        return {}
+    record_routes(routes, True)
+
+    history_entry = HistoryEntry(
+        "Refatorar código (Fase REFACTOR)",
+        new_code[:500] + "..." if len(new_code) > 500 else new_code,
+    )
+
+    print(
+        f"✨ Código refatorado (Fase REFACTOR):\n{new_code[:200]}{'...' if len(new_code) > 200 else ''}"
+    )
+
+    return {
+        "production_code": merged_code,
+        "test_results": test_results,
+        "history": [history_entry],
+    }
+
+
+def refactor_code(state: TDDState) -> TDDState:
+    """Refatora o código e só mantém a refatoração se os testes continuarem passando"""
+    routes = track_llm_routes()
+    content = invoke_llm(
+        REFACTOR_PROMPT, _prompt_variables(state), until_code_block=True
+    )
+    candidate = _check_refactor(state, content)
+    if candidate is None:
+        record_routes(routes, False)
+        return {}
+    test_results = run_tests(candidate[1], state["test_code"])
+    return _apply_refactor(*candidate, test_results, routes)
+
+
+async def arefactor_code(state: TDDState) -> TDDState:
+    """Versão assíncrona de refactor_code"""
+    routes = track_llm_routes()
+    content = await ainvoke_llm(
+        REFACTOR_PROMPT, _prompt_variables(state), until_code_block=True
+    )
+    candidate = _check_refactor(state, content)
+    if candidate is None:
+        record_routes(routes, False)
+        return {}
+    test_results = await arun_tests(candidate[1], state["test_code"])
+    return _apply_refactor(*candidate, test_results, routes)
@@ -1,24 +1,46 @@
-from datetime import datetime
+from typing import List, Union
+
+from langgraph.types import Send
 
 from llm_agent_smith.states.TDDState import TDDState
 
 
-def select_next_feature(state: TDDState) -> TDDState:
-    """Seleciona a próxima feature a ser implementada"""
-    if not state["features"]:
-        return {**state, "current_feature": None}
+def ready_features(state: TDDState) -> List[str]:
+    """Features pendentes cujas dependências já foram concluídas"""
+    completed = set(state.get("completed_features") or [])
+    pending = [f for f in state["features"] if f not in completed]
+    deps = state.get("feature_deps") or {}
+    ready = [f for f in pending if all(d in completed for d in deps.get(f, []))]
+    # Dependência circular: libera o que restou para não travar o fluxo
+    return ready or pending
 
-    next_feature = state["features"].pop(0)
 
-    history_entry = {
-        "timestamp": datetime.now(),
-        "action": "Selecionar feature",
-        "details": next_feature,
-    }
+def select_ready_features(state: TDDState) -> Union[str, List[Send]]:
+    """Dispara um subgrafo TDD por feature pronta, em paralelo (fan-out)"""
+    features = ready_features(state)
+    if not features:
+        return "finalize"
 
-    return {
-        **state,
-        "current_feature": next_feature,
-        "iteration_count": 0,
-        "history": state["history"] + [history_entry],
-    }
+    print(f"\n➡️ Features em paralelo: {features}")
+    return [
+        Send(
+            "feature_cycle",
+            {
+                "user_request": state["user_request"],
+                "current_feature": feature,
+                # Cada subgrafo trabalha sobre a sua própria cópia do código
+                "production_code": state["production_code"],
+                "test_code": state["test_code"],
+                "test_results": None,
+                "test_scope": None,
+                "preflight_error": None,
+                "preflight_file": None,
+                "test_base": None,
+                "fix_model": None,
+                "tested_code": None,
+                "history": [],
+                "iteration_count": 0,
+            },
+        )
+        for feature in features
+    ]
@@ -0,0 +1,22 @@
+from config.main import AppConfig
+from llm_agent_smith.states.TDDState import TDDState
+
+
+def should_continue(state: TDDState) -> str:
+    """Decide o próximo passo baseado no estado atual"""
+    # Sem feature em andamento, nada a fazer neste subgrafo
+    if not state["current_feature"]:
+        return "done"
+
+    # Se testes passaram, refatorar
+    results = state["test_results"]
+    if results is not None and results.all_passed:
+        return "refactor"
+
+    # Se excedeu o número máximo de tentativas, desistir desta feature
+    if state["iteration_count"] >= AppConfig.MAX_FEATURE_ATTEMPTS:
+        print("⚠️ Atenção: Feature não implementada após tentativas máximas")
+        return "done"
+
+    # Caso contrário, tentar corrigir novamente
+    return "implement_fix"
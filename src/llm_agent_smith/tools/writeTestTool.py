@@ -1,54 +1,103 @@
-import re
-from datetime import datetime
+from typing import Optional
+
 from langchain_core.prompts import ChatPromptTemplate
 
+from llm_agent_smith.executors.preflight import TEST_FILE
 from llm_agent_smith.states.TDDState import TDDState
-from llm_agent_smith.models.geminiModel import GeminiModel
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.models.llmInvoker import ainvoke_llm, invoke_llm
+from llm_agent_smith.models.modelRouter import record_routes, track_llm_routes
+from llm_agent_smith.executors.testSelection import added_tests
+from llm_agent_smith.memory.vectorMemory import few_shot_examples, recall
+from llm_agent_smith.utils.codeMerge import merge_tests
+from llm_agent_smith.utils.codeUtils import extract_code
+from llm_agent_smith.utils.promptContext import relevant_code
 
-llm = GeminiModel.llm_model()
+WRITE_TEST_PROMPT = ChatPromptTemplate.from_template(
+    "Escreva um teste Pytest para a feature:\n{feature}\n\n"
+    "Contexto:\nCódigo atual:\n{code}\n\n"
+    "{examples}"
+    "{error}"
+    "Diretrizes:\n- Teste apenas o essencial\n- Espere falhar inicialmente\n"
+    "Código do teste:"
+)
 
 
-def extract_code(text: str) -> str:
-    """Extrai código de blocos markdown"""
-    if "```python" in text:
-        match = re.search(r"```python(.*?)```", text, re.DOTALL)
-        if match:
-            return match.group(1).strip()
-    return text.strip()
+def _rejected_test_error(state: TDDState) -> Optional[str]:
+    """Erro da pré-verificação no arquivo de testes (o teste anterior não compilou)"""
+    if state.get("preflight_error") and state.get("preflight_file") == TEST_FILE:
+        return state["preflight_error"]
+    return None
 
 
-def write_test(state: TDDState) -> TDDState:
-    """Escreve um teste falhando para a feature atual"""
-    prompt = ChatPromptTemplate.from_template(
-        "Escreva um teste Pytest para a feature:\n{feature}\n\n"
-        "Contexto:\nCódigo atual:\n{code}\n\n"
-        "Diretrizes:\n- Teste apenas o essencial\n- Espere falhar inicialmente\n"
-        "Código do teste:"
-    )
+def _prompt_variables(state: TDDState, examples) -> dict:
+    feature = state["current_feature"]
+    error = _rejected_test_error(state)
+    return {
+        "feature": feature,
+        "code": relevant_code(state["production_code"], hint=feature),
+        "examples": few_shot_examples(examples, "test_code"),
+        "error": (
+            f"O teste anterior foi rejeitado antes de executar:\n{error}\n\n"
+            if error
+            else ""
+        ),
+    }
 
-    chain = prompt | llm
-    response = chain.invoke(
-        {"feature": state["current_feature"], "code": state["production_code"]}
-    )
 
-    content = getattr(response, "content", str(response))
+def _recall(state: TDDState):
+    """Teste lembrado para reutilizar (ou None) e exemplos para o prompt"""
+    reuse, examples = recall(state["current_feature"])
+    if reuse is not None:
+        print(f"♻️ Teste reutilizado da memória: {reuse.feature} ({reuse.score:.2f})")
+    return reuse, examples
 
+
+def _apply_test(state: TDDState, content: str, routes=()) -> TDDState:
     new_test = extract_code(content)
-    updated_test_code = state["test_code"] + "\n\n" + new_test
+    # Reescrita de um teste rejeitado: parte da suíte de antes dele
+    base = state["test_base"] if _rejected_test_error(state) else state["test_code"]
+    updated_test_code = merge_tests(base, new_test)
+    test_scope = added_tests(base, updated_test_code)
+    record_routes(routes, bool(test_scope))
 
-    history_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action": "Escrever teste (Fase RED)",
-        "details": new_test[:500] + "..." if len(new_test) > 500 else new_test,
-    }
+    history_entry = HistoryEntry(
+        "Escrever teste (Fase RED)",
+        new_test[:500] + "..." if len(new_test) > 500 else new_test,
+    )
 
     print(
         f"📝 Teste escrito (Fase RED):\n{new_test[:200]}{'...' if len(new_test) > 200 else ''}"
     )
 
     return {
-        **state,
         "test_code": updated_test_code,
-        "history": state["history"] + [history_entry],
+        "test_base": base,
+        "test_scope": test_scope,
+        "history": [history_entry],
         "iteration_count": state["iteration_count"] + 1,
     }
+
+
+def write_test(state: TDDState) -> TDDState:
+    """Escreve um teste falhando para a feature atual"""
+    reuse, examples = _recall(state)
+    if reuse is not None and not _rejected_test_error(state):
+        return _apply_test(state, reuse.test_code)
+    routes = track_llm_routes()
+    content = invoke_llm(
+        WRITE_TEST_PROMPT, _prompt_variables(state, examples), until_code_block=True
+    )
+    return _apply_test(state, content, routes)
+
+
+async def awrite_test(state: TDDState) -> TDDState:
+    """Versão assíncrona de write_test"""
+    reuse, examples = _recall(state)
+    if reuse is not None and not _rejected_test_error(state):
+        return _apply_test(state, reuse.test_code)
+    routes = track_llm_routes()
+    content = await ainvoke_llm(
+        WRITE_TEST_PROMPT, _prompt_variables(state, examples), until_code_block=True
+    )
+    return _apply_test(state, content, routes)
@@ -0,0 +1,411 @@
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from langchain_core.runnables import RunnableLambda
+
+from config.main import AppConfig
+
+# Métricas exportadas: nome -> (tipo Prometheus, descrição)
+METRICS = {
+    "tdd_node_seconds": ("summary", "Tempo de parede por nó do grafo"),
+    "tdd_llm_seconds": ("summary", "Tempo de parede das chamadas ao LLM"),
+    "tdd_llm_calls_total": ("counter", "Chamadas ao LLM (cache=hit|miss)"),
+    "tdd_llm_tokens_total": ("counter", "Tokens consumidos (type=input|output)"),
+    "tdd_llm_cost_usd_total": ("counter", "Custo estimado das chamadas ao LLM"),
+    "tdd_llm_queue_depth": ("gauge", "Chamadas ao LLM aguardando na fila"),
+    "tdd_llm_queue_wait_seconds": (
+        "summary",
+        "Espera na fila do agendador (limites e prioridade) por chamada",
+    ),
+    "tdd_llm_quota_errors_total": (
+        "counter",
+        "Erros de cota (429/503) do provedor repetidos com backoff",
+    ),
+    "tdd_llm_backoff_seconds": ("summary", "Atraso sorteado após erros de cota"),
+    "tdd_llm_hedges_total": (
+        "counter",
+        "Chamadas lentas duplicadas (winner=hedge|primary: quem respondeu antes)",
+    ),
+    "tdd_llm_routes_total": (
+        "counter",
+        "Respostas por rota nó/modelo (outcome=success|failure)",
+    ),
+    "tdd_prompt_tokens_total": (
+        "counter",
+        "Tokens estimados de contexto nos prompts (stage=original|sent)",
+    ),
+    "tdd_prompt_tokens_saved_total": (
+        "counter",
+        "Tokens de contexto economizados pelo recorte dos prompts",
+    ),
+    "tdd_memory_lookups_total": (
+        "counter",
+        "Consultas à memória vetorial (result=reuse|examples|miss)",
+    ),
+    "tdd_preflight_total": (
+        "counter",
+        "Pré-verificações antes do pytest (result=ok|rejected)",
+    ),
+    "tdd_test_cache_lookups_total": (
+        "counter",
+        "Consultas ao cache de resultados de teste (result=memory|disk|miss)",
+    ),
+    "tdd_test_seconds": ("summary", "Tempo de parede das rodadas de teste"),
+    "tdd_test_executor_seconds": (
+        "summary",
+        "Tempo gasto dentro do executor (subprocesso/worker) por rodada",
+    ),
+    "tdd_test_runs_total": ("counter", "Rodadas de teste (outcome=passed|failed)"),
+}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_trace_id: ContextVar[str] = ContextVar("trace_id", default="main")
+
+
+def set_trace_id(trace_id: str):
+    """Agrupa os spans seguintes (no contexto atual) sob `trace_id`"""
+    _trace_id.set(trace_id)
+
+
+def current_node() -> Optional[str]:
+    """Nó do grafo em execução no contexto atual (None fora do grafo)"""
+    span = _current_span.get()
+    return span.node if span and span.node != "-" else None
+
+
+class Span:
+    """Intervalo medido: um nó do grafo (node), uma chamada ao LLM (llm) ou aos testes (test)"""
+
+    __slots__ = (
+        "span_id",
+        "parent_id",
+        "trace_id",
+        "kind",
+        "name",
+        "node",
+        "start",
+        "duration",
+        "attrs",
+    )
+
+    def __init__(self, span_id, parent: Optional["Span"], kind: str, name: str):
+        self.span_id = span_id
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = _trace_id.get()
+        self.kind = kind
+        self.name = name
+        # Nó do grafo ao qual o span pertence (rótulo das métricas)
+        self.node = name if kind == "node" else (parent.node if parent else "-")
+        self.start = time.time()
+        self.duration = 0.0
+        self.attrs: Dict = {}
+
+
+class Metrics:
+    """Contadores e sumários com rótulos, exportados no formato do Prometheus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, tuple], float] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        self.inc(f"{name}_sum", value, **labels)
+        self.inc(f"{name}_count", 1, **labels)
+
+    def value(self, name: str, **labels) -> float:
+        """Soma das séries de `name` que contêm os rótulos dados"""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(
+                v
+                for (n, key), v in self._values.items()
+                if n == name and wanted <= set(key)
+            )
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = []
+        described = set()
+        for (name, labels), value in items:
+            base = name.rsplit("_", 1)[0] if name.endswith(("_sum", "_count")) else name
+            if base in METRICS and base not in described:
+                kind, help_text = METRICS[base]
+                lines += [f"# HELP {base} {help_text}", f"# TYPE {base} {kind}"]
+                described.add(base)
+            rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f"{name}{{{rendered}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Tracer:
+    """Registra spans (trace JSON) e alimenta as métricas agregadas
+
+    Os spans ficam em um buffer limitado (`max_spans`); as métricas são
+    apenas somas por rótulo, então o custo de memória não cresce com a
+    duração da execução.
+    """
+
+    def __init__(self, max_spans: int = 100_000):
+        self.metrics = Metrics()
+        self.spans: deque = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attrs) -> Iterator[Span]:
+        span = Span(next(self._ids), _current_span.get(), kind, name)
+        span.attrs.update(attrs)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            self.spans.append(span)
+            labels = {"node": span.node}
+            if kind == "llm":
+                labels["model"] = span.attrs.get("model", name)
+            elif kind == "test":
+                labels["executor"] = span.attrs.get("executor", name)
+            self.metrics.observe(f"tdd_{kind}_seconds", span.duration, **labels)
+
+    def record_llm(
+        self, span: Span, model: str, usage: Optional[dict], cache_hit: bool
+    ):
+        """Tokens, custo e cache de uma chamada ao LLM"""
+        labels = {"node": span.node, "model": model}
+        input_tokens = (usage or {}).get("input_tokens", 0)
+        output_tokens = (usage or {}).get("output_tokens", 0)
+        cost = (
+            input_tokens * AppConfig.LLM_INPUT_COST_PER_MTOK
+            + output_tokens * AppConfig.LLM_OUTPUT_COST_PER_MTOK
+        ) / 1_000_000
+
+        self.metrics.inc(
+            "tdd_llm_calls_total", cache="hit" if cache_hit else "miss", **labels
+        )
+        self.metrics.inc("tdd_llm_tokens_total", input_tokens, type="input", **labels)
+        self.metrics.inc("tdd_llm_tokens_total", output_tokens, type="output", **labels)
+        self.metrics.inc("tdd_llm_cost_usd_total", cost, **labels)
+        span.attrs.update(
+            model=model,
+            cache_hit=cache_hit,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=round(cost, 8),
+        )
+
+    def record_llm_queue(self, depth: int):
+        self.metrics.set("tdd_llm_queue_depth", depth)
+
+    def record_llm_wait(self, seconds: float):
+        """Espera na fila do agendador antes de uma chamada ao LLM"""
+        span = _current_span.get()
+        node = span.node if span else "-"
+        self.metrics.observe("tdd_llm_queue_wait_seconds", seconds, node=node)
+        if span is not None:
+            span.attrs["queue_wait"] = round(
+                span.attrs.get("queue_wait", 0) + seconds, 6
+            )
+
+    def record_llm_quota_error(self, delay: float):
+        span = _current_span.get()
+        node = span.node if span else "-"
+        self.metrics.inc("tdd_llm_quota_errors_total", node=node)
+        self.metrics.observe("tdd_llm_backoff_seconds", delay, node=node)
+
+    def record_llm_hedge(self, won: bool):
+        """Chamada duplicada e qual das duas respondeu primeiro"""
+        span = _current_span.get()
+        node = span.node if span else "-"
+        winner = "hedge" if won else "primary"
+        self.metrics.inc("tdd_llm_hedges_total", node=node, winner=winner)
+        if span is not None:
+            span.attrs["hedge"] = winner
+
+    def record_llm_route(self, node: str, model: str, ok: bool):
+        """Resposta de uma rota aproveitada ou não (ver ModelRouter)"""
+        outcome = "success" if ok else "failure"
+        self.metrics.inc(
+            "tdd_llm_routes_total", node=node, model=model, outcome=outcome
+        )
+
+    def record_prompt(self, section: str, original_tokens: int, sent_tokens: int):
+        """Tamanho de uma seção de contexto antes e depois do recorte"""
+        span = _current_span.get()
+        labels = {"node": span.node if span else "-", "section": section}
+        saved = original_tokens - sent_tokens
+        self.metrics.inc(
+            "tdd_prompt_tokens_total", original_tokens, stage="original", **labels
+        )
+        self.metrics.inc("tdd_prompt_tokens_total", sent_tokens, stage="sent", **labels)
+        self.metrics.inc("tdd_prompt_tokens_saved_total", saved, **labels)
+        if span is not None:
+            key = f"{section}_tokens_saved"
+            span.attrs[key] = span.attrs.get(key, 0) + saved
+
+    def record_memory(self, result: str, score: float):
+        """Resultado de uma consulta à memória de features"""
+        span = _current_span.get()
+        node = span.node if span else "-"
+        self.metrics.inc("tdd_memory_lookups_total", node=node, result=result)
+        if span is not None:
+            span.attrs.update(memory=result, memory_score=round(score, 4))
+
+    def record_preflight(self, ok: bool):
+        """Resultado da pré-verificação (rejeitada: um pytest a menos)"""
+        span = _current_span.get()
+        node = span.node if span else "-"
+        result = "ok" if ok else "rejected"
+        self.metrics.inc("tdd_preflight_total", node=node, result=result)
+        if span is not None:
+            span.attrs["preflight"] = result
+
+    def record_test_cache(self, result: str):
+        """Consulta ao cache de resultados (acerto: uma rodada de pytest a menos)"""
+        span = _current_span.get()
+        node = span.node if span else "-"
+        self.metrics.inc("tdd_test_cache_lookups_total", node=node, result=result)
+        if span is not None:
+            span.attrs["test_cache"] = result
+
+    def record_tests(self, span: Span, executor: str, results):
+        """Resultado e tempo interno do executor de uma rodada de testes"""
+        labels = {"node": span.node, "executor": executor}
+        self.metrics.inc(
+            "tdd_test_runs_total",
+            outcome="passed" if results.all_passed else "failed",
+            **labels,
+        )
+        self.metrics.observe(
+            "tdd_test_executor_seconds", results.duration, executor=executor
+        )
+        span.attrs.update(
+            executor=executor,
+            executor_seconds=round(results.duration, 6),
+            passed=results.passed,
+            failed=results.failed,
+            errors=results.errors,
+        )
+
+    def prometheus(self) -> str:
+        return self.metrics.render()
+
+    def chrome_trace(self) -> dict:
+        """Spans no formato Trace Event (chrome://tracing, Perfetto)"""
+        threads: Dict[str, int] = {}
+        events = []
+        for span in list(self.spans):
+            tid = threads.setdefault(span.trace_id, len(threads) + 1)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.kind,
+                    "ph": "X",
+                    "ts": int(span.start * 1e6),
+                    "dur": int(span.duration * 1e6),
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                        "node": span.node,
+                        **span.attrs,
+                    },
+                }
+            )
+        for trace_id, tid in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"name": trace_id},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, metrics_path: str = None, trace_path: str = None):
+        """Grava as métricas (texto Prometheus) e o trace JSON, se configurados"""
+        metrics_path = metrics_path or AppConfig.METRICS_PATH
+        trace_path = trace_path or AppConfig.TRACE_PATH
+        if metrics_path:
+            _write(metrics_path, self.prometheus())
+        if trace_path:
+            _write(trace_path, json.dumps(self.chrome_trace(), ensure_ascii=False))
+
+
+def _write(path: str, content: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    global _tracer
+    _tracer = tracer
+
+
+def traced(name: str, func, kind: str = "node"):
+    """Envolve `func` (síncrona ou assíncrona) em um span"""
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with get_tracer().span(kind, name):
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_tracer().span(kind, name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def traced_node(name: str, func, afunc=None) -> RunnableLambda:
+    """Nó do grafo instrumentado, com versões síncrona e assíncrona"""
+    return RunnableLambda(
+        traced(name, func),
+        afunc=traced(name, afunc) if afunc is not None else None,
+        name=name,
+    )
@@ -0,0 +1,119 @@
+import ast
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import FrozenSet, Optional, Tuple
+
+# Versões de código analisadas mantidas em memória (árvores ocupam ~10x o fonte)
+MAX_ENTRIES = 512
+
+DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+class CodeAnalysis:
+    """Resultado da análise de uma versão do código, compartilhado pelos validadores
+
+    `tree` é a árvore do ast.parse (None se o código não for Python válido,
+    caso em que `error` guarda a exceção). A árvore é compartilhada entre
+    threads e chamadas: só leia, nunca altere. Os demais campos são
+    calculados na primeira consulta.
+    """
+
+    def __init__(self, code: str):
+        self.tree: Optional[ast.Module] = None
+        self.error: Optional[Exception] = None
+        try:
+            self.tree = ast.parse(code)
+        except (SyntaxError, ValueError) as e:
+            self.error = e
+
+    @cached_property
+    def definitions(self) -> Tuple[str, ...]:
+        """Funções e classes de topo, na ordem do arquivo"""
+        if self.tree is None:
+            return ()
+        return tuple(n.name for n in self.tree.body if isinstance(n, DEFINITIONS))
+
+    @cached_property
+    def public_symbols(self) -> FrozenSet[str]:
+        """Definições de topo que fazem parte da interface (sem `_`)"""
+        return frozenset(n for n in self.definitions if not n.startswith("_"))
+
+    @cached_property
+    def imports(self) -> FrozenSet[str]:
+        """Módulos importados em qualquer ponto (`from . import x` conta como ".")"""
+        if self.tree is None:
+            return frozenset()
+        modules = set()
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Import):
+                modules.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                modules.add("." * node.level + (node.module or ""))
+        return frozenset(modules)
+
+
+_analyses: "OrderedDict[str, CodeAnalysis]" = OrderedDict()
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def analyze(code: str) -> CodeAnalysis:
+    """Análise de `code`, feita uma vez por versão (LRU por hash do conteúdo)"""
+    global _hits, _misses
+    key = code_hash(code)
+    with _lock:
+        analysis = _analyses.get(key)
+        if analysis is not None:
+            _analyses.move_to_end(key)
+            _hits += 1
+            return analysis
+
+    # Fora do lock: outras threads não esperam pelo parse
+    analysis = CodeAnalysis(code)
+    with _lock:
+        _misses += 1
+        analysis = _analyses.setdefault(key, analysis)
+        _analyses.move_to_end(key)
+        while len(_analyses) > MAX_ENTRIES:
+            _analyses.popitem(last=False)
+    return analysis
+
+
+def parse(code: str, filename: str = "<unknown>") -> ast.Module:
+    """Árvore compartilhada de `code` (não a altere)
+
+    Lança o mesmo erro que ast.parse(code, filename) lançaria.
+    """
+    analysis = analyze(code)
+    if analysis.error is not None:
+        error = copy.copy(analysis.error)
+        if isinstance(error, SyntaxError) and error.filename is not None:
+            error.filename = filename
+        raise error
+    return analysis.tree
+
+
+def analysis_stats() -> dict:
+    with _lock:
+        lookups = _hits + _misses
+        return {
+            "hits": _hits,
+            "misses": _misses,
+            "hit_rate": _hits / lookups if lookups else 0.0,
+            "entries": len(_analyses),
+        }
+
+
+def clear_analysis_cache():
+    global _hits, _misses
+    with _lock:
+        _analyses.clear()
+        _hits = _misses = 0
@@ -0,0 +1,233 @@
+import ast
+import re
+from typing import Dict, List, Optional, Tuple
+
+from llm_agent_smith.utils.codeAnalysis import parse
+
+# (módulo, nome, alias, nível relativo); módulo None para `import x`
+ImportSpec = Tuple[Optional[str], str, Optional[str], int]
+
+
+def _is_test_unit(key: str) -> bool:
+    return key.startswith(("test", "Test"))
+
+
+def _same_code(a: str, b: str) -> bool:
+    """Compara pelo AST: formatação e comentários não contam"""
+    if a == b:
+        return True
+    try:
+        return ast.dump(parse(a)) == ast.dump(parse(b))
+    except SyntaxError:
+        return False
+
+
+def _rename(source: str, old: str, new: str) -> str:
+    pattern = rf"^(\s*(?:async\s+def|def|class)\s+){re.escape(old)}\b"
+    return re.sub(pattern, rf"\g<1>{new}", source, count=1, flags=re.MULTILINE)
+
+
+class ModuleUnits:
+    """Módulo como coleção de unidades de topo indexadas por nome
+
+    Cada nome importado é uma unidade (`import a, b` vira duas), o que
+    elimina imports duplicados; funções, classes e atribuições simples são
+    indexadas pelo nome e os demais comandos pelo próprio código. `render`
+    gera o código-fonte canônico: docstring, imports e depois as unidades
+    na ordem em que apareceram.
+    """
+
+    def __init__(self):
+        self.imports: Dict[str, ImportSpec] = {}
+        self.units: Dict[str, str] = {}
+
+    @classmethod
+    def parse(cls, code: str) -> "ModuleUnits":
+        """Lança SyntaxError se o código não for Python válido"""
+        module = cls()
+        lines = code.splitlines()
+        tree = parse(code)
+        for index, node in enumerate(tree.body):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    key = alias.asname or alias.name
+                    module.imports[key] = (None, alias.name, alias.asname, 0)
+                continue
+            if isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    key = alias.asname or alias.name
+                    if key == "*":
+                        key = f"from {node.module} import *"
+                    module.imports[key] = (
+                        node.module,
+                        alias.name,
+                        alias.asname,
+                        node.level,
+                    )
+                continue
+
+            start = min(
+                [node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]
+            )
+            source = "\n".join(lines[start - 1 : node.end_lineno])
+            module.units[cls._key(node, source, index)] = source
+        return module
+
+    @staticmethod
+    def _key(node: ast.stmt, source: str, index: int) -> str:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            return node.name
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+        ):
+            return node.targets[0].id
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            return node.target.id
+        if (
+            index == 0
+            and isinstance(node, ast.Expr)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        ):
+            return "__doc__"
+        return source
+
+    def copy(self) -> "ModuleUnits":
+        clone = ModuleUnits()
+        clone.imports = dict(self.imports)
+        clone.units = dict(self.units)
+        return clone
+
+    def _free_name(self, name: str) -> str:
+        suffix = 2
+        while f"{name}_{suffix}" in self.units:
+            suffix += 1
+        return f"{name}_{suffix}"
+
+    def add(self, key: str, source: str, rename: bool = False) -> Optional[str]:
+        """Adiciona uma unidade; retorna a chave usada (None se já existia igual)
+
+        Em colisão com uma unidade diferente, testes são renomeados quando
+        `rename` é verdadeiro; nos demais casos a nova versão substitui a
+        antiga, na mesma posição.
+        """
+        current = self.units.get(key)
+        if current is not None and _same_code(current, source):
+            return None
+        if current is not None and rename and _is_test_unit(key):
+            new_key = self._free_name(key)
+            self.units[new_key] = _rename(source, key, new_key)
+            return new_key
+        self.units[key] = source
+        return key
+
+    def merge(self, other: "ModuleUnits", rename_tests: bool = False) -> List[str]:
+        """Aplica as unidades de `other`; retorna as chaves novas ou alteradas"""
+        self.imports.update(other.imports)
+        changed = []
+        for key, source in other.units.items():
+            used = self.add(key, source, rename=rename_tests)
+            if used is not None:
+                changed.append(used)
+        return changed
+
+    def _render_imports(self) -> List[str]:
+        lines = []
+        grouped: Dict[Tuple[str, int], List[str]] = {}
+        for module, name, asname, level in self.imports.values():
+            alias = f"{name} as {asname}" if asname else name
+            if module is None and level == 0:
+                lines.append(f"import {alias}")
+                continue
+            group = (module or "", level)
+            if group not in grouped:
+                grouped[group] = []
+                lines.append(group)
+            if alias not in grouped[group]:
+                grouped[group].append(alias)
+
+        rendered = []
+        for line in lines:
+            if isinstance(line, tuple):
+                module, level = line
+                names = ", ".join(grouped[line])
+                line = f"from {'.' * level}{module} import {names}"
+            rendered.append(line)
+        # `from __future__` precisa vir antes de qualquer outro import
+        return sorted(rendered, key=lambda l: not l.startswith("from __future__"))
+
+    def render(self) -> str:
+        parts = []
+        if "__doc__" in self.units:
+            parts.append(self.units["__doc__"])
+        imports = self._render_imports()
+        if imports:
+            parts.append("\n".join(imports))
+        parts += [s for key, s in self.units.items() if key != "__doc__"]
+        return "\n\n\n".join(parts) + "\n" if parts else ""
+
+
+def merge_code(base: str, new: str, rename_tests: bool = False) -> str:
+    """Aplica as unidades de `new` sobre `base`
+
+    Unidades ausentes em `new` são mantidas, então `new` pode trazer o
+    módulo inteiro ou apenas o que mudou. Se `new` tiver erro de sintaxe,
+    ele é apenas anexado, para que o erro apareça na próxima rodada de
+    testes; se `base` tiver, prevalece `new`.
+    """
+    if not base.strip():
+        base_units = ModuleUnits()
+    else:
+        try:
+            base_units = ModuleUnits.parse(base)
+        except SyntaxError:
+            return new
+    try:
+        new_units = ModuleUnits.parse(new)
+    except SyntaxError:
+        return base + "\n\n" + new
+
+    base_units.merge(new_units, rename_tests=rename_tests)
+    return base_units.render()
+
+
+def merge_tests(test_code: str, new_test: str) -> str:
+    """Acrescenta testes à suíte sem duplicar imports nem sobrescrever testes
+
+    Um teste idêntico a um existente é descartado; um teste diferente com o
+    mesmo nome é renomeado (test_x -> test_x_2) para não perder cobertura.
+    """
+    return merge_code(test_code, new_test, rename_tests=True)
+
+
+def merge_modules(base: str, variants: List[str], rename_tests: bool = False) -> str:
+    """Integra versões de um módulo derivadas do mesmo código base
+
+    Definições novas ou alteradas em cada variante são aplicadas sobre o
+    base; em conflito, prevalece a última variante (com `rename_tests`,
+    testes novos de variantes diferentes com o mesmo nome são renomeados).
+    Variantes com erro de sintaxe são ignoradas.
+    """
+    try:
+        base_units = ModuleUnits.parse(base) if base.strip() else ModuleUnits()
+    except SyntaxError:
+        base_units = ModuleUnits()
+    merged = base_units.copy()
+
+    for variant in variants:
+        try:
+            units = ModuleUnits.parse(variant)
+        except SyntaxError:
+            continue
+        merged.imports.update(units.imports)
+        for key, source in units.units.items():
+            original = base_units.units.get(key)
+            if original is not None and _same_code(original, source):
+                continue
+            # Só renomeia quando outra variante já alterou o mesmo teste
+            collided = merged.units.get(key) != original
+            merged.add(key, source, rename=rename_tests and collided)
+
+    return merged.render()
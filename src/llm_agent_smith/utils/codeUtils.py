@@ -0,0 +1,92 @@
+import re
+
+from llm_agent_smith.utils.codeAnalysis import analyze
+from llm_agent_smith.utils.safetyPolicy import find_violations
+
+
+def extract_code(text: str) -> str:
+    """Extrai código de blocos markdown"""
+    if "```python" in text:
+        match = re.search(r"```python(.*?)```", text, re.DOTALL)
+        if match:
+            return match.group(1).strip()
+    return text.strip()
+
+
+class CodeBlockStream:
+    """Acumula a resposta em streaming e detecta o fim do bloco ```python
+
+    Cada chamada a `feed` examina apenas o trecho novo, mais uma pequena
+    sobreposição para cercas divididas entre dois chunks.
+    """
+
+    OPEN_FENCE = "```python"
+    CLOSE_FENCE = "```"
+
+    def __init__(self):
+        self._text = ""
+        self._code_start = -1
+        self._code_end = -1
+        self._scan_from = 0
+
+    @property
+    def complete(self) -> bool:
+        return self._code_end >= 0
+
+    @property
+    def text(self) -> str:
+        """Texto recebido até o fechamento do bloco (ou tudo, se incompleto)"""
+        if self.complete:
+            return self._text[: self._code_end + len(self.CLOSE_FENCE)]
+        return self._text
+
+    def feed(self, chunk: str) -> bool:
+        """Adiciona um chunk; retorna True quando o bloco de código fechou"""
+        if self.complete or not chunk:
+            return self.complete
+        self._text += chunk
+
+        if self._code_start < 0:
+            index = self._text.find(self.OPEN_FENCE, self._scan_from)
+            if index < 0:
+                self._scan_from = max(0, len(self._text) - len(self.OPEN_FENCE))
+                return False
+            self._code_start = index + len(self.OPEN_FENCE)
+            self._scan_from = self._code_start
+
+        index = self._text.find(self.CLOSE_FENCE, self._scan_from)
+        if index < 0:
+            self._scan_from = max(
+                self._code_start, len(self._text) - len(self.CLOSE_FENCE)
+            )
+            return False
+        self._code_end = index
+        return True
+
+    def code(self) -> str:
+        return extract_code(self.text)
+
+
+def validate_interface(
+    old_code: str, new_code: str, allow_additions: bool = False
+) -> bool:
+    """Verifica se a interface pública foi mantida
+
+    Com allow_additions=True (fase GREEN) novos símbolos públicos são aceitos,
+    desde que nenhum dos existentes seja removido.
+    """
+    if not old_code.strip():
+        return True
+
+    old, new = analyze(old_code), analyze(new_code)
+    if old.error is not None or new.error is not None:
+        return False
+
+    if allow_additions:
+        return old.public_symbols <= new.public_symbols
+    return old.public_symbols == new.public_symbols
+
+
+def is_code_safe(code: str) -> bool:
+    """Verifica se o código não contém operações perigosas (ver safetyPolicy)"""
+    return not find_violations(code)
@@ -0,0 +1,193 @@
+import ast
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from config.main import AppConfig
+from llm_agent_smith.executors.testResult import TestRunResult
+from llm_agent_smith.tracing.tracer import get_tracer
+from llm_agent_smith.utils.codeAnalysis import parse
+from llm_agent_smith.utils.codeMerge import ModuleUnits
+
+# Janela de contexto (tokens) dos modelos conhecidos
+MODEL_CONTEXT_WINDOWS = {
+    "gemini-2.5-pro": 1_048_576,
+    "gemini-2.5-flash": 1_048_576,
+    "gemini-2.5-flash-lite": 1_048_576,
+    "gemini-2.0-flash": 1_048_576,
+    "gemini-1.5-pro": 2_097_152,
+}
+
+ELIDED_NOTE = (
+    "# Definições resumidas abaixo continuam no módulo; não as reescreva, "
+    "retorne apenas o que mudar."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de ~4 caracteres por token (sem chamada ao provedor)"""
+    return (len(text) + 3) // 4
+
+
+def context_budget(model_name: Optional[str] = None) -> int:
+    """Tokens disponíveis para as seções de contexto de um prompt"""
+    window = MODEL_CONTEXT_WINDOWS.get(model_name or AppConfig.DEFAULT_LLM_MODEL)
+    budget = AppConfig.PROMPT_CONTEXT_TOKENS
+    # Metade da janela fica para instruções e para a resposta
+    return min(budget, window // 2) if window else budget
+
+
+def _words(text: str) -> Set[str]:
+    plain = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return {w for w in re.findall(r"[a-z0-9]+", plain.lower()) if len(w) >= 3}
+
+
+def _references(source: str) -> Set[str]:
+    names = set()
+    for node in ast.walk(parse(source)):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+    return names
+
+
+def symbol_graph(units: ModuleUnits) -> Dict[str, Set[str]]:
+    """Para cada unidade, as outras unidades do módulo que ela referencia"""
+    return {
+        key: (_references(source) & units.units.keys()) - {key}
+        for key, source in units.units.items()
+    }
+
+
+def relevant_symbols(
+    units: ModuleUnits, seeds: Iterable[str] = (), hint: str = ""
+) -> List[str]:
+    """Unidades ligadas às sementes, em ordem de distância no grafo de chamadas
+
+    Sementes são nomes citados (ex.: pelos testes falhando) ou unidades cujo
+    nome compartilha palavras com `hint` (ex.: a descrição da feature).
+    """
+    seeds = set(seeds)
+    words = _words(hint)
+    scores = {
+        key: (key in seeds, len(_words(key.replace("_", " ")) & words))
+        for key in units.units
+    }
+    # Citados primeiro, depois os que mais compartilham palavras com a dica
+    start = sorted(
+        (key for key, score in scores.items() if any(score)),
+        key=lambda key: scores[key],
+        reverse=True,
+    )
+    graph = symbol_graph(units)
+    order, queue = list(dict.fromkeys(start)), deque(start)
+    seen = set(order)
+    while queue:
+        for dependency in sorted(graph[queue.popleft()]):
+            if dependency not in seen:
+                seen.add(dependency)
+                order.append(dependency)
+                queue.append(dependency)
+    return order
+
+
+def _summary(source: str) -> str:
+    """Cabeçalho da definição como comentário (não volta como código)"""
+    first = source.splitlines()[0]
+    for line in source.splitlines():
+        if not line.lstrip().startswith("@"):
+            first = line
+            break
+    return f"# {first.rstrip().rstrip(':')}  [corpo omitido]"
+
+
+def relevant_code(
+    code: str,
+    hint: str = "",
+    seeds: Iterable[str] = (),
+    budget: Optional[int] = None,
+) -> str:
+    """Código de produção recortado para caber em `budget` tokens
+
+    Cabendo no orçamento, o código vai inteiro. Caso contrário vão por
+    inteiro os imports e as definições relevantes (ver relevant_symbols),
+    enquanto houver espaço; as demais viram comentários com a assinatura
+    (ou apenas o nome, se nem as assinaturas couberem).
+    """
+    budget = budget or context_budget()
+    original = estimate_tokens(code)
+    if original <= budget:
+        get_tracer().record_prompt("code", original, original)
+        return code
+    try:
+        units = ModuleUnits.parse(code)
+    except SyntaxError:
+        get_tracer().record_prompt("code", original, original)
+        return code
+
+    skeleton = ModuleUnits()
+    skeleton.imports = units.imports
+    summaries = {key: _summary(source) for key, source in units.units.items()}
+    used = estimate_tokens(skeleton.render() + ELIDED_NOTE)
+    used += sum(estimate_tokens(s) + 1 for s in summaries.values())
+    compact = used > budget
+    if compact:
+        # Nem as assinaturas cabem: os omitidos viram uma lista de nomes
+        used -= sum(estimate_tokens(s) + 1 for s in summaries.values())
+        used += estimate_tokens(", ".join(units.units)) + 10
+
+    full = set()
+    for key in relevant_symbols(units, seeds, hint):
+        size = estimate_tokens(units.units[key]) + 1
+        if not compact:
+            size -= estimate_tokens(summaries[key]) + 1
+        if used + size > budget:
+            continue
+        full.add(key)
+        used += size
+
+    parts = [ELIDED_NOTE]
+    imports = skeleton.render().strip()
+    if imports:
+        parts.append(imports)
+    elided = []
+    for key, source in units.units.items():
+        if key in full:
+            parts.append(source)
+        elif compact:
+            elided.append(key.splitlines()[0][:60])
+        else:
+            parts.append(summaries[key])
+    if elided:
+        parts.append("# Outras definições (corpo omitido): " + ", ".join(elided))
+    trimmed = "\n\n".join(parts) + "\n"
+    get_tracer().record_prompt("code", original, estimate_tokens(trimmed))
+    return trimmed
+
+
+def failing_test_symbols(test_code: str, test_results: TestRunResult) -> Set[str]:
+    """Nomes referenciados pelos testes que falharam (sementes da fase GREEN)"""
+    try:
+        tests = ModuleUnits.parse(test_code)
+    except SyntaxError:
+        return set()
+    names = set()
+    for case in test_results.failures():
+        # "test_production.py::TestX::test_y[1]" -> "TestX"
+        test_id = case.nodeid.partition("::")[2].split("[")[0].split("::")[0]
+        if test_id in tests.units:
+            names |= _references(tests.units[test_id])
+    return names
+
+
+def failure_context(test_results: TestRunResult, budget: Optional[int] = None) -> str:
+    """Relatório de falhas limitado a `budget` tokens, preservando o fim das mensagens"""
+    budget = budget or context_budget()
+    report = test_results.failure_report()
+    original = estimate_tokens(report)
+    if original > budget:
+        report = test_results.failure_report(max_chars=budget * 4)
+    get_tracer().record_prompt("failures", original, estimate_tokens(report))
+    return report
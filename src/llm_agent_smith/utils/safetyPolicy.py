@@ -0,0 +1,332 @@
+import ast
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from llm_agent_smith.utils.codeAnalysis import parse
+
+# Módulos proibidos (import ou qualquer atributo); posix/nt são o os por baixo
+DENIED_MODULES = frozenset(
+    {
+        "subprocess",
+        "shutil",
+        "ctypes",
+        "importlib",
+        "builtins",
+        "multiprocessing",
+        "posix",
+        "nt",
+        "pty",
+    }
+)
+
+# Nomes qualificados proibidos (builtins sem prefixo)
+DENIED_TARGETS = frozenset(
+    {
+        "eval",
+        "exec",
+        "compile",
+        "open",
+        "__import__",
+        "__builtins__",
+        "breakpoint",
+        "globals",
+        "locals",
+        "vars",
+        "os.system",
+        "os.popen",
+        "os.fork",
+        "os.kill",
+        "os.remove",
+        "os.unlink",
+        "os.rmdir",
+        "io.open",
+        "sys.exit",
+        "sys.modules",
+    }
+)
+
+# Famílias de funções proibidas por prefixo (os.execve, os.spawnlp...)
+DENIED_PREFIXES = frozenset({"os.exec", "os.spawn", "os.posix_spawn"})
+
+# Atributos usados para escapar de sandboxes (obj.__class__.__subclasses__()...)
+DENIED_DUNDERS = frozenset(
+    {
+        "__subclasses__",
+        "__globals__",
+        "__builtins__",
+        "__code__",
+        "__import__",
+        "__loader__",
+        "__getattribute__",
+    }
+)
+
+# Funções que acessam atributos por nome (getattr(os, "system"))
+DYNAMIC_ACCESS = frozenset({"getattr", "setattr", "delattr"})
+
+# Código que não compila: verificação textual, em uma única regex
+_FALLBACK = re.compile(
+    r"__import__\s*\(|\b(?:subprocess|shutil)\.|os\.system\(|\beval\(|\bexec\("
+    r"|\bopen\(|sys\.exit|__builtins__|__subclasses__"
+)
+# Palavras mais curtas que isso só contam após um destes separadores
+_MIN_SUBSTRING = 4
+_IMPORT_SEPARATORS = (" ", ",")
+# Palavras presentes em todo trecho que _FALLBACK reconhece
+_FALLBACK_WORDS = frozenset(
+    {
+        "__import__",
+        "__builtins__",
+        "__subclasses__",
+        "subprocess",
+        "shutil",
+        "system",
+        "eval",
+        "exec",
+        "open",
+        "exit",
+    }
+)
+
+
+@dataclass(frozen=True)
+class Violation:
+    """Uso proibido encontrado no código"""
+
+    rule: str  # import, call, reference, dunder, dynamic-access ou pattern
+    target: str
+    line: int = 0
+    col: int = 0
+
+    def __str__(self) -> str:
+        return f"linha {self.line}: {self.rule} {self.target}"
+
+
+class SafetyPolicy:
+    """Política de segurança verificada sobre o AST em uma única passada
+
+    As listas de bloqueio são congeladas na construção; `check` percorre a
+    árvore uma vez, resolvendo aliases de import (`import os as o`,
+    `from os import system`) para comparar nomes qualificados. Só nomes e
+    atributos que podem estar na lista são resolvidos. Acesso por nome que
+    não dá para resolver (getattr com nome calculado, `from os import *`)
+    conta como violação.
+
+    Antes do AST, o texto é varrido pelas palavras sem as quais nenhuma
+    regra dispara (módulo, último nome de cada alvo, dunder). A maior parte
+    do código gerado não contém nenhuma e nem chega a ser analisada.
+    Palavras curtas ("nt", "pty") só contam depois de um separador de
+    import: como substring, apareceriam em quase todo código.
+    """
+
+    def __init__(
+        self,
+        modules: Iterable[str] = DENIED_MODULES,
+        targets: Iterable[str] = DENIED_TARGETS,
+        dunders: Iterable[str] = DENIED_DUNDERS,
+        prefixes: Iterable[str] = DENIED_PREFIXES,
+    ):
+        self.modules: FrozenSet[str] = frozenset(modules)
+        self.targets: FrozenSet[str] = frozenset(targets)
+        self.dunders: FrozenSet[str] = frozenset(dunders)
+        self.prefixes: FrozenSet[str] = frozenset(prefixes)
+        names = self.targets | self.prefixes
+        # Filtros baratos aplicados a cada nó antes de montar nomes qualificados
+        self._heads = frozenset(t.split(".")[0] for t in names) | self.modules
+        self._attributes = frozenset(
+            t.rsplit(".", 1)[1] for t in self.targets if "." in t
+        )
+        self._prefixes = tuple(sorted(self.prefixes))
+        self._attribute_prefixes = tuple(
+            p.rsplit(".", 1)[1] for p in self.prefixes if "." in p
+        )
+        # Módulos com algum membro proibido: `from os import *` os traria
+        self._partial = frozenset(t.rsplit(".", 1)[0] for t in names if "." in t)
+        # Chaves de globals()/vars() que dão acesso a um nome proibido
+        self._keys = self.dunders | {t for t in self.targets if "." not in t}
+        # `o.system` só é os.system se "system" aparece; aliases vêm de imports
+        # no próprio código e getattr só escapa com o nome da função no texto
+        words = (
+            self.modules
+            | self.dunders
+            | {t.rsplit(".", 1)[-1] for t in names}
+            | DYNAMIC_ACCESS
+            | {"import *"}
+            | _FALLBACK_WORDS
+        )
+        # Palavras curtas ("nt") estão dentro de quase tudo (print, int): só
+        # valem após um separador de import, único jeito de o módulo existir
+        short = {w for w in words if len(w) < _MIN_SUBSTRING}
+        words = (words - short) | {s + w for w in short for s in _IMPORT_SEPARATORS}
+        # "execv" já é coberta por "exec": cada palavra custa uma varredura
+        self._words = tuple(
+            sorted(w for w in words if not any(o != w and o in w for o in words))
+        )
+
+    def _denied(self, qualified: str) -> bool:
+        return (
+            qualified in self.targets
+            or qualified.split(".")[0] in self.modules
+            or qualified.startswith(self._prefixes)
+        )
+
+    def check(self, code: str) -> List[Violation]:
+        """Violações encontradas em `code` (lista vazia: código seguro)"""
+        # Busca de substrings (não regex): mais rápida que o laço antigo
+        if not any(word in code for word in self._words):
+            return []
+        try:
+            tree = parse(code)
+        except (SyntaxError, ValueError):
+            return [
+                Violation(
+                    "pattern", match.group(0), code.count("\n", 0, match.start()) + 1
+                )
+                for match in _FALLBACK.finditer(code)
+            ]
+
+        violations: List[Violation] = []
+        aliases: Dict[str, str] = {}
+        calls, covered = set(), set()
+
+        def report(rule: str, target: str, node: ast.AST):
+            if rule is None:
+                rule = "call" if id(node) in calls else "reference"
+            violations.append(_violation(rule, target, node))
+            # `os.system` gera um único relato, não outro para `os`
+            covered.update(id(inner) for inner in _chain(node))
+
+        # Em largura: pais antes dos filhos (a chamada antes da função
+        # chamada, `a.b` antes de `a`) e imports antes dos usos no escopo
+        for node in ast.walk(tree):
+            kind = type(node)
+            if kind is ast.Name:
+                name = node.id
+                if id(node) in covered or (
+                    name not in self._heads and name not in aliases
+                ):
+                    continue
+                qualified = aliases.get(name, name)
+                if isinstance(node.ctx, ast.Load) and self._denied(qualified):
+                    report(None, qualified, node)
+            elif kind is ast.Attribute:
+                if node.attr in self.dunders:
+                    report("dunder", node.attr, node)
+                elif id(node) not in covered and (
+                    node.attr in self._attributes
+                    or node.attr.startswith(self._attribute_prefixes)
+                ):
+                    qualified = self._resolve(_dotted(node), aliases)
+                    if qualified and self._denied(qualified):
+                        report(None, qualified, node)
+            elif kind is ast.Subscript:
+                key = node.slice
+                if (
+                    isinstance(key, ast.Constant)
+                    and isinstance(key.value, str)
+                    and key.value in self._keys
+                ):
+                    report("dynamic-access", key.value, node)
+            elif kind is ast.Call:
+                calls.add(id(node.func))
+                if _is_dynamic_access(node) and _constant_name(node) is None:
+                    # Nome calculado em tempo de execução: não dá para conferir
+                    report("dynamic-access", node.func.id, node)
+                    continue
+                dynamic = _dynamic_target(node)
+                if dynamic is None:
+                    continue
+                if dynamic.rsplit(".", 1)[-1] in self.dunders:
+                    report("dynamic-access", dynamic, node)
+                    continue
+                qualified = self._resolve(dynamic, aliases)
+                if self._denied(qualified):
+                    report("dynamic-access", qualified, node)
+            elif kind is ast.Import:
+                for alias in node.names:
+                    head = alias.name.split(".")[0]
+                    aliases[alias.asname or head] = alias.name if alias.asname else head
+                    if self._denied(alias.name):
+                        report("import", alias.name, node)
+            elif kind is ast.ImportFrom:
+                module = node.module or ""
+                if node.level == 0 and any(a.name == "*" for a in node.names):
+                    if self._denied(module) or module in self._partial:
+                        report("import", f"{module}.*", node)
+                    continue
+                for alias in node.names:
+                    qualified = f"{module}.{alias.name}" if module else alias.name
+                    aliases[alias.asname or alias.name] = qualified
+                    if node.level == 0 and self._denied(qualified):
+                        report("import", qualified, node)
+
+        return sorted(violations, key=lambda v: (v.line, v.col))
+
+    @staticmethod
+    def _resolve(dotted: Optional[str], aliases: Dict[str, str]) -> Optional[str]:
+        if dotted is None:
+            return None
+        head, _, rest = dotted.partition(".")
+        return aliases.get(head, head) + (f".{rest}" if rest else "")
+
+
+def _violation(rule: str, target: str, node: ast.AST) -> Violation:
+    return Violation(
+        rule, target, getattr(node, "lineno", 0), getattr(node, "col_offset", 0)
+    )
+
+
+def _chain(node: ast.AST):
+    """Nós da cadeia de atributos abaixo de `node` (até o nome na base)"""
+    while isinstance(node, ast.Attribute):
+        node = node.value
+        yield node
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    """Nome pontuado (a.b.c) de uma cadeia de atributos sobre um nome simples"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _is_dynamic_access(node: ast.Call) -> bool:
+    return (
+        isinstance(node.func, ast.Name)
+        and node.func.id in DYNAMIC_ACCESS
+        and len(node.args) >= 2
+    )
+
+
+def _constant_name(node: ast.Call) -> Optional[str]:
+    name = node.args[1]
+    if isinstance(name, ast.Constant) and isinstance(name.value, str):
+        return name.value
+    return None
+
+
+def _dynamic_target(node: ast.Call) -> Optional[str]:
+    """Nome acessado por getattr(obj, "nome") com nome constante"""
+    if not _is_dynamic_access(node):
+        return None
+    name = _constant_name(node)
+    if name is None:
+        return None
+    base = _dotted(node.args[0])
+    return f"{base}.{name}" if base else name
+
+
+DEFAULT_POLICY = SafetyPolicy()
+
+
+def find_violations(
+    code: str, policy: SafetyPolicy = DEFAULT_POLICY
+) -> List[Violation]:
+    """Violações de `code` segundo a política (por padrão, DEFAULT_POLICY)"""
+    return policy.check(code)
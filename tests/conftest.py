@@ -0,0 +1,61 @@
+import pytest
+
+from llm_agent_smith.executors.subprocessExecutor import SubprocessExecutor
+from llm_agent_smith.models import llmInvoker
+from llm_agent_smith.models.fakeModels import ScriptedChatModel
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+from llm_agent_smith.models.modelRouter import (
+    ModelRouter,
+    parse_routes,
+    set_model_router,
+)
+from llm_agent_smith.tools.executeTestsTool import set_test_cache, set_test_executor
+from llm_agent_smith.tracing.tracer import Tracer, get_tracer, set_tracer
+
+
+@pytest.fixture
+def scripted_model(request, monkeypatch):
+    """Modelos de roteiro (sem rede), testes em subprocesso e roteador novo
+
+    `scripted_model(rules)` faz todos os nós usarem um ScriptedChatModel com
+    essas regras; `scripted_model({"prefixo:nome": rules, ...})` dá a cada
+    modelo escolhido pelo roteador (`routes`, ver parse_routes) o seu
+    roteiro. Retorna o modelo (ou o dicionário de modelos). As regras também
+    podem vir por parametrização indireta.
+    """
+
+    def install(rules, routes: str = ""):
+        ModelRegistry.reset()
+        set_model_router(ModelRouter(parse_routes(routes)))
+        if isinstance(rules, list):
+            model = ScriptedChatModel(rules=rules)
+            ModelRegistry.use(model)
+            return model
+
+        models = {name: ScriptedChatModel(rules=r) for name, r in rules.items()}
+        for name in models:
+            prefix = name.partition(":")[0]
+            monkeypatch.setitem(
+                ModelRegistry._backends, prefix, lambda name, **_: models[name]
+            )
+        return models
+
+    llmInvoker.set_llm_cache(None)
+    set_test_cache(None)
+    set_test_executor(SubprocessExecutor())
+    if hasattr(request, "param"):
+        install(request.param)
+    yield install
+    set_test_executor(None)
+    set_test_cache(None)
+    set_model_router(None)
+    ModelRegistry.reset()
+
+
+@pytest.fixture
+def tracer():
+    previous = get_tracer()
+    tracer = Tracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(previous)
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from llm_agent_smith.main import graph, initial_state, run_config
+from llm_agent_smith.models.fakeModels import DEFAULT_RULES, load_script
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.states.historyLog import HistoryEntry
+from llm_agent_smith.states.sqliteCheckpointer import HISTORY_DELTA, SQLiteCheckpointer
+from llm_agent_smith.tools import executeTestsTool
+
+calls = []
+
+
+def _step(name, fail_once=False):
+    def node(state):
+        calls.append(name)
+        if fail_once and calls.count(name) == 1:
+            raise RuntimeError("queda simulada")
+        return {
+            "production_code": state["production_code"] + name,
+            "history": [HistoryEntry(name)],
+        }
+
+    return node
+
+
+def _app(checkpointer, fail_once=False):
+    graph = StateGraph(TDDState)
+    graph.add_node("a", _step("a"))
+    graph.add_node("b", _step("b"))
+    graph.add_node("c", _step("c", fail_once))
+    graph.set_entry_point("a")
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.add_edge("c", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id, checkpoint_id=None):
+    configurable = {"thread_id": thread_id}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def test_resume_skips_steps_already_done(tmp_path):
+    calls.clear()
+    app = _app(SQLiteCheckpointer(str(tmp_path / "cp.sqlite")), fail_once=True)
+
+    try:
+        app.invoke({"production_code": "", "history": []}, _config("t1"))
+    except RuntimeError:
+        pass
+    # Outro processo: novo checkpointer sobre o mesmo arquivo
+    resumed = _app(SQLiteCheckpointer(str(tmp_path / "cp.sqlite")))
+    result = resumed.invoke(None, _config("t1"))
+
+    assert calls == ["a", "b", "c", "c"]
+    assert result["production_code"] == "abc"
+    assert [h.action for h in result["history"]] == ["a", "b", "c"]
+
+
+def test_history_is_stored_as_deltas(tmp_path):
+    checkpointer = SQLiteCheckpointer(str(tmp_path / "cp.sqlite"))
+    _app(checkpointer).invoke({"production_code": "", "history": []}, _config("t"))
+
+    rows = checkpointer._conn.execute(
+        "SELECT blob FROM blobs WHERE channel = 'history' AND type = ?",
+        (HISTORY_DELTA,),
+    ).fetchall()
+
+    assert [len(json.loads(blob)["entries"]) for (blob,) in rows] == [0, 1, 1, 1]
+
+
+def test_fork_reruns_from_earlier_checkpoint(tmp_path):
+    checkpointer = SQLiteCheckpointer(str(tmp_path / "cp.sqlite"))
+    app = _app(checkpointer)
+    app.invoke({"production_code": "", "history": []}, _config("t"))
+    after_a = next(s for s in app.get_state_history(_config("t")) if s.next == ("b",))
+
+    calls.clear()
+    checkpointer.fork("t", after_a.config["configurable"]["checkpoint_id"], "t2")
+    forked = app.invoke(None, _config("t2"))
+
+    assert calls == ["b", "c"]
+    assert forked["production_code"] == "abc"
+    assert len(forked["history"]) == 3
+    assert app.get_state(_config("t")).values["production_code"] == "abc"
+
+
+SCRIPT = os.path.join(
+    os.path.dirname(__file__), "..", "benchmarks", "scripts", "samples.json"
+)
+
+
+@pytest.fixture
+def scripted_app(monkeypatch, scripted_model, tracer):
+    """Grafo TDD real com o modelo de roteiro e uma queda no 1º teste da feature 2"""
+    scripted_model(load_script(SCRIPT) + DEFAULT_RULES)
+    crashed = []
+
+    def crash_once(test_code):
+        if "test_digitos_verificadores" in test_code and not crashed:
+            crashed.append(test_code)
+            raise RuntimeError("queda simulada")
+
+    run_tests, arun_tests = executeTestsTool.run_tests, executeTestsTool.arun_tests
+
+    def flaky_run(production_code, test_code, *args):
+        crash_once(test_code)
+        return run_tests(production_code, test_code, *args)
+
+    async def flaky_arun(production_code, test_code, *args):
+        crash_once(test_code)
+        return await arun_tests(production_code, test_code, *args)
+
+    monkeypatch.setattr(executeTestsTool, "run_tests", flaky_run)
+    monkeypatch.setattr(executeTestsTool, "arun_tests", flaky_arun)
+    return tracer
+
+
+def _node_runs(tracer, name):
+    return sum(1 for s in tracer.spans if s.kind == "node" and s.name == name)
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_tdd_app_resumes_fan_out_after_crash(tmp_path, scripted_app, mode):
+    tracer, path = scripted_app, str(tmp_path / "cp.sqlite")
+    state = initial_state("Crie um validador de CPF", str(tmp_path))
+    config = run_config("cpf")
+
+    def invoke(app, value):
+        if mode == "sync":
+            return app.invoke(value, config)
+        return asyncio.run(app.ainvoke(value, config))
+
+    with pytest.raises(RuntimeError, match="queda simulada"):
+        invoke(graph.compile(checkpointer=SQLiteCheckpointer(path)), state)
+    first_cycles = _node_runs(tracer, "feature_cycle")
+    tracer.spans.clear()
+
+    # Outro processo: novo checkpointer sobre o mesmo arquivo
+    result = invoke(graph.compile(checkpointer=SQLiteCheckpointer(path)), None)
+
+    assert first_cycles == 2
+    assert _node_runs(tracer, "decompose_features") == 0
+    if mode == "sync":
+        # A feature 1 terminou antes da queda: sua escrita pendente é
+        # reaproveitada (no ainvoke a queda cancela a tarefa irmã)
+        assert _node_runs(tracer, "feature_cycle") == 2
+    assert result["test_results"].all_passed
+    # Reducers: nada duplicado por causa da retomada
+    assert len(set(result["completed_features"])) == 3
+    assert len({r["feature"] for r in result["feature_results"]}) == 3
+    assert len(result["feature_results"]) == 3
+    merges = [h for h in result["history"] if h.action == "Integrar features"]
+    assert len(merges) == 2
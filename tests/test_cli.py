@@ -0,0 +1,59 @@
+import io
+import json
+
+from llm_agent_smith import cli, runner
+
+
+class _EchoApp:
+    async def ainvoke(self, state, config=None):
+        if "quebra" in state["user_request"]:
+            raise ValueError("falha simulada")
+        return {**state, "production_code": "def f():\n    return 1\n"}
+
+
+def test_read_requests_streams_and_reports_invalid_lines():
+    source = io.StringIO(
+        '{"request_id": "a", "title": "Soma", "body": "somar dois números"}\n'
+        "não é json\n"
+        "\n"
+        '{"id": "b", "user_request": "subtrair"}\n'
+        '{"request_id": "c"}\n'
+        '{"request_id": "d", "request": "dividir"}\n'
+    )
+    invalid = []
+
+    items = list(cli.read_requests(source, invalid.append, skip={"d"}))
+
+    assert items == [("a", "Soma\n\nsomar dois números"), ("b", "subtrair")]
+    assert [(r["request_id"], r["status"]) for r in invalid] == [
+        ("linha-2", "invalid"),
+        ("c", "invalid"),
+    ]
+
+
+def test_batch_writes_one_record_per_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "tdd_app", _EchoApp())
+    source = tmp_path / "requests.jsonl"
+    source.write_text(
+        "\n".join(
+            json.dumps({"request_id": f"r{i}", "request": text})
+            for i, text in enumerate(["soma", "quebra", "sub"])
+        )
+    )
+    output = tmp_path / "results.jsonl"
+
+    exit_code = cli.main(["batch", str(source), "-o", str(output), "-c", "2"])
+    records = {
+        r["request_id"]: r for r in map(json.loads, output.read_text().splitlines())
+    }
+
+    assert exit_code == 1
+    assert records["r0"]["status"] == "failed"
+    assert records["r0"]["production_code"].startswith("def f")
+    assert records["r1"]["status"] == "error"
+    assert "falha simulada" in records["r1"]["error"]
+    assert set(records["r2"]["tokens"]) == {
+        "input_tokens",
+        "output_tokens",
+        "total_tokens",
+    }
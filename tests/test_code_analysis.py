@@ -0,0 +1,61 @@
+import pytest
+
+from llm_agent_smith.executors.preflight import preflight_check
+from llm_agent_smith.utils.codeAnalysis import (
+    analysis_stats,
+    analyze,
+    clear_analysis_cache,
+    parse,
+)
+from llm_agent_smith.utils.codeUtils import is_code_safe, validate_interface
+
+CODE = """import os
+from .util import ajuda
+
+
+def soma(a, b):
+    return a + b
+
+
+async def busca():
+    import json
+
+
+class _Interno:
+    pass
+"""
+
+
+def test_symbols_and_imports():
+    analysis = analyze(CODE)
+
+    assert analysis.definitions == ("soma", "busca", "_Interno")
+    assert analysis.public_symbols == {"soma", "busca"}
+    assert analysis.imports == {"os", ".util", "json"}
+
+
+def test_each_version_is_parsed_once_by_all_checks():
+    clear_analysis_cache()
+    tests = "def test_soma():\n    assert soma(1, 2) == 3\n"
+
+    assert validate_interface(CODE, CODE)
+    assert is_code_safe(CODE)
+    assert preflight_check(CODE, tests) is None
+
+    # CODE, os testes e o TEST_HEADER: uma análise cada
+    assert analysis_stats()["misses"] == 3
+    # A verificação de segurança nem analisa CODE (nenhuma palavra proibida)
+    assert analysis_stats()["hits"] >= 2
+    assert parse(CODE) is parse(CODE)
+
+
+def test_syntax_error_is_raised_on_every_parse():
+    code = "def f(:\n    pass\n"
+
+    for _ in range(2):
+        with pytest.raises(SyntaxError) as error:
+            parse(code, "production.py")
+        assert error.value.filename == "production.py"
+        assert error.value.lineno == 1
+    assert analyze(code).public_symbols == frozenset()
+    assert not validate_interface("def f():\n    pass\n", code)
@@ -0,0 +1,49 @@
+from llm_agent_smith.utils.codeMerge import (
+    ModuleUnits,
+    merge_code,
+    merge_modules,
+    merge_tests,
+)
+
+
+def test_imports_are_deduplicated_and_grouped():
+    suite = "import pytest\nfrom math import sqrt\n\n\ndef test_a():\n    assert sqrt(4) == 2\n"
+    new = "import pytest\nfrom math import floor, sqrt\n\n\ndef test_b():\n    assert floor(1.5) == 1\n"
+
+    merged = merge_tests(suite, new)
+
+    assert merged.startswith("import pytest\nfrom math import sqrt, floor\n")
+    assert merged.count("import pytest") == 1
+    compile(merged, "merged", "exec")
+
+
+def test_identical_test_is_dropped_and_colliding_test_is_renamed():
+    suite = "def test_soma():\n    assert soma(1, 2) == 3\n"
+
+    assert merge_tests(suite, "def test_soma():\n    assert soma(1,2) == 3") == suite
+
+    merged = merge_tests(suite, "def test_soma():\n    assert soma(2, 2) == 4\n")
+    assert list(ModuleUnits.parse(merged).units) == ["test_soma", "test_soma_2"]
+
+
+def test_production_change_replaces_only_the_changed_unit():
+    code = "LIMITE = 10\n\n\ndef soma(a, b):\n    return 0\n\n\ndef sub(a, b):\n    return a - b\n"
+
+    merged = merge_code(code, "def soma(a, b):\n    return a + b\n")
+
+    units = ModuleUnits.parse(merged).units
+    assert list(units) == ["LIMITE", "soma", "sub"]
+    assert "return a + b" in units["soma"]
+
+
+def test_invalid_new_code_is_appended_to_surface_the_error():
+    assert merge_code("x = 1\n", "def quebrado(:") == "x = 1\n\n\ndef quebrado(:"
+
+
+def test_parallel_branches_adding_same_test_name_keep_both():
+    left = "def test_valor():\n    assert soma(1, 1) == 2\n"
+    right = "def test_valor():\n    assert sub(1, 1) == 0\n"
+
+    merged = merge_modules("", [left, right], rename_tests=True)
+
+    assert "def test_valor():" in merged and "def test_valor_2():" in merged
@@ -0,0 +1,65 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_agent_smith.models import llmInvoker
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+from llm_agent_smith.utils.codeUtils import CodeBlockStream
+
+RESPONSE = (
+    "Aqui está o teste:\n```python\ndef test_soma():\n    assert soma(1, 2) == 3\n```\n"
+    "Explicação: este teste verifica a soma de dois números inteiros."
+)
+
+
+consumed = []
+
+
+class _CountingFake(FakeListChatModel):
+    """Registra quantos chunks foram efetivamente consumidos"""
+
+    def _stream(self, *args, **kwargs):
+        for chunk in super()._stream(*args, **kwargs):
+            consumed.append(chunk)
+            yield chunk
+
+
+def test_fences_split_across_chunks_are_detected():
+    stream = CodeBlockStream()
+    chunks = ["Texto ``", "`pyt", "hon\nx = 1\n`", "`", "`\nprosa", " extra"]
+
+    done = [stream.feed(chunk) for chunk in chunks]
+
+    assert done == [False, False, False, False, True, True]
+    assert stream.code() == "x = 1"
+    assert not stream.text.endswith("prosa")
+
+
+def test_response_without_fence_is_kept_whole():
+    stream = CodeBlockStream()
+    stream.feed("def f():\n")
+    stream.feed("    return 1\n")
+
+    assert not stream.complete
+    assert stream.code() == "def f():\n    return 1"
+
+
+def test_generation_stops_after_code_block():
+    prompt = ChatPromptTemplate.from_template("Teste para {feature}")
+    fake = _CountingFake(responses=[RESPONSE, RESPONSE])
+    ModelRegistry.use(fake)
+    try:
+        content = llmInvoker.invoke_llm(
+            prompt, {"feature": "soma"}, until_code_block=True
+        )
+        acontent = asyncio.run(
+            llmInvoker.ainvoke_llm(prompt, {"feature": "soma"}, until_code_block=True)
+        )
+    finally:
+        ModelRegistry.use(None)
+
+    assert content == acontent
+    assert content.endswith("```")
+    assert "Explicação" not in content
+    assert len(consumed) < len(RESPONSE)
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from llm_agent_smith.models.fakeModels import (
+    DEFAULT_RULES,
+    ReplayChatModel,
+    ScriptedChatModel,
+)
+from llm_agent_smith.models.geminiModel import GeminiModel
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+
+
+def test_scripted_responses_follow_rule_order():
+    model = ScriptedChatModel(
+        rules=[{"match": r"^Feature: soma$", "responses": ["primeira", "segunda"]}]
+        + DEFAULT_RULES
+    )
+
+    assert model.invoke("Feature: soma").content == "primeira"
+    assert model.invoke("Feature: soma").content == "segunda"
+    assert model.invoke("Feature: soma").content == "segunda"
+    refactor = "Refatore o código:\nCódigo atual:\nx = 1\n\nDiretrizes:\n1. KISS"
+    assert model.invoke(refactor).content == "```python\nx = 1\n```"
+    with pytest.raises(LookupError):
+        model.invoke("Feature: outra")
+
+
+def test_scripted_stream_reports_usage_in_last_chunk():
+    model = ScriptedChatModel(rules=[{"match": "x", "responses": ["a\nb\n"]}])
+
+    chunks = list(model.stream("x"))
+
+    assert "".join(chunk.content for chunk in chunks) == "a\nb\n"
+    assert chunks[-1].usage_metadata["output_tokens"] == 1
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "gravacao.jsonl")
+    recorder = ReplayChatModel(
+        path=path, inner=FakeListChatModel(responses=["um", "dois"])
+    )
+    assert recorder.invoke("p").content == "um"
+    assert recorder.invoke("p").content == "dois"
+
+    replay = ReplayChatModel(path=path)
+    assert [replay.invoke("p").content for _ in range(3)] == ["um", "dois", "dois"]
+    with pytest.raises(LookupError):
+        replay.invoke("desconhecido")
+    assert len(open(path).readlines()) == 2
+
+
+def test_backend_is_selected_by_model_name(tmp_path):
+    script = tmp_path / "roteiro.json"
+    script.write_text(json.dumps({"rules": [{"match": "oi", "responses": ["olá"]}]}))
+    ModelRegistry.reset()
+    try:
+        model = GeminiModel.llm_model(f"fake:{script}")
+    finally:
+        ModelRegistry.reset()
+
+    assert isinstance(model, ScriptedChatModel)
+    assert model.invoke("oi").content == "olá"
@@ -0,0 +1,79 @@
+from langgraph.types import Send
+
+from llm_agent_smith.tools.decomposeFeaturesTool import parse_feature_graph
+from llm_agent_smith.tools.selectNextFeatureTool import (
+    ready_features,
+    select_ready_features,
+)
+from llm_agent_smith.utils.codeMerge import merge_modules
+
+
+def _state(features, deps, completed=()):
+    return {
+        "user_request": "pedido",
+        "features": features,
+        "feature_deps": deps,
+        "completed_features": list(completed),
+        "production_code": "",
+        "test_code": "",
+    }
+
+
+def test_plain_list_becomes_linear_chain():
+    features, deps = parse_feature_graph('["a", "b", "c"]', "pedido")
+
+    assert features == ["a", "b", "c"]
+    assert deps == {"a": [], "b": ["a"], "c": ["b"]}
+
+
+def test_objects_with_dependencies_inside_code_fence():
+    content = (
+        "```json\n"
+        '[{"id": 1, "feature": "formato"}, {"id": 2, "feature": "digitos"},'
+        ' {"id": 3, "feature": "validador", "depends_on": [1, 2, 42]}]\n'
+        "```"
+    )
+    features, deps = parse_feature_graph(content, "pedido")
+
+    assert features == ["formato", "digitos", "validador"]
+    assert deps["validador"] == ["formato", "digitos"]
+
+
+def test_invalid_json_falls_back_to_whole_request():
+    assert parse_feature_graph("não é json", "pedido") == (
+        ["pedido"],
+        {"pedido": []},
+    )
+
+
+def test_independent_features_fan_out_together():
+    state = _state(["a", "b", "c"], {"a": [], "b": [], "c": ["a"]})
+
+    sends = select_ready_features(state)
+
+    assert all(isinstance(s, Send) for s in sends)
+    assert [s.arg["current_feature"] for s in sends] == ["a", "b"]
+    assert ready_features({**state, "completed_features": ["a", "b"]}) == ["c"]
+
+
+def test_nothing_left_goes_to_finalize():
+    state = _state(["a"], {"a": []}, completed=["a"])
+
+    assert select_ready_features(state) == "finalize"
+
+
+def test_cycle_does_not_deadlock():
+    assert ready_features(_state(["a", "b"], {"a": ["b"], "b": ["a"]})) == ["a", "b"]
+
+
+def test_merge_keeps_definitions_from_every_branch():
+    base = "import re\n\n\ndef base():\n    return 1\n"
+    left = base + "\n\ndef soma(a, b):\n    return a + b\n"
+    right = "import math\n" + base + "\n\ndef sub(a, b):\n    return a - b\n"
+
+    merged = merge_modules(base, [left, right])
+
+    assert merged.startswith("import re\nimport math\n")
+    for name in ("def base", "def soma", "def sub"):
+        assert merged.count(name) == 1
+    compile(merged, "merged", "exec")
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+
+import pytest
+
+from llm_agent_smith.executors.forkServerExecutor import ForkServerExecutor
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requer os.fork")
+
+PRODUCTION = "def soma(a, b):\n    return a + b\n"
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ForkServerExecutor(timeout=1, memory_limit_mb=512) as ex:
+        yield ex
+
+
+def test_results_and_selection_come_back_over_the_socket(executor):
+    tests = (
+        "def test_ok():\n    assert soma(1, 2) == 3\n\n\n"
+        "def test_falha():\n    assert soma(1, 1) == 3\n"
+    )
+
+    full = executor.run(PRODUCTION, tests)
+    selected = executor.run(PRODUCTION, tests, ["test_ok"])
+
+    assert (full.passed, full.failed) == (1, 1)
+    assert [c.name for c in selected.cases] == ["test_ok"]
+
+
+def test_writes_outside_scratch_and_subprocesses_are_blocked(executor, tmp_path):
+    target = tmp_path / "fora.txt"
+    tests = (
+        f"def test_fora():\n    open({str(target)!r}, 'w').write('x')\n\n\n"
+        "def test_tmp(tmp_path):\n    (tmp_path / 'a.txt').write_text('ok')\n\n\n"
+        "def test_processo():\n    import os\n    os.system('true')\n"
+    )
+
+    result = executor.run(PRODUCTION, tests)
+
+    outcomes = {c.name: c.outcome for c in result.cases}
+    assert outcomes == {
+        "test_fora": "failed",
+        "test_tmp": "passed",
+        "test_processo": "failed",
+    }
+    assert "PermissionError" in result.failure_report()
+    assert not target.exists()
+
+
+def test_runaway_test_is_killed_by_wall_clock(executor):
+    result = executor.run(
+        PRODUCTION, "def test_loop():\n    while True:\n        pass\n"
+    )
+
+    assert not result.all_passed
+    assert "Timeout" in result.output
+
+
+def test_scratch_of_killed_run_is_removed_with_the_server():
+    with ForkServerExecutor(timeout=1, memory_limit_mb=512) as ex:
+        result = ex.run(PRODUCTION, "def test_loop():\n    while True:\n        pass\n")
+        server_dir = ex._dir
+        leftovers = [n for n in os.listdir(server_dir) if n.startswith("tdd-run-")]
+
+    assert "Timeout" in result.output
+    # O filho morto pelo alarme não limpa o próprio diretório
+    assert len(leftovers) == 1
+    assert not os.path.exists(server_dir)
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_server_that_fails_to_start_is_not_reported_as_timeout(mode, monkeypatch):
+    ex = ForkServerExecutor(timeout=5)
+
+    def never_ready():
+        raise TimeoutError("Servidor de fork do pytest não inicializou a tempo")
+
+    monkeypatch.setattr(ex, "_ensure_server", never_ready)
+    if mode == "sync":
+        result = ex.run(PRODUCTION, "def test_ok():\n    pass\n")
+    else:
+        result = asyncio.run(ex.arun(PRODUCTION, "def test_ok():\n    pass\n"))
+
+    assert result.exit_code == -1
+    assert "Servidor de fork falhou" in result.output
+    assert "Timeout ao executar" not in result.output
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_server_killed_between_runs_is_restarted(mode):
+    tests = "def test_ok():\n    assert soma(1, 2) == 3\n"
+    with ForkServerExecutor(timeout=5, memory_limit_mb=512) as ex:
+
+        def run():
+            if mode == "sync":
+                return ex.run(PRODUCTION, tests)
+            return asyncio.run(ex.arun(PRODUCTION, tests))
+
+        assert run().all_passed
+        old_pid = ex._server.pid
+        ex._server.kill()
+        ex._server.join()
+
+        result = run()
+
+        assert result.all_passed
+        assert ex._server.pid != old_pid
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_server_dying_mid_run_returns_failed_result(mode, monkeypatch):
+    tests = "def test_ok():\n    assert soma(1, 2) == 3\n"
+    with ForkServerExecutor(timeout=5, memory_limit_mb=512) as ex:
+        assert ex.run(PRODUCTION, tests).all_passed
+        ensure_server = ex._ensure_server
+
+        def dies_after_check():
+            # O servidor cai entre a checagem e a conexão (socket ainda existe)
+            ex._server.kill()
+            ex._server.join()
+
+        monkeypatch.setattr(ex, "_ensure_server", dies_after_check)
+        if mode == "sync":
+            result = ex.run(PRODUCTION, tests)
+        else:
+            result = asyncio.run(ex.arun(PRODUCTION, tests))
+
+        assert result.exit_code == -1
+        assert "Servidor de fork falhou" in result.output
+        monkeypatch.setattr(ex, "_ensure_server", ensure_server)
+        assert ex.run(PRODUCTION, tests).all_passed
+
+
+def test_connection_reset_during_async_send_returns_failed_result(monkeypatch):
+    ex = ForkServerExecutor(timeout=2)
+    ex._dir = tempfile.mkdtemp(prefix="tdd-forkserver-")
+    monkeypatch.setattr(ex, "_ensure_server", lambda: None)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(ex.socket_path)
+    listener.listen(1)
+
+    def drop_connection():
+        # Servidor que cai no meio da rodada: fecha sem ler a requisição
+        conn, _ = listener.accept()
+        conn.recv(16)
+        conn.close()
+
+    threading.Thread(target=drop_connection, daemon=True).start()
+    try:
+        result = asyncio.run(
+            ex.arun("x = 1\n" * 2_000_000, "def test_x():\n    pass\n")
+        )
+    finally:
+        listener.close()
+        ex.close()
+
+    assert result.exit_code == -1
+    assert "Servidor de fork falhou" in result.output
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_agent_smith.models import llmInvoker
+from llm_agent_smith.models.fakeModels import OfflineChatModel
+from llm_agent_smith.models.hedging import HedgingPolicy, set_hedging_policy
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+from llm_agent_smith.tracing.tracer import Tracer, get_tracer, set_tracer
+
+
+def _policy(max_rate: float = 1.0) -> HedgingPolicy:
+    policy = HedgingPolicy(percentile=0.5, max_rate=max_rate, min_samples=3)
+    for _ in range(3):
+        policy.record("write_test", 0.02)
+    return policy
+
+
+def _in_node(tracer: Tracer, func):
+    previous = get_tracer()
+    set_tracer(tracer)
+    try:
+        with tracer.span("node", "write_test"):
+            return func()
+    finally:
+        set_tracer(previous)
+
+
+def test_slow_call_is_hedged_and_loser_cancelled():
+    calls, cancelled_events = [], []
+    lock = threading.Lock()
+
+    def request(cancelled):
+        with lock:
+            calls.append(len(calls))
+            first = len(calls) == 1
+        if first:
+            cancelled_events.append(cancelled)
+            cancelled.wait(2)
+            return "lenta"
+        return "rápida"
+
+    tracer, policy = Tracer(), _policy()
+    started = time.perf_counter()
+    result = _in_node(tracer, lambda: policy.run(request))
+
+    assert result == "rápida"
+    assert time.perf_counter() - started < 1
+    assert cancelled_events[0].is_set()
+    assert tracer.metrics.value("tdd_llm_hedges_total", winner="hedge") == 1
+
+
+def test_async_hedge_cancels_the_slow_task():
+    outcome = {}
+
+    async def request(cancelled):
+        if "primary" not in outcome:
+            outcome["primary"] = "running"
+            try:
+                await asyncio.sleep(2)
+            except asyncio.CancelledError:
+                outcome["primary"] = "cancelled"
+                raise
+            return "lenta"
+        return "rápida"
+
+    async def main():
+        result = await _policy().arun(request)
+        await asyncio.sleep(0)
+        return result
+
+    assert _in_node(Tracer(), lambda: asyncio.run(main())) == "rápida"
+    assert outcome["primary"] == "cancelled"
+
+
+def test_hedge_rate_cap_bounds_duplicates():
+    calls = []
+
+    def request(cancelled):
+        calls.append(1)
+        time.sleep(0.1)
+        return "ok"
+
+    assert _in_node(Tracer(), lambda: _policy(max_rate=0).run(request)) == "ok"
+    assert len(calls) == 1
+
+
+class SlowFirstModel(OfflineChatModel):
+    """Primeira chamada demora; as seguintes respondem na hora"""
+
+    calls: int = 0
+
+    def respond(self, prompt):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(1)
+        return f"resposta {self.calls}", None
+
+
+def test_invoke_llm_uses_hedging_policy():
+    policy = HedgingPolicy(percentile=0.5, max_rate=1.0, min_samples=3)
+    for _ in range(3):
+        policy.record(None, 0.02)
+    set_hedging_policy(policy)
+    ModelRegistry.use(SlowFirstModel())
+    llmInvoker.set_llm_cache(None)
+    prompt = ChatPromptTemplate.from_template("Pergunta: {q}")
+    try:
+        started = time.perf_counter()
+        answer = llmInvoker.invoke_llm(prompt, {"q": "x"})
+    finally:
+        ModelRegistry.use(None)
+        set_hedging_policy(None)
+
+    assert answer == "resposta 2"
+    assert time.perf_counter() - started < 0.9
+
+
+def test_time_queued_in_the_pool_does_not_trigger_a_hedge():
+    tracer, policy = Tracer(), _policy()
+    policy._pool = ThreadPoolExecutor(max_workers=2)
+    release = threading.Event()
+    # Threads do pool ocupadas por outras chamadas bem mais longas que o prazo
+    busy = [policy._pool.submit(release.wait, 2) for _ in range(2)]
+    threading.Timer(0.2, release.set).start()
+    calls = []
+
+    def request(cancelled):
+        calls.append(1)
+        time.sleep(0.005)
+        return "ok"
+
+    result = _in_node(tracer, lambda: policy.run(request))
+
+    assert result == "ok"
+    assert calls == [1]
+    assert not any(policy._recent)
+    assert max(policy._latencies["write_test"]) < 0.1
+    for future in busy:
+        future.result()
@@ -0,0 +1,77 @@
+import tracemalloc
+
+from langgraph.graph import END, StateGraph
+
+from llm_agent_smith.states.TDDState import TDDState
+from llm_agent_smith.states.historyLog import HistoryEntry, HistoryLog, append_history
+
+STEPS = 200
+
+
+def _initial_state() -> TDDState:
+    return {
+        "user_request": "benchmark",
+        "features": [],
+        "current_feature": None,
+        "production_code": "",
+        "test_code": "",
+        "test_results": None,
+        "history": [],
+        "iteration_count": 0,
+    }
+
+
+def _step(state: TDDState) -> TDDState:
+    return {
+        "iteration_count": state["iteration_count"] + 1,
+        "history": [HistoryEntry("Passo", "x" * 100)],
+    }
+
+
+def _build_loop():
+    graph = StateGraph(TDDState)
+    graph.add_node("step", _step)
+    graph.set_entry_point("step")
+    graph.add_conditional_edges(
+        "step",
+        lambda s: END if s["iteration_count"] >= STEPS else "step",
+    )
+    return graph.compile()
+
+
+def test_append_shares_storage_between_versions():
+    first = HistoryLog([HistoryEntry("a")])
+    second = append_history(first, [HistoryEntry("b")])
+
+    assert len(first) == 1
+    assert [e.action for e in second] == ["a", "b"]
+
+
+def test_append_to_older_version_forks():
+    base = HistoryLog([HistoryEntry("a")])
+    left = base.append([HistoryEntry("b")])
+    right = base.append([HistoryEntry("c")])
+
+    assert [e.action for e in left] == ["a", "b"]
+    assert [e.action for e in right] == ["a", "c"]
+
+
+def test_reducer_accepts_dicts():
+    log = append_history([], {"action": "a", "details": "d", "timestamp": "t"})
+
+    assert log[0].to_dict() == {"timestamp": "t", "action": "a", "details": "d"}
+
+
+def test_history_grows_linearly_over_200_step_loop():
+    app = _build_loop()
+
+    tracemalloc.start()
+    final_state = app.invoke(_initial_state(), {"recursion_limit": STEPS + 10})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(final_state["history"]) == STEPS
+    assert final_state["iteration_count"] == STEPS
+    # Com o reducer antigo (l1 + l2 sobre o histórico inteiro) o tamanho dobrava
+    # a cada passo; aqui o pico de memória deve continuar na casa de poucos MB.
+    assert peak < 2 * 1024 * 1024
@@ -0,0 +1,54 @@
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_agent_smith.cache.llmResponseCache import LLMResponseCache
+from llm_agent_smith.models import llmInvoker
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+
+
+def test_hit_and_miss_are_counted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"))
+    key = cache.make_key("prompt", "modelo", 0.0)
+
+    assert cache.get(key) is None
+    cache.put(key, "resposta", "modelo")
+    assert cache.get(key) == "resposta"
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), ttl=-1)
+    cache.put("a", "1")
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_invoke_llm_replays_from_cache(tmp_path):
+    prompt = ChatPromptTemplate.from_template("Pergunta: {q}")
+    fake = FakeListChatModel(responses=["primeira", "segunda"])
+    llmInvoker.set_llm_cache(LLMResponseCache(str(tmp_path / "cache.sqlite")))
+    ModelRegistry.use(fake)
+    try:
+        first = llmInvoker.invoke_llm(prompt, {"q": "x"})
+        replay = llmInvoker.invoke_llm(prompt, {"q": "x"})
+        retry = llmInvoker.invoke_llm(prompt, {"q": "x"}, cache_salt="tentativa-2")
+    finally:
+        ModelRegistry.use(None)
+        llmInvoker.set_llm_cache(None)
+
+    assert first == replay == "primeira"
+    assert retry == "segunda"
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+
+from config.main import AppConfig
+from llm_agent_smith.models import llmInvoker, llmScheduler
+from llm_agent_smith.models.llmScheduler import (
+    LLMScheduler,
+    TokenBucket,
+    node_priority,
+    set_llm_scheduler,
+)
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+from llm_agent_smith.models.modelRouter import ModelRouter, set_model_router
+from llm_agent_smith.tracing.tracer import Tracer, get_tracer, set_tracer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(120, clock)
+
+    bucket.take(120)
+    assert bucket.wait_time(10) == pytest.approx(5.0)
+    clock.now = 5.0
+    assert bucket.wait_time(10) == 0.0
+    bucket.take(-1000)
+    assert bucket.available == 120
+
+
+def test_fixes_jump_ahead_of_decompositions():
+    scheduler = LLMScheduler(requests_per_minute=600)
+    scheduler.requests.drain()
+    order = []
+
+    async def call(name: str):
+        async def request():
+            order.append(name)
+
+        await scheduler.acall(request, tokens=0, priority=node_priority(name))
+
+    async def main():
+        first = asyncio.create_task(call("decompose_features"))
+        await asyncio.sleep(0.02)
+        await asyncio.gather(first, call("implement_fix"))
+
+    asyncio.run(main())
+
+    assert order == ["implement_fix", "decompose_features"]
+    assert scheduler.depth == 0
+
+
+class QuotaEndpoint(BaseHTTPRequestHandler):
+    """generateContent local: responde 429 às primeiras `quota_errors` chamadas"""
+
+    quota_errors = 2
+    calls = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.calls.append(self.path)
+        if len(self.calls) <= self.quota_errors:
+            status, body = 429, {
+                "error": {
+                    "code": 429,
+                    "message": "Quota exceeded",
+                    "status": "RESOURCE_EXHAUSTED",
+                }
+            }
+        else:
+            status, body = 200, {
+                "candidates": [
+                    {
+                        "content": {"parts": [{"text": "olá"}], "role": "model"},
+                        "finishReason": "STOP",
+                    }
+                ],
+                "usageMetadata": {
+                    "promptTokenCount": 3,
+                    "candidatesTokenCount": 1,
+                    "totalTokenCount": 4,
+                },
+            }
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def quota_endpoint(monkeypatch):
+    pytest.importorskip("langchain_google_genai")
+    QuotaEndpoint.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuotaEndpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(AppConfig, "GOOGLE_API_KEY", "chave-de-teste")
+    monkeypatch.setenv("GOOGLE_API_KEY", "chave-de-teste")
+    monkeypatch.setattr(AppConfig, "DEFAULT_LLM_MODEL", "gemini-2.5-flash")
+    monkeypatch.setattr(
+        AppConfig, "GEMINI_API_ENDPOINT", f"http://127.0.0.1:{server.server_port}"
+    )
+    ModelRegistry.reset()
+    llmInvoker.set_llm_cache(None)
+    yield QuotaEndpoint.calls
+    ModelRegistry.reset()
+    server.shutdown()
+
+
+def test_quota_errors_are_retried_with_backoff(quota_endpoint):
+    tracer, previous = Tracer(), get_tracer()
+    set_tracer(tracer)
+    set_llm_scheduler(LLMScheduler(backoff_base=0.01, backoff_max=0.05))
+    prompt = ChatPromptTemplate.from_template("Pergunta: {q}")
+    try:
+        answer = llmInvoker.invoke_llm(prompt, {"q": "oi"})
+    finally:
+        set_llm_scheduler(None)
+        set_tracer(previous)
+
+    assert answer == "olá"
+    assert len(quota_endpoint) == 3
+    assert tracer.metrics.value("tdd_llm_quota_errors_total") == 2
+    assert tracer.metrics.value("tdd_llm_queue_wait_seconds_count") == 3
+    assert "tdd_llm_queue_depth{} 0" in tracer.prometheus()
+
+
+def test_route_latency_excludes_backoff(quota_endpoint, monkeypatch):
+    # Jitter no máximo: as duas esperas somam 0.6s
+    monkeypatch.setattr(llmScheduler.random, "uniform", lambda low, high: high)
+    router = ModelRouter()
+    set_model_router(router)
+    set_llm_scheduler(LLMScheduler(backoff_base=0.3, backoff_max=0.3))
+    prompt = ChatPromptTemplate.from_template("Pergunta: {q}")
+    try:
+        llmInvoker.invoke_llm(prompt, {"q": "oi"})
+    finally:
+        set_llm_scheduler(None)
+        set_model_router(None)
+
+    [row] = router.stats()
+    assert row["calls"] == 1
+    assert row["seconds"] < 0.3
+
+
+def test_gives_up_after_max_retries(quota_endpoint):
+    set_llm_scheduler(LLMScheduler(max_retries=1, backoff_base=0.01))
+    prompt = ChatPromptTemplate.from_template("Pergunta: {q}")
+    try:
+        with pytest.raises(Exception, match="Quota exceeded"):
+            llmInvoker.invoke_llm(prompt, {"q": "oi"})
+    finally:
+        set_llm_scheduler(None)
+
+    assert len(quota_endpoint) == 2
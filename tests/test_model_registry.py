@@ -0,0 +1,33 @@
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from llm_agent_smith.models.geminiModel import GeminiModel
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+
+
+def test_same_key_reuses_client(monkeypatch):
+    built = []
+
+    def factory(model_name, **params):
+        built.append(model_name)
+        return FakeListChatModel(responses=["ok"])
+
+    monkeypatch.setattr(ModelRegistry, "_factory", factory)
+    monkeypatch.setattr(ModelRegistry, "_models", {})
+
+    first = GeminiModel.llm_model("modelo-a", temperature=0)
+    second = GeminiModel.llm_model("modelo-a", temperature=0)
+    other = GeminiModel.llm_model("modelo-a", temperature=1)
+
+    assert first is second
+    assert other is not first
+    assert built == ["modelo-a", "modelo-a"]
+
+
+def test_use_overrides_every_lookup():
+    fake = FakeListChatModel(responses=["ok"])
+    ModelRegistry.use(fake)
+    try:
+        assert GeminiModel.llm_model() is fake
+        assert GeminiModel.llm_model("outro-modelo") is fake
+    finally:
+        ModelRegistry.use(None)
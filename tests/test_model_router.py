@@ -0,0 +1,88 @@
+import pytest
+
+from llm_agent_smith.executors.testResult import TestCaseResult, TestRunResult
+from llm_agent_smith.models.modelRouter import (
+    MIN_ROUTE_SAMPLES,
+    ModelRouter,
+    get_model_router,
+    parse_routes,
+)
+from llm_agent_smith.tools.executeTestsTool import execute_tests
+from llm_agent_smith.tools.implementMinimalFixTool import implement_minimal_fix
+from llm_agent_smith.tracing.tracer import traced
+
+ROUTES = "implement_fix=tier:barato>tier:forte; *=tier:padrao"
+
+FIXES = {
+    "tier:barato": "```python\ndef soma(a, b):\n    return a - b\n```",
+    "tier:forte": "```python\ndef soma(a, b):\n    return a + b\n```",
+}
+
+
+def test_ladder_escalates_and_light_model_takes_small_prompts():
+    router = ModelRouter(
+        parse_routes(ROUTES), light_model="tier:leve", light_prompt_tokens=100
+    )
+
+    assert router.select("implement_fix", 0, prompt_tokens=500) == "tier:barato"
+    assert router.select("implement_fix", 1, prompt_tokens=500) == "tier:forte"
+    assert router.select("implement_fix", 5, prompt_tokens=500) == "tier:forte"
+    assert router.select("implement_fix", 0, prompt_tokens=50) == "tier:leve"
+    assert router.select("refactor", 0, prompt_tokens=500) == "tier:padrao"
+
+
+def test_unreliable_rung_is_skipped():
+    router = ModelRouter(parse_routes(ROUTES), min_success=0.5)
+    for _ in range(MIN_ROUTE_SAMPLES):
+        router.record_outcome("implement_fix", "tier:barato", False)
+
+    assert router.select("implement_fix", 0) == "tier:forte"
+    assert router.select("write_test", 0) == "tier:padrao"
+
+
+@pytest.fixture
+def tiers(scripted_model, tracer):
+    scripted_model(
+        {
+            model: [{"match": "CORREÇÃO MÍNIMA", "responses": [fix]}]
+            for model, fix in FIXES.items()
+        },
+        routes=ROUTES,
+    )
+    return get_model_router(), tracer
+
+
+def test_failed_fix_escalates_to_stronger_model(tiers):
+    router, tracer = tiers
+    failing = TestCaseResult(
+        nodeid="test_production.py::test_soma", outcome="failed", message="0 != 5"
+    )
+    state = {
+        "current_feature": "somar dois números",
+        "production_code": "def soma(a, b):\n    return 0\n",
+        "test_code": "def test_soma():\n    assert soma(2, 3) == 5\n",
+        "test_results": TestRunResult(failed=1, cases=[failing]),
+        "test_scope": None,
+        # write_test já contou uma volta
+        "iteration_count": 1,
+        "history": [],
+    }
+
+    # Como no grafo: o nó em execução escolhe a rota
+    fix = traced("implement_fix", implement_minimal_fix)
+    for model in ("tier:barato", "tier:forte"):
+        state.update(fix(state))
+        assert state["fix_model"] == model
+        state.update(execute_tests(state))
+        assert state["fix_model"] is None
+
+    assert state["test_results"].all_passed
+    outcomes = {
+        row["model"]: (row["calls"], row["success_rate"]) for row in router.stats()
+    }
+    assert outcomes == {"tier:barato": (1, 0.0), "tier:forte": (1, 1.0)}
+    assert tracer.metrics.value("tdd_llm_routes_total") == 2
+    assert (
+        'model="tier:forte",node="implement_fix",outcome="success"'
+        in tracer.prometheus()
+    )
@@ -0,0 +1,113 @@
+import pytest
+
+from llm_agent_smith.executors.preflight import preflight_check, preflight_failure
+from llm_agent_smith.tools.featureCycleTool import feature_app
+from llm_agent_smith.tools.preflightTool import after_preflight, preflight
+
+PRODUCTION = "import math\n\n\ndef soma(a, b):\n    return a + b\n\n\n_PI = math.pi\n"
+TESTS = (
+    "import pytest\n\n\n"
+    "@pytest.mark.parametrize('a, b', [(1, 2)])\n"
+    "def test_soma(a, b):\n    total = soma(a, b)\n    assert total == re.sub('', '', '3')\n"
+)
+
+
+def test_valid_files_pass():
+    assert preflight_check(PRODUCTION, TESTS) is None
+
+
+def test_syntax_errors_are_reported_with_location():
+    error = preflight_check("def soma(a, b)\n    return a + b\n", TESTS)
+    assert error.startswith('  File "production.py", line 1')
+    assert "SyntaxError" in error
+
+    error = preflight_check(PRODUCTION, "def test_x():\n    assert soma(1,\n")
+    assert 'File "test_production.py"' in error
+
+
+def test_names_missing_from_production_are_reported():
+    tests = (
+        "from production import media\n\n\ndef test_x():\n    assert subtrai(3, 1)\n"
+    )
+
+    error = preflight_check(PRODUCTION, tests)
+
+    assert error.startswith("NameError")
+    assert "media (linha 1)" in error and "subtrai (linha 5)" in error
+    assert "_PI" in preflight_check(PRODUCTION, "def test_x():\n    assert _PI\n")
+
+
+def test_unknown_star_import_skips_name_check():
+    assert preflight_check(PRODUCTION, "from math import *\n\n\nx = pi\n") is None
+
+
+def test_failed_preflight_skips_execute_tests():
+    state = {
+        "current_feature": "somar",
+        "production_code": "",
+        "test_code": "def test_soma():\n    assert soma(1, 2) == 3\n",
+        "iteration_count": 0,
+    }
+
+    update = preflight(state)
+
+    assert update["test_results"].errors == 1
+    assert "soma" in update["test_results"].failure_report()
+    assert after_preflight({**state, **update}) == "implement_fix"
+    assert after_preflight({**state, "preflight_error": None}) == "execute_tests"
+
+
+def test_broken_test_file_goes_back_to_write_test():
+    state = {
+        "current_feature": "somar",
+        "production_code": PRODUCTION,
+        "test_code": "def test_soma(:\n    assert soma(1, 2) == 3\n",
+        "iteration_count": 1,
+    }
+
+    update = preflight(state)
+
+    assert update["preflight_file"] == "test_production.py"
+    assert after_preflight({**state, **update}) == "write_test"
+    assert preflight_failure("def soma(:\n", TESTS)[0] == "production.py"
+    assert preflight_failure("", TESTS)[0] == "production.py"
+
+
+BROKEN_TEST = "```python\ndef test_media(:\n    assert media([2, 4]) == 3\n```"
+FIXED_TEST = "```python\ndef test_media():\n    assert media([2, 4]) == 3\n```"
+FIX = "```python\ndef media(valores):\n    return sum(valores) / len(valores)\n```"
+
+
+RULES = [
+    {"match": "rejeitado antes de executar", "responses": [FIXED_TEST]},
+    {"match": "Escreva um teste", "responses": [BROKEN_TEST]},
+    {"match": "CORREÇÃO MÍNIMA|Refatore", "responses": [FIX]},
+]
+
+
+@pytest.mark.parametrize("scripted_model", [RULES], indirect=True)
+def test_feature_cycle_rewrites_test_rejected_by_preflight(scripted_model):
+    existing = "def test_soma():\n    assert soma(1, 2) == 3\n"
+    result = feature_app.invoke(
+        {
+            "current_feature": "calcular a média",
+            "production_code": "def soma(a, b):\n    return a + b\n",
+            "test_code": existing,
+            "test_results": None,
+            "test_scope": None,
+            "preflight_error": None,
+            "preflight_file": None,
+            "test_base": None,
+            "fix_model": None,
+            "tested_code": None,
+            "history": [],
+            "iteration_count": 0,
+        }
+    )
+
+    assert result["test_results"].all_passed
+    assert result["test_results"].passed == 2
+    assert "def test_media(:" not in result["test_code"]
+    assert existing in result["test_code"]
+    actions = [h.action for h in result["history"]]
+    assert actions.count("Escrever teste (Fase RED)") == 2
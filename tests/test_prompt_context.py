@@ -0,0 +1,68 @@
+from llm_agent_smith.executors.testResult import TestCaseResult, TestRunResult
+from llm_agent_smith.tracing.tracer import Tracer, get_tracer, set_tracer
+from llm_agent_smith.utils.codeMerge import ModuleUnits
+from llm_agent_smith.utils.promptContext import (
+    estimate_tokens,
+    failing_test_symbols,
+    failure_context,
+    relevant_code,
+    relevant_symbols,
+)
+
+CODE = (
+    "import re\n\n\n"
+    "def limpar_cpf(cpf):\n    return re.sub(r'\\D', '', cpf)\n\n\n"
+    "def validar_cpf(cpf):\n    return len(limpar_cpf(cpf)) == 11\n\n\n"
+    + "".join(
+        f"def relatorio_{i}(dados):\n    return [d * {i} for d in dados]\n\n\n"
+        for i in range(40)
+    )
+)
+
+
+def test_call_graph_pulls_in_dependencies():
+    units = ModuleUnits.parse(CODE)
+
+    assert relevant_symbols(units, hint="validar um CPF") == [
+        "validar_cpf",
+        "limpar_cpf",
+    ]
+
+
+def test_small_code_is_sent_whole():
+    assert relevant_code(CODE, hint="validar", budget=10_000) == CODE
+
+
+def test_irrelevant_definitions_become_comments_and_savings_are_recorded():
+    tracer = Tracer()
+    previous = get_tracer()
+    set_tracer(tracer)
+    try:
+        with tracer.span("node", "implement_fix"):
+            trimmed = relevant_code(CODE, hint="validar um CPF", budget=300)
+    finally:
+        set_tracer(previous)
+
+    units = ModuleUnits.parse(trimmed).units
+    assert set(units) == {"validar_cpf", "limpar_cpf"}
+    assert "relatorio_7, relatorio_8" in trimmed
+    assert estimate_tokens(trimmed) <= 300
+    saved = tracer.metrics.value("tdd_prompt_tokens_saved_total", node="implement_fix")
+    assert saved == estimate_tokens(CODE) - estimate_tokens(trimmed) > 0
+
+
+def test_failure_context_keeps_the_end_of_each_message():
+    message = "\n".join(f"linha {i}" for i in range(200)) + "\nE   assert 1 == 2"
+    results = TestRunResult(
+        cases=[
+            TestCaseResult("test_production.py::test_soma", "failed", message=message)
+        ]
+    )
+
+    report = failure_context(results, budget=50)
+
+    assert report.endswith("E   assert 1 == 2")
+    assert len(report) <= 50 * 4 + 80
+    assert failing_test_symbols(
+        "def test_soma():\n    assert soma(1, 1) == 2\n", results
+    ) >= {"soma"}
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from llm_agent_smith.models.modelRouter import get_model_router
+from llm_agent_smith.tools.executeTestsTool import run_tests
+from llm_agent_smith.tools.refactorCodeTool import arefactor_code, refactor_code
+
+REFACTORS = {
+    # Mesmo comportamento, escrito de outro jeito
+    "mantem": "```python\ndef media(valores):\n    return sum(valores) / len(valores)\n```",
+    # Interface igual, comportamento quebrado: só os testes percebem
+    "quebra": "```python\ndef media(valores):\n    return sum(valores)\n```",
+}
+
+PRODUCTION = (
+    "def media(valores):\n"
+    "    total = 0\n"
+    "    for valor in valores:\n"
+    "        total += valor\n"
+    "    return total / len(valores)\n"
+)
+TESTS = "def test_media():\n    assert media([1, 2, 3]) == 2\n"
+
+
+@pytest.fixture
+def refactor_model(scripted_model):
+    def use(kind):
+        scripted_model(
+            {
+                f"refactor:{kind}": [
+                    {"match": "Refatore", "responses": [REFACTORS[kind]]}
+                ]
+            },
+            routes=f"*=refactor:{kind}",
+        )
+        return {
+            "current_feature": "calcular a média",
+            "production_code": PRODUCTION,
+            "test_code": TESTS,
+            "test_results": run_tests(PRODUCTION, TESTS),
+            "history": [],
+        }
+
+    return use
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_refactor_that_breaks_tests_keeps_green_code(refactor_model, mode):
+    use = refactor_model
+    state = use("quebra")
+
+    if mode == "sync":
+        update = refactor_code(state)
+    else:
+        update = asyncio.run(arefactor_code(state))
+
+    assert update == {}
+    assert [row["failures"] for row in get_model_router().stats()] == [1]
+
+
+def test_refactor_that_keeps_behavior_brings_its_test_results(refactor_model):
+    use = refactor_model
+    state = use("mantem")
+
+    update = refactor_code(state)
+
+    assert "sum(valores) / len(valores)" in update["production_code"]
+    assert update["test_results"].all_passed
+    assert [row["successes"] for row in get_model_router().stats()] == [1]
@@ -0,0 +1,57 @@
+import asyncio
+
+from llm_agent_smith import runner
+from llm_agent_smith.runner import TDDRunner
+
+
+class _SlowApp:
+    """Grafo falso que só registra quantas execuções estão ativas"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def ainvoke(self, state, config=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return {"user_request": state["user_request"]}
+
+
+def test_run_many_respects_concurrency_limit(monkeypatch):
+    app = _SlowApp()
+    monkeypatch.setattr(runner, "tdd_app", app)
+
+    async def collect():
+        tdd = TDDRunner(concurrency=2)
+        return [item async for item in tdd.run_many(f"r{i}" for i in range(6))]
+
+    results = asyncio.run(collect())
+
+    assert app.peak == 2
+    assert sorted(o.state["user_request"] for o in results) == [
+        f"r{i}" for i in range(6)
+    ]
+    assert all(o.error is None and o.duration > 0 for o in results)
+
+
+def test_cancel_single_request(monkeypatch):
+    monkeypatch.setattr(runner, "tdd_app", _SlowApp(delay=5))
+
+    async def scenario():
+        tdd = TDDRunner(concurrency=4)
+        slow = tdd.submit("lento", request_id="a")
+        await asyncio.sleep(0.01)
+        assert tdd.cancel("a")
+        assert not tdd.cancel("inexistente")
+        try:
+            await slow
+        except asyncio.CancelledError:
+            return tdd.active_requests
+        raise AssertionError("a solicitação deveria ter sido cancelada")
+
+    assert asyncio.run(scenario()) == []
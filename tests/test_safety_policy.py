@@ -0,0 +1,76 @@
+import pytest
+
+from llm_agent_smith.utils.codeAnalysis import analysis_stats, clear_analysis_cache
+from llm_agent_smith.utils.codeUtils import is_code_safe
+from llm_agent_smith.utils.safetyPolicy import SafetyPolicy, find_violations
+
+
+def test_strings_and_safe_modules_are_allowed():
+    code = (
+        "import os\nimport re\n\n\n"
+        "def caminho(p):\n    return os.path.join(p, 'open(x)')\n\n\n"
+        "PADRAO = re.compile('eval(')\n"
+    )
+
+    assert find_violations(code) == []
+    assert is_code_safe(code)
+    # Star import só é violação se o módulo tiver algum membro proibido
+    assert find_violations("from math import *\n") == []
+
+
+@pytest.mark.parametrize(
+    "code, rule, target",
+    [
+        ("def f():\n    return eval('1')\n", "call", "eval"),
+        ("getattr(__builtins__, 'ev' + 'al')('1')\n", "dynamic-access", "getattr"),
+        ("import os\ngetattr(os, 'sys' + 'tem')('ls')\n", "dynamic-access", "getattr"),
+        (
+            "globals()['__builtins__']['ev' + 'al']('1')\n",
+            "dynamic-access",
+            "__builtins__",
+        ),
+        ("vars()['eval']('1')\n", "dynamic-access", "eval"),
+        ("from os import *\nsystem('ls')\n", "import", "os.*"),
+        ("import os\nos.execve('/bin/sh', ['sh'], {})\n", "call", "os.execve"),
+        ("from os import spawnlp\n", "import", "os.spawnlp"),
+        ("import os\nos.posix_spawnp('sh', ['sh'], {})\n", "call", "os.posix_spawnp"),
+        ("import posix\nposix.system('ls')\n", "import", "posix"),
+        ("import pty\npty.spawn('sh')\n", "import", "pty"),
+        ("import os as o\no.system('ls')\n", "call", "os.system"),
+        ("import os\ngetattr(os, 'system')('ls')\n", "dynamic-access", "os.system"),
+        ("from subprocess import run\n", "import", "subprocess.run"),
+        ("().__class__.__bases__[0].__subclasses__()\n", "dunder", "__subclasses__"),
+        ("def f(:\n    exec('x')\n", "pattern", "exec("),
+    ],
+)
+def test_denied_usages_are_reported(code, rule, target):
+    violations = find_violations(code)
+
+    assert (violations[0].rule, violations[0].target) == (rule, target)
+    assert not is_code_safe(code)
+
+
+def test_custom_policy():
+    policy = SafetyPolicy(modules=["socket"], targets=["print"], dunders=[])
+
+    assert [v.target for v in policy.check("import socket\nprint(1)\n")] == [
+        "socket",
+        "print",
+    ]
+    assert policy.check("eval('1')\n") == []
+
+
+def test_code_without_listed_words_is_not_parsed():
+    clear_analysis_cache()
+
+    assert (
+        find_violations("import os\n\n\ndef f(x):\n    return os.path.join(x)\n") == []
+    )
+    # "nt" e "pty" só contam como nome importado, não dentro de print/empty
+    assert find_violations("def f(x):\n    print(int(x) or empty)\n") == []
+    assert analysis_stats()["misses"] == 0
+    # Basta a palavra aparecer (mesmo sob alias) para a árvore ser analisada
+    assert [v.target for v in find_violations("import os as o\no.system('ls')\n")] == [
+        "os.system"
+    ]
+    assert analysis_stats()["misses"] == 1
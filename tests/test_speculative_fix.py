@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from config.main import AppConfig
+from llm_agent_smith.executors.testResult import TestCaseResult, TestRunResult
+from llm_agent_smith.tools import executeTestsTool
+from llm_agent_smith.tools.executeTestsTool import aexecute_tests, execute_tests
+from llm_agent_smith.tools.implementMinimalFixTool import (
+    aimplement_minimal_fix,
+    implement_minimal_fix,
+)
+
+TEST_CODE = "def test_soma():\n    assert soma(2, 3) == 5\n"
+
+CANDIDATES = [
+    "```python\ndef soma(a, b):\n    return eval('a + b')\n```",
+    "```python\ndef soma(a, b):\n    return a - b\n```",
+    "```python\ndef soma(a, b):\n    total = 0\n    total += a\n    total += b\n"
+    "    return total\n```",
+    "```python\ndef soma(a, b):\n    return a + b\n```",
+]
+
+
+def _state() -> dict:
+    failing = TestCaseResult(
+        nodeid="test_production.py::test_soma",
+        outcome="failed",
+        message="assert 0 == 5",
+    )
+    return {
+        "current_feature": "somar dois números",
+        "production_code": "def soma(a, b):\n    return 0\n",
+        "test_code": TEST_CODE,
+        "test_results": TestRunResult(failed=1, cases=[failing]),
+        "iteration_count": 0,
+        "history": [],
+    }
+
+
+@pytest.fixture
+def speculative(monkeypatch, scripted_model):
+    monkeypatch.setattr(AppConfig, "FIX_CANDIDATES", len(CANDIDATES))
+    scripted_model([{"match": "CORREÇÃO MÍNIMA", "responses": CANDIDATES}])
+
+
+@pytest.mark.parametrize("run_async", [False, True])
+def test_smallest_passing_candidate_wins(speculative, run_async):
+    state = _state()
+    if run_async:
+        update = asyncio.run(aimplement_minimal_fix(state))
+    else:
+        update = implement_minimal_fix(state)
+
+    assert "return a + b" in update["production_code"]
+    assert update["iteration_count"] == 1
+    assert "especulativa" in update["history"][0].action
+    assert update["test_results"].all_passed
+
+
+@pytest.mark.parametrize("run_async", [False, True])
+def test_winner_results_are_not_rerun(speculative, run_async, monkeypatch):
+    state = _state()
+    state["test_scope"] = None
+    state.update(implement_minimal_fix(state))
+
+    def rerun(*args):
+        raise AssertionError("execute_tests rodou de novo os testes do vencedor")
+
+    monkeypatch.setattr(executeTestsTool, "run_tests", rerun)
+    monkeypatch.setattr(executeTestsTool, "arun_tests", rerun)
+    if run_async:
+        update = asyncio.run(aexecute_tests(state))
+    else:
+        update = execute_tests(state)
+
+    assert update["test_results"] is state["test_results"]
+    assert update["tested_code"] is None
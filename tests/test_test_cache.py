@@ -0,0 +1,97 @@
+from llm_agent_smith.cache.testResultCache import TestResultCache
+from llm_agent_smith.executors.testResult import TestRunResult
+from llm_agent_smith.tools import executeTestsTool
+from llm_agent_smith.tracing.tracer import Tracer, get_tracer, set_tracer
+
+PRODUCTION = "def soma(a, b):\n    return a + b\n"
+TESTS = "def test_soma():\n    assert soma(2, 3) == 5\n"
+
+
+class CountingExecutor:
+    def __init__(self, timeout=10):
+        self.runs = 0
+        self.timeout = timeout
+
+    def run(self, production_code, test_code, selection=None, fail_fast=False):
+        self.runs += 1
+        return TestRunResult(exit_code=0, passed=1, duration=0.5)
+
+    def close(self):
+        pass
+
+
+def test_key_depends_on_code_and_selection():
+    key = TestResultCache.make_key(PRODUCTION, TESTS)
+
+    assert key == TestResultCache.make_key(PRODUCTION, TESTS)
+    assert key != TestResultCache.make_key(PRODUCTION + "\n", TESTS)
+    assert key != TestResultCache.make_key(PRODUCTION, TESTS, ["test_soma"])
+    assert key != TestResultCache.make_key(PRODUCTION, TESTS, None, fail_fast=True)
+    assert key != TestResultCache.make_key(PRODUCTION, TESTS, environment="pool")
+
+
+def test_memory_tier_is_lru_and_skips_errors():
+    cache = TestResultCache(max_entries=2)
+    cache.put("a", TestRunResult(passed=1))
+    cache.put("b", TestRunResult(passed=2))
+    cache.lookup("a")
+    cache.put("c", TestRunResult(passed=3))
+    cache.put("timeout", TestRunResult.from_error("Timeout"))
+
+    assert cache.lookup("b") == (None, "miss")
+    assert cache.lookup("a")[0].passed == 1
+    assert cache.lookup("timeout") == (None, "miss")
+    assert cache.stats() == {
+        "hits": 2,
+        "disk_hits": 0,
+        "misses": 2,
+        "hit_rate": 0.5,
+        "entries": 2,
+    }
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "tests.sqlite")
+    TestResultCache(path=path).put("a", TestRunResult(passed=4, output="ok"))
+
+    results, tier = TestResultCache(path=path).lookup("a")
+
+    assert tier == "disk"
+    assert (results.passed, results.output) == (4, "ok")
+
+
+def test_identical_pair_runs_once(monkeypatch):
+    executor, tracer, previous = CountingExecutor(), Tracer(), get_tracer()
+    monkeypatch.setattr(executeTestsTool, "_executor", executor)
+    executeTestsTool.set_test_cache(TestResultCache())
+    set_tracer(tracer)
+    try:
+        first = executeTestsTool.run_tests(PRODUCTION, TESTS)
+        second = executeTestsTool.run_tests(PRODUCTION, TESTS)
+        executeTestsTool.run_tests(PRODUCTION, TESTS, ["test_soma"])
+    finally:
+        executeTestsTool.set_test_cache(None)
+        set_tracer(previous)
+
+    assert executor.runs == 2
+    assert second.to_dict() == first.to_dict()
+    assert second is not first
+    assert tracer.metrics.value("tdd_test_cache_lookups_total") == 3
+    assert 'result="memory"' in tracer.prometheus()
+
+
+def test_other_executor_limits_do_not_reuse_results(monkeypatch):
+    executeTestsTool.set_test_cache(TestResultCache())
+    try:
+        short = CountingExecutor(timeout=1)
+        monkeypatch.setattr(executeTestsTool, "_executor", short)
+        executeTestsTool.run_tests(PRODUCTION, TESTS)
+        # Um timeout maior pode mudar o resultado: roda de novo
+        longer = CountingExecutor(timeout=60)
+        monkeypatch.setattr(executeTestsTool, "_executor", longer)
+        executeTestsTool.run_tests(PRODUCTION, TESTS)
+        executeTestsTool.run_tests(PRODUCTION, TESTS)
+    finally:
+        executeTestsTool.set_test_cache(None)
+
+    assert (short.runs, longer.runs) == (1, 1)
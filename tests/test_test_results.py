@@ -0,0 +1,140 @@
+import subprocess
+
+import pytest
+
+from llm_agent_smith.executors.resultCollector import ResultCollector, parse_junit_xml
+from llm_agent_smith.executors.subprocessExecutor import _pytest_command
+from llm_agent_smith.executors.testResult import (
+    NO_TESTS_COLLECTED,
+    TestCaseResult,
+    TestRunResult,
+)
+
+SUITE = """import pytest
+
+
+@pytest.fixture
+def quebrada():
+    raise RuntimeError("setup falhou")
+
+
+def test_ok():
+    assert 1 + 1 == 2
+
+
+def test_falha():
+    valor = 1
+    assert valor == 2
+
+
+@pytest.mark.skip(reason="depois")
+def test_pulado():
+    pass
+
+
+def test_erro_no_setup(quebrada):
+    pass
+
+
+class TestGrupo:
+    def test_metodo(self):
+        assert True
+"""
+
+OUTCOMES = {
+    "test_ok": "passed",
+    "test_falha": "failed",
+    "test_pulado": "skipped",
+    "test_erro_no_setup": "error",
+    "test_metodo": "passed",
+}
+
+
+def _write(tmp_path, name: str, source: str):
+    path = tmp_path / name
+    path.write_text(source)
+    return path
+
+
+def test_collector_hooks_record_each_outcome(tmp_path):
+    path = _write(tmp_path, "test_coletor_suite.py", SUITE)
+    collector = ResultCollector()
+
+    exit_code = pytest.main(
+        ["-q", "-p", "no:cacheprovider", "--rootdir", str(tmp_path), str(path)],
+        plugins=[collector],
+    )
+
+    result = TestRunResult(cases=collector.cases, exit_code=int(exit_code))
+    assert {c.name: c.outcome for c in result.cases} == OUTCOMES
+    assert (result.passed, result.failed, result.errors, result.skipped) == (
+        2,
+        1,
+        1,
+        1,
+    )
+    failure = next(c for c in result.cases if c.name == "test_falha")
+    assert failure.location == "test_coletor_suite.py:15"
+    assert "assert 1 == 2" in failure.message
+    assert "TestGrupo::test_metodo" in result.cases[-1].nodeid
+    assert not result.all_passed
+
+
+def test_collector_reports_collection_error(tmp_path):
+    path = _write(tmp_path, "test_coletor_quebrado.py", "def test_x(:\n    pass\n")
+    collector = ResultCollector()
+
+    exit_code = pytest.main(
+        ["-q", "-p", "no:cacheprovider", "--rootdir", str(tmp_path), str(path)],
+        plugins=[collector],
+    )
+
+    result = TestRunResult(cases=collector.cases, exit_code=int(exit_code))
+    assert result.errors == 1 and result.passed == 0
+    assert "SyntaxError" in result.cases[0].message
+    assert not result.all_passed
+
+
+def test_junit_xml_report_matches_the_collector(tmp_path):
+    path = _write(tmp_path, "test_junit_suite.py", SUITE)
+    junit = tmp_path / "report.xml"
+    subprocess.run(_pytest_command(path, str(junit)), cwd=tmp_path, capture_output=True)
+
+    cases = parse_junit_xml(str(junit))
+
+    assert {c.name: c.outcome for c in cases} == OUTCOMES
+    failure = next(c for c in cases if c.name == "test_falha")
+    assert failure.location == "test_junit_suite.py:15"
+    assert "assert 1 == 2" in failure.message
+    assert "test_junit_suite.py::TestGrupo::test_metodo" in [c.nodeid for c in cases]
+
+
+def test_counts_and_all_passed_semantics():
+    only_skipped = TestRunResult(cases=[TestCaseResult("t::a", "skipped")])
+    passing = TestRunResult(
+        cases=[TestCaseResult("t::a", "passed"), TestCaseResult("t::b", "skipped")]
+    )
+    nonzero_exit = TestRunResult(cases=[TestCaseResult("t::a", "passed")], exit_code=1)
+    not_collected = TestRunResult(exit_code=NO_TESTS_COLLECTED, output="nada")
+    crashed = TestRunResult.from_error("ERRO: Timeout")
+
+    assert passing.all_passed and passing.total == 2
+    assert not only_skipped.all_passed
+    # Código de saída sem relatório por teste: a rodada não passou
+    assert not nonzero_exit.all_passed
+    assert not not_collected.all_passed and not_collected.summary() == "nada"
+    assert (crashed.errors, crashed.exit_code, crashed.all_passed) == (1, -1, False)
+    assert crashed.failures() == []
+
+
+def test_failure_report_keeps_the_end_of_each_message():
+    message = "\n".join(f"linha {i}" for i in range(40)) + "\nAssertionError: fim"
+    result = TestRunResult(
+        cases=[TestCaseResult("t::a", "failed", location="t.py:3", message=message)]
+    )
+
+    report = result.failure_report(max_chars=200)
+
+    assert report.startswith("FAILED t::a (t.py:3)")
+    assert report.endswith("AssertionError: fim")
+    assert len(report) < 300
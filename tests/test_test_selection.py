@@ -0,0 +1,59 @@
+from llm_agent_smith.executors.subprocessExecutor import SubprocessExecutor
+from llm_agent_smith.executors.testResult import TestCaseResult, TestRunResult
+from llm_agent_smith.executors.testSelection import (
+    added_tests,
+    failing_first,
+    identify_tests,
+)
+from llm_agent_smith.tools.executeTestsTool import select_tests
+
+OLD = "def test_a():\n    assert soma(1, 1) == 2\n"
+NEW = (
+    OLD
+    + "\n\ndef test_b():\n    assert soma(2, 2) == 4\n"
+    + "\n\nclass TestSub:\n    def test_c(self):\n        assert sub(3, 1) == 2\n"
+)
+
+
+def test_only_new_or_changed_tests_are_selected():
+    changed = NEW.replace("soma(1, 1) == 2", "soma(0, 1) == 1")
+
+    assert list(identify_tests(NEW)) == ["test_a", "test_b", "TestSub::test_c"]
+    assert added_tests(OLD, NEW) == ["test_b", "TestSub::test_c"]
+    assert added_tests(NEW, changed) == ["test_a"]
+
+
+def test_green_runs_failing_tests_first_with_fail_fast():
+    previous = TestRunResult(
+        cases=[
+            TestCaseResult("test_production.py::test_a", "passed"),
+            TestCaseResult("test_production.py::TestSub::test_c", "failed"),
+        ],
+        exit_code=1,
+    )
+    state = {"test_scope": None, "test_results": previous, "test_code": NEW}
+
+    assert failing_first(previous, NEW) == ["TestSub::test_c", "test_a", "test_b"]
+    assert select_tests(state) == (["TestSub::test_c", "test_a", "test_b"], True)
+    assert select_tests({**state, "test_scope": ["test_b"]}) == (["test_b"], False)
+
+
+def test_collection_error_falls_back_to_full_suite():
+    previous = TestRunResult(
+        cases=[TestCaseResult("test_production.py", "error")], exit_code=2
+    )
+
+    assert failing_first(previous, NEW) is None
+
+
+def test_executor_runs_selection_in_order_and_stops_at_first_failure():
+    production = "def soma(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return 0\n"
+    executor = SubprocessExecutor(timeout=30)
+
+    only_new = executor.run(production, NEW, ["test_b"])
+    ordered = executor.run(production, NEW, ["TestSub::test_c", "test_a"], True)
+
+    assert [c.name for c in only_new.cases] == ["test_b"]
+    assert only_new.all_passed
+    assert [c.name for c in ordered.cases] == ["test_c"]
+    assert ordered.failed == 1
@@ -0,0 +1,63 @@
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_agent_smith.cache.llmResponseCache import LLMResponseCache
+from llm_agent_smith.executors.testResult import TestRunResult
+from llm_agent_smith.models import llmInvoker
+from llm_agent_smith.models.modelRegistry import ModelRegistry
+from llm_agent_smith.tracing.tracer import Tracer, get_tracer, set_tracer, traced
+
+
+def _message(text: str) -> AIMessage:
+    return AIMessage(
+        content=text,
+        usage_metadata={"input_tokens": 10, "output_tokens": 4, "total_tokens": 14},
+    )
+
+
+def test_llm_span_counts_tokens_and_cache_hits(tmp_path):
+    tracer = Tracer()
+    previous = get_tracer()
+    set_tracer(tracer)
+    prompt = ChatPromptTemplate.from_template("Pergunta: {q}")
+    llmInvoker.set_llm_cache(LLMResponseCache(str(tmp_path / "cache.sqlite")))
+    ModelRegistry.use(GenericFakeChatModel(messages=iter([_message("resposta")])))
+    node = traced("write_test", lambda: llmInvoker.invoke_llm(prompt, {"q": "x"}))
+    try:
+        node()
+        node()
+    finally:
+        ModelRegistry.use(None)
+        llmInvoker.set_llm_cache(None)
+        set_tracer(previous)
+
+    metrics = tracer.metrics
+    assert metrics.value("tdd_llm_calls_total", node="write_test", cache="miss") == 1
+    assert metrics.value("tdd_llm_calls_total", node="write_test", cache="hit") == 1
+    assert metrics.value("tdd_llm_tokens_total", type="input") == 10
+    assert metrics.value("tdd_llm_tokens_total", type="output") == 4
+    assert metrics.value("tdd_node_seconds_count", node="write_test") == 2
+
+
+def test_prometheus_text_and_nested_trace():
+    tracer = Tracer()
+    with tracer.span("node", "execute_tests"):
+        with tracer.span("test", "PytestWorkerPool") as span:
+            tracer.record_tests(
+                span, "PytestWorkerPool", TestRunResult(passed=2, duration=0.05)
+            )
+
+    text = tracer.prometheus()
+    assert "# TYPE tdd_test_runs_total counter" in text
+    assert (
+        'tdd_test_runs_total{executor="PytestWorkerPool",node="execute_tests",'
+        'outcome="passed"} 1' in text
+    )
+    assert 'tdd_test_executor_seconds_sum{executor="PytestWorkerPool"} 0.05' in text
+
+    events = {e["name"]: e for e in tracer.chrome_trace()["traceEvents"]}
+    node, tests = events["execute_tests"], events["PytestWorkerPool"]
+    assert tests["args"]["parent_id"] == node["args"]["span_id"]
+    assert tests["args"]["node"] == "execute_tests"
+    assert tests["args"]["passed"] == 2
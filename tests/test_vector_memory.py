@@ -0,0 +1,42 @@
+from llm_agent_smith.memory import vectorMemory
+from llm_agent_smith.memory.vectorMemory import VectorMemory, recall, remember_feature
+
+CPF_CODE = (
+    "def limpar(cpf):\n    return cpf.replace('.', '')\n\n\n"
+    "def validar_cpf(cpf):\n    return len(limpar(cpf)) == 11\n"
+)
+
+
+def test_search_ranks_near_duplicates_first_and_persists(tmp_path):
+    path = str(tmp_path / "memory.sqlite")
+    memory = VectorMemory(path)
+    assert memory.add("validar um CPF", "def test_cpf(): ...", CPF_CODE)
+    assert not memory.add("validar um CPF", "def test_cpf(): ...", CPF_CODE)
+    memory.add("calcular a média de dois números", "def test_media(): ...", "")
+    memory.close()
+
+    reopened = VectorMemory(path)
+    hits = reopened.search("Validar CPF", k=2)
+
+    assert len(reopened) == 2
+    assert hits[0].feature == "validar um CPF" and hits[0].score > 0.5
+    assert all(hit.feature != "calcular a média de dois números" for hit in hits)
+
+
+def test_remembered_feature_keeps_only_its_units_and_is_reused(tmp_path, monkeypatch):
+    memory = VectorMemory(str(tmp_path / "memory.sqlite"))
+    monkeypatch.setattr(vectorMemory, "_memory", memory)
+    base = {"production_code": "def soma(a, b):\n    return a + b\n", "test_code": ""}
+    result = {
+        "production_code": base["production_code"] + "\n\n" + CPF_CODE,
+        "test_code": "def test_cpf():\n    assert validar_cpf('111.444.777-35')\n",
+    }
+
+    assert remember_feature("validar um CPF", base, result)
+    reuse, examples = recall("validar um CPF")
+    _, similar = recall("validar um CNPJ")
+
+    assert "def soma" not in reuse.production_code
+    assert "def limpar" in reuse.production_code
+    assert examples == [reuse]
+    assert similar and similar[0].score < reuse.score
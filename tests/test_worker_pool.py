@@ -0,0 +1,72 @@
+import sys
+
+import pytest
+
+from llm_agent_smith.executors.pytestWorkerPool import PytestWorkerPool, run_isolated
+
+PRODUCTION = "def soma(a, b):\n    return a + b\n"
+TESTS = (
+    "def test_ok():\n    assert soma(1, 2) == 3\n\n\n"
+    "def test_falha():\n    assert soma(1, 1) == 3\n"
+)
+
+
+def _pid(pool: PytestWorkerPool) -> int:
+    return pool._idle.queue[0].process.pid
+
+
+def test_run_isolated_reports_passes_and_failures():
+    result = run_isolated(pytest, PRODUCTION, TESTS)
+
+    assert (result.passed, result.failed, result.exit_code) == (1, 1, 1)
+    assert not result.all_passed
+    assert "production" not in sys.modules
+
+
+def test_production_module_does_not_leak_between_runs():
+    tests = "def test_soma():\n    assert soma(1, 2) == 3\n"
+
+    first = run_isolated(pytest, PRODUCTION, tests)
+    second = run_isolated(pytest, "def soma(a, b):\n    return a - b\n", tests)
+
+    assert first.all_passed
+    assert second.failed == 1
+
+
+@pytest.fixture
+def pool():
+    with PytestWorkerPool(size=1, max_runs=2, timeout=2) as pool:
+        yield pool
+
+
+def test_worker_is_recycled_after_max_runs(pool):
+    first = pool.run(PRODUCTION, TESTS)
+    pid = _pid(pool)
+    pool.run(PRODUCTION, TESTS)
+
+    assert (first.passed, first.failed) == (1, 1)
+    assert _pid(pool) != pid
+    assert pool.run(PRODUCTION, TESTS).passed == 1
+
+
+def test_timeout_kills_and_respawns_worker(pool):
+    pool.run(PRODUCTION, TESTS)
+    pid = _pid(pool)
+
+    result = pool.run(PRODUCTION, "def test_loop():\n    while True:\n        pass\n")
+
+    assert result.exit_code == -1
+    assert "Timeout" in result.output
+    assert _pid(pool) != pid
+    assert pool.run(PRODUCTION, TESTS).passed == 1
+
+
+def test_pool_recovers_after_worker_crash(pool):
+    crash = "def test_morre():\n    import os\n    os._exit(3)\n"
+
+    result = pool.run(PRODUCTION, crash)
+
+    assert result.exit_code == -1
+    assert "Worker do pytest falhou" in result.output
+    # O worker novo não herda nada da rodada que o derrubou
+    assert pool.run(PRODUCTION, TESTS).passed == 1